@@ -5,16 +5,25 @@ from app import routes
 from app import session_manager
 from app import profile_manager
 from app import agent_manager
+from app import sse
+from app import interjection_classifier
 import sys
 import os
 import base64
 import requests
 import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import anthropic
 
 # Add src directory to path for Fish Audio imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-from fish import stream_asr, stream_tts
+from fish import negotiate_format, AUDIO_FORMATS
+from fish import get_tts_cache_stats, get_audio_bank, warm_audio_bank, get_bank_audio
+from fish import stream_tts_parallel, get_parallel_tts_stats
+from fish import get_asr_pool, get_asr_pool_stats, get_vad_stats, check_ffmpeg
+from fish.asr_pool import QUEUED, THROTTLED
 
 app = Flask(__name__, template_folder='app/templates', static_folder='app/static')
 app.config['SECRET_KEY'] = 'your-secret-key-here'
@@ -50,12 +59,44 @@ CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
 AI_INTERJECTION_COOLDOWN = 10  # seconds between AI interjections
 AI_CONTEXT_WINDOW = 20  # number of recent transcripts to consider
 SILENCE_THRESHOLD = 3.0  # seconds of silence before AI considers interjecting
+# Draft the JanitorAI interjection while Claude is still deciding (set AI_PARALLEL_INTERJECT=0 to run them in sequence)
+AI_PARALLEL_INTERJECT = os.getenv('AI_PARALLEL_INTERJECT', 'true').lower() in ['1', 'true', 'yes']
+
+# Score interjections locally and only ask Claude about borderline cases (set AI_LOCAL_CLASSIFIER=0 to always ask Claude)
+AI_LOCAL_CLASSIFIER = os.getenv('AI_LOCAL_CLASSIFIER', 'true').lower() in ['1', 'true', 'yes']
+
+# Outcomes of parallel interjection drafts
+interjection_stats = {'drafts': 0, 'cancelled': 0, 'used': 0, 'regenerated': 0}
 
 # Audio quality thresholds
 MIN_TRANSCRIPT_LENGTH = 3  # Minimum characters to be considered valid
 MIN_AUDIO_SIZE = 1000  # Minimum audio bytes (to filter out noise)
 NOISE_KEYWORDS = ['[silence]', '[noise]', '[music]', 'um', 'uh', 'hmm']  # Common noise patterns
 
+# ASR runs on the fish.asr_pool workers (FISH_ASR_WORKERS, FISH_ASR_MAX_QUEUE, FISH_ASR_OVERFLOW),
+# behind voice activity detection that drops silent chunks (FISH_VAD, FISH_VAD_DETECTOR);
+# finished jobs are handed back to the Socket.IO side through this queue
+asr_results = deque()  # (handler, args) in completion order
+ASR_RESULT_POLL_SEC = 0.05
+asr_pump_started = False
+
+# eventlet runs without monkey-patching, so a blocking call (LLM, TTS) inside a
+# greenlet freezes every socket. Such calls go to these real threads and the
+# calling greenlet polls for the result (run_blocking).
+BLOCKING_WORKERS = int(os.getenv('BLOCKING_WORKERS', 16))
+BLOCKING_POLL_SEC = 0.02
+blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix='blocking')
+
+def wait_for(future):
+    """Result of a future, yielding to other greenlets until it is done"""
+    while not future.done():
+        socketio.sleep(BLOCKING_POLL_SEC)
+    return future.result()
+
+def run_blocking(fn, *args, **kwargs):
+    """Call fn on a worker thread; only the calling greenlet waits for it"""
+    return wait_for(blocking_pool.submit(fn, *args, **kwargs))
+
 def parse_streaming_response(response_text):
     """
     Parse Server-Sent Events (SSE) streaming response from JanitorAI.
@@ -65,37 +106,7 @@ def parse_streaming_response(response_text):
     Returns the complete message by aggregating all delta chunks.
     """
     try:
-        complete_message = []
-
-        # Split by lines and process each data chunk
-        lines = response_text.strip().split('\n')
-
-        for line in lines:
-            line = line.strip()
-
-            # Skip empty lines
-            if not line:
-                continue
-
-            # Remove 'data: ' prefix
-            if line.startswith('data: '):
-                json_str = line[6:]  # Remove 'data: '
-
-                try:
-                    chunk = json.loads(json_str)
-
-                    # Extract content from delta
-                    if 'choices' in chunk and len(chunk['choices']) > 0:
-                        delta = chunk['choices'][0].get('delta', {})
-                        content = delta.get('content', '')
-
-                        if content:
-                            complete_message.append(content)
-
-                except json.JSONDecodeError:
-                    continue
-
-        result = ''.join(complete_message)
+        result = sse.parse_sse_text(response_text)
         print(f"Parsed streaming message: {result}")
         return result
 
@@ -120,38 +131,17 @@ def claude_decision(context, silence_detected=False):
         return None
 
     try:
-        silence_note = "\n\nIMPORTANT: There has been 3+ seconds of silence. You should interject to keep the conversation flowing." if silence_detected else ""
-
         message = claude_client.messages.create(
             model=CLAUDE_MODEL,
             max_tokens=200,
             messages=[{
                 "role": "user",
-                "content": f"""Analyze this conversation and decide if an AI assistant should interject:
-
-{context}{silence_note}
-
-Respond with ONLY valid JSON (no markdown):
-{{
-  "should_interject": true or false,
-  "intent": "brief reason",
-  "target_user": "A" or "B" or "both",
-  "response_style": "conversational" or "informative" or "supportive" or "question"
-}}"""
+                "content": interjection_classifier.build_decision_prompt(context, silence_detected)
             }]
         )
 
-        decision_text = message.content[0].text.strip()
-
         # Parse JSON (handle markdown if present)
-        if decision_text.startswith('```json'):
-            decision_text = decision_text[7:]
-        if decision_text.startswith('```'):
-            decision_text = decision_text[3:]
-        if decision_text.endswith('```'):
-            decision_text = decision_text[:-3]
-
-        decision = json.loads(decision_text.strip())
+        decision = interjection_classifier.parse_decision(message.content[0].text)
         print(f"Claude decision: {decision}")
         return decision
 
@@ -317,7 +307,7 @@ def api_trigger_agent():
     if not session_id:
         return jsonify({"error": "Missing session_id"}), 400
     
-    success, response_text, error = agent_manager.trigger_agent(session_id)
+    success, response_text, error = run_blocking(agent_manager.trigger_agent, session_id)
     
     if success:
         return jsonify({
@@ -338,6 +328,72 @@ def api_agent_stats(session_id):
     stats = agent_manager.get_agent_stats(session_id)
     return jsonify(stats)
 
+@app.route('/api/agent/llm-stats', methods=['GET'])
+def api_llm_stats():
+    """Get connection pool reuse metrics for the LLM client"""
+    return jsonify(agent_manager.get_llm_client_stats())
+
+@app.route('/api/agent/dispatch-stats', methods=['GET'])
+def api_dispatch_stats():
+    """Get LLM dispatcher queue depth and wait-time metrics"""
+    return jsonify(agent_manager.get_dispatcher_stats())
+
+@app.route('/api/agent/provider-stats', methods=['GET'])
+def api_provider_stats():
+    """Get per-provider win rates and latencies for hedged LLM calls"""
+    return jsonify(agent_manager.get_provider_stats())
+
+@app.route('/api/agent/run-stats', methods=['GET'])
+def api_run_stats():
+    """Get single-flight agent run and trigger coalescing metrics"""
+    return jsonify(agent_manager.get_scheduler_stats())
+
+@app.route('/api/ai/interjection-stats', methods=['GET'])
+def api_interjection_stats():
+    """Get outcomes of interjection drafts made while Claude was deciding"""
+    return jsonify(interjection_stats)
+
+@app.route('/api/ai/classifier-stats', methods=['GET'])
+def api_classifier_stats():
+    """Get how often the local classifier skipped, interjected or escalated to Claude"""
+    return jsonify(interjection_classifier.get_classifier().get_stats())
+
+@app.route('/api/tts/cache-stats', methods=['GET'])
+def api_tts_cache_stats():
+    """Get TTS cache hit, miss and latency-saved metrics"""
+    return jsonify(get_tts_cache_stats())
+
+@app.route('/api/tts/bank-stats', methods=['GET'])
+def api_audio_bank_stats():
+    """Get pre-rendered fallback audio bank status"""
+    return jsonify(get_audio_bank().get_stats())
+
+@app.route('/api/asr/pool-stats', methods=['GET'])
+def api_asr_pool_stats():
+    """Get ASR queue depth, overflow and latency metrics"""
+    return jsonify(get_asr_pool_stats())
+
+@app.route('/api/asr/vad-stats', methods=['GET'])
+def api_vad_stats():
+    """Get how many audio chunks voice activity detection kept away from ASR"""
+    return jsonify(get_vad_stats())
+
+@app.route('/api/tts/parallel-stats', methods=['GET'])
+def api_parallel_tts_stats():
+    """Get parallel sentence synthesis counters"""
+    return jsonify(get_parallel_tts_stats())
+
+def requested_audio_format(data):
+    """
+    TTS format for an HTTP request: a 'formats' preference list or single
+    'format' in the body, else the Accept header, else WAV
+    """
+    accepted = data.get('formats') or ([data['format']] if data.get('format') else None)
+    if not accepted:
+        mime_to_format = {mime.split(';')[0]: fmt for fmt, mime in AUDIO_FORMATS.items()}
+        accepted = [mime_to_format[mime] for mime, _ in request.accept_mimetypes if mime in mime_to_format]
+    return negotiate_format(accepted)
+
 @app.route('/api/agent/tts', methods=['POST'])
 def api_agent_tts():
     """Convert agent text to speech"""
@@ -348,14 +404,16 @@ def api_agent_tts():
         return jsonify({"error": "Missing text"}), 400
     
     try:
-        # Generate audio using Fish Audio TTS
-        audio_bytes = stream_tts(text)
+        # Generate audio using Fish Audio TTS in the format the client asked for
+        audio_format = requested_audio_format(data)
+        audio_bytes = run_blocking(stream_tts_parallel, text, audio_format=audio_format)
         audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
         
         return jsonify({
             "success": True,
             "audio": audio_base64,
-            "format": "wav"
+            "format": audio_format,
+            "mime": AUDIO_FORMATS[audio_format]
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -368,6 +426,7 @@ def handle_connect():
 @socketio.on('disconnect')
 def handle_disconnect():
     print(f'Client disconnected: {request.sid}')
+    get_asr_pool().discard(request.sid)
     
     # End session if user was in one
     if request.sid in user_sessions:
@@ -570,24 +629,80 @@ def handle_audio_chunk(data):
     """
     Handle incoming audio chunks for STT processing.
     Audio is sent as base64-encoded data.
+    The chunk is queued on the ASR pool; handle_transcript runs once it is
+    transcribed, in the order this user's chunks arrived.
     """
     try:
         user_id = request.sid
         room = active_users.get(user_id, 'default')
         session_id = user_sessions.get(user_id)
 
-        # Decode base64 audio data
-        audio_data = base64.b64decode(data['audio'])
+        # Binary attachment from newer clients, base64 from older ones
+        audio = data['audio']
+        audio_data = bytes(audio) if isinstance(audio, (bytes, bytearray)) else base64.b64decode(audio)
 
         # Check if audio is large enough (noise filter)
         if len(audio_data) < MIN_AUDIO_SIZE:
             return
 
-        # Use Fish Audio for STT
-        transcript = stream_asr(audio_data)
+        ensure_asr_pump()
+
+        # Use Fish Audio for STT, off the event loop
+        asr_pool = get_asr_pool()
+        outcome = asr_pool.submit(
+            user_id, audio_data,
+            on_result=lambda transcript, audio_size: asr_results.append(
+                (handle_transcript, (user_id, room, session_id, transcript, audio_size))),
+            on_error=lambda error: asr_results.append((report_stt_error, (user_id, error)))
+        )
+
+        if outcome == THROTTLED:
+            # Backlog is full: ask the client to send fewer, longer chunks for a while
+            emit('asr_slow_down', {
+                'retry_after_ms': asr_pool.retry_after_ms(user_id),
+                'queue_depth': asr_pool.queue_depth(user_id)
+            })
+        elif outcome != QUEUED:
+            print(f"ASR backlog for {user_id}: {outcome}")
+
+    except Exception as e:
+        print(f"Error processing audio chunk: {e}")
+        emit('stt_error', {'error': str(e)})
+
+def ensure_asr_pump():
+    """Start the background task that applies finished ASR jobs (once)"""
+    global asr_pump_started
+    if not asr_pump_started:
+        asr_pump_started = True
+        socketio.start_background_task(asr_result_pump)
 
+def asr_result_pump():
+    """
+    Background task: apply finished ASR jobs on the Socket.IO side.
+    Pool workers are plain threads, so they queue results here instead of
+    emitting themselves; per-speaker order is kept by the pool.
+    """
+    while True:
+        while asr_results:
+            handler, args = asr_results.popleft()
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"Error handling ASR result: {e}")
+        socketio.sleep(ASR_RESULT_POLL_SEC)
+
+def report_stt_error(user_id, error):
+    """Tell the user their chunk could not be transcribed"""
+    print(f"Error processing audio chunk: {error}")
+    socketio.emit('stt_error', {'error': str(error)}, room=user_id)
+
+def handle_transcript(user_id, room, session_id, transcript, audio_size):
+    """
+    Apply one ASR result: store it, broadcast it and check for an AI interjection
+    """
+    try:
         # Check if transcript is meaningful
-        if not is_meaningful_transcript(transcript, len(audio_data)):
+        if not is_meaningful_transcript(transcript, audio_size):
             return
 
         import time
@@ -613,14 +728,17 @@ def handle_audio_chunk(data):
         if room not in transcript_buffers:
             transcript_buffers[room] = []
 
+        # Pause before this transcript (read before last_audio_activity is refreshed)
+        gap_sec = time.time() - last_audio_activity.get(room, time.time())
+
         transcript_buffers[room].append({
             'user_id': user_id,
             'text': transcript,
             'timestamp': time.time()
         })
 
-         # Emit transcript back to all users in room
-        emit('transcript_update', {
+        # Emit transcript back to all users in room
+        socketio.emit('transcript_update', {
             'user_id': user_id,
             'text': transcript,
             'session_id': session_id
@@ -642,16 +760,29 @@ def handle_audio_chunk(data):
             time_since_last_audio = time.time() - last_audio_activity.get(room, time.time())
             silence_detected = time_since_last_audio >= SILENCE_THRESHOLD
 
-            # Get Claude decision (with silence info)
-            decision = claude_decision(context, silence_detected=silence_detected)
-
-            if decision:
-                # Trigger AI interjection with Claude's decision
+            local = classify_interjection(room, gap_sec) if AI_LOCAL_CLASSIFIER else None
+            if local and local['verdict'] == interjection_classifier.SKIP:
+                print(f"Local classifier skipped interjection (p={local['probability']})")
+            elif local and local['verdict'] == interjection_classifier.INTERJECT:
+                # Confident enough to skip the Claude round-trip
+                style, target = predict_interject_style(silence_detected)
+                decision = {
+                    'should_interject': True,
+                    'intent': f"local classifier (p={local['probability']})",
+                    'target_user': target,
+                    'response_style': style
+                }
                 socketio.start_background_task(ai_interject, room, decision)
+            elif AI_PARALLEL_INTERJECT:
+                # Decision and draft run side by side off the socket handler
+                socketio.start_background_task(ai_interject_parallel, room, context, silence_detected)
+            else:
+                # Claude decides, then JanitorAI generates - off the ASR result pump
+                socketio.start_background_task(ai_interject_serial, room, context, silence_detected)
 
     except Exception as e:
-        print(f"Error processing audio chunk: {e}")
-        emit('stt_error', {'error': str(e)})
+        print(f"Error processing transcript: {e}")
+        socketio.emit('stt_error', {'error': str(e)}, room=user_id)
 
 @app.route('/api/transcript/buffer/<room_or_session>', methods=['GET'])
 def get_transcript_buffer(room_or_session):
@@ -725,13 +856,15 @@ def tts_endpoint():
         if not text.strip():
             return jsonify({'error': 'Empty text'}), 400
 
-        # Generate audio using Fish Audio TTS
-        audio_bytes = stream_tts(text)
+        # Generate audio using Fish Audio TTS in the format the client asked for
+        audio_format = requested_audio_format(data)
+        audio_bytes = run_blocking(stream_tts_parallel, text, audio_format=audio_format)
         audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
 
         return jsonify({
             'audio': audio_base64,
-            'format': 'wav'
+            'format': audio_format,
+            'mime': AUDIO_FORMATS[audio_format]
         })
 
     except Exception as e:
@@ -781,6 +914,24 @@ def check_if_ai_should_interject(room):
 
     return False
 
+def classify_interjection(room, gap_sec):
+    """
+    Score the room's latest transcript with the local interjection classifier.
+
+    Returns:
+        dict with verdict (skip / interject / escalate to Claude) and probability
+    """
+    buffer = transcript_buffers.get(room, [])
+    last_time = last_ai_interjection.get(room, 0)
+    turns_since_ai = sum(1 for t in buffer if t['timestamp'] > last_time)
+
+    features = interjection_classifier.extract_features(
+        [t['text'] for t in buffer[-AI_CONTEXT_WINDOW:]],
+        gap_sec=gap_sec,
+        turns_since_ai=turns_since_ai
+    )
+    return interjection_classifier.get_classifier().classify(features)
+
 def ai_interject(room, claude_decision=None):
     """
     Background task to have AI analyze conversation and provide interjection.
@@ -825,71 +976,219 @@ def ai_interject(room, claude_decision=None):
             target = claude_decision.get('target_user', 'both')
             style = claude_decision.get('response_style', 'conversational')
 
-            # Customize system prompt based on Claude's analysis
-            style_instructions = {
-                'conversational': 'Keep it natural and conversational (2-3 sentences max)',
-                'informative': 'Provide clear, factual information concisely',
-                'supportive': 'Be encouraging and supportive in your response',
-                'question': 'Ask a clarifying or thought-provoking question'
-            }
-
-            system_content = f"You are a helpful AI assistant participating in a video call. {style_instructions.get(style, style_instructions['conversational'])}. Your interjection is aimed at {target}."
-
             # Generate actual interjection with context from Claude
-            interject_payload = {
-                "model": "ignored",
-                "messages": [
-                    {"role": "system", "content": system_content},
-                    {"role": "user", "content": f"Conversation:\n{context}\n\nContext from analysis: {intent}\n\nProvide a helpful {style} response:"}
-                ],
-                "max_tokens": 150
-            }
-
-            headers = {
-                "Authorization": f"Bearer {JANITOR_AI_KEY}",
-                "Content-Type": "application/json"
-            }
-
-            response = requests.post(JANITOR_AI_URL, headers=headers, json=interject_payload, timeout=30, stream=False)
-            response.raise_for_status()
-
-            # Parse streaming response
-            ai_message = parse_streaming_response(response.text)
+            interject_payload = build_interject_payload(context, intent, style, target)
+            ai_message = run_blocking(generate_interjection, interject_payload)
 
             if not ai_message:
                 print("Failed to parse AI interjection response")
                 return
 
-            # Update last interjection time
-            last_ai_interjection[room] = time.time()
-
-            # Emit AI interjection to room with Claude context
-            socketio.emit('ai_interjection', {
-                'success': True,
-                'message': ai_message,
-                'context_used': len(recent_context),
-                'claude_decision': claude_decision  # Include Claude's analysis
-            }, room=room)
-
-            print(f"AI interjected in room {room}: {ai_message}")
+            emit_interjection(room, ai_message, len(recent_context), claude_decision)
         else:
             print(f"Claude decided not to interject: {claude_decision.get('intent')}")
 
     except Exception as e:
         print(f"Error in AI interjection: {e}")
 
+def build_interject_payload(context, intent, style, target):
+    """JanitorAI payload for an interjection in the given style, aimed at target"""
+    # Customize system prompt based on Claude's analysis
+    style_instructions = {
+        'conversational': 'Keep it natural and conversational (2-3 sentences max)',
+        'informative': 'Provide clear, factual information concisely',
+        'supportive': 'Be encouraging and supportive in your response',
+        'question': 'Ask a clarifying or thought-provoking question'
+    }
+
+    system_content = f"You are a helpful AI assistant participating in a video call. {style_instructions.get(style, style_instructions['conversational'])}. Your interjection is aimed at {target}."
+
+    analysis = f"\n\nContext from analysis: {intent}" if intent else ""
+    return {
+        "model": "ignored",
+        "messages": [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": f"Conversation:\n{context}{analysis}\n\nProvide a helpful {style} response:"}
+        ],
+        "max_tokens": 150
+    }
+
+def generate_interjection(payload, cancel=None):
+    """
+    Stream an interjection from JanitorAI.
+
+    Args:
+        payload: From build_interject_payload
+        cancel: Optional threading.Event; once set, nothing is sent (or reading
+            stops and the connection is closed, which cancels the rest of the generation)
+
+    Returns:
+        Interjection text, or None if cancelled or empty
+    """
+    if cancel is not None and cancel.is_set():
+        return None
+
+    # Shared keep-alive client (reuses the agent's warm connections)
+    response = agent_manager.get_llm_client().post(dict(payload, stream=True), timeout=30, stream=True)
+    try:
+        response.raise_for_status()
+
+        parts = []
+        for delta in sse.iter_sse_deltas(response.iter_content(chunk_size=None)):
+            if cancel is not None and cancel.is_set():
+                return None
+            parts.append(delta)
+
+        message = ''.join(parts).strip()
+        print(f"Parsed streaming message: {message}")
+        return message or None
+    finally:
+        response.close()
+
+def emit_interjection(room, ai_message, context_used, decision):
+    """Send an interjection to the room and start the cooldown"""
+    import time
+
+    # Update last interjection time
+    last_ai_interjection[room] = time.time()
+
+    # Emit AI interjection to room with Claude context
+    socketio.emit('ai_interjection', {
+        'success': True,
+        'message': ai_message,
+        'context_used': context_used,
+        'claude_decision': decision  # Include Claude's analysis
+    }, room=room)
+
+    print(f"AI interjected in room {room}: {ai_message}")
+
+def predict_interject_style(silence_detected):
+    """
+    Guess the style and target Claude will pick, so the draft can start early.
+    A silent room usually gets a prompting question; otherwise a conversational reply to both.
+    """
+    return ('question' if silence_detected else 'conversational'), 'both'
+
+def ai_interject_serial(room, context, silence_detected):
+    """Background task: get Claude's decision (with silence info), then interject if it says so"""
+    try:
+        decision = run_blocking(claude_decision, context, silence_detected=silence_detected)
+    except Exception as e:
+        print(f"Error getting Claude decision: {e}")
+        return
+
+    if decision:
+        # Trigger AI interjection with Claude's decision
+        ai_interject(room, decision)
+
+def ai_interject_parallel(room, context, silence_detected):
+    """
+    Background task: ask Claude whether to interject while JanitorAI drafts
+    the interjection with the predicted style and target.
+
+    No interjection -> the draft is cancelled. Same style and target -> the
+    draft is used, so the turn costs max(decision, generation) instead of
+    their sum. Otherwise the draft is cancelled and regenerated as decided.
+    """
+    style, target = predict_interject_style(silence_detected)
+    cancel = threading.Event()
+
+    def draft():
+        try:
+            return generate_interjection(build_interject_payload(context, "", style, target), cancel)
+        except Exception as e:
+            print(f"Interjection draft failed: {e}")
+            return None
+
+    # Both requests block, so each runs on a worker thread and this greenlet polls them
+    interjection_stats['drafts'] += 1
+    drafted = blocking_pool.submit(draft)
+
+    try:
+        decision = run_blocking(claude_decision, context, silence_detected=silence_detected)
+
+        if not decision or not decision.get('should_interject'):
+            cancel.set()
+            interjection_stats['cancelled'] += 1
+            if decision:
+                print(f"Claude decided not to interject: {decision.get('intent')} (draft cancelled)")
+            return
+
+        context_used = min(len(transcript_buffers.get(room, [])), AI_CONTEXT_WINDOW)
+        decided_style = decision.get('response_style', 'conversational')
+        decided_target = decision.get('target_user', 'both')
+
+        if (decided_style, decided_target) == (style, target):
+            ai_message = wait_for(drafted)
+            if ai_message:
+                interjection_stats['used'] += 1
+                emit_interjection(room, ai_message, context_used, decision)
+                return
+
+        # Draft doesn't fit the decision (or failed) - generate the decided one
+        cancel.set()
+        interjection_stats['regenerated'] += 1
+        print(f"Regenerating interjection as {decided_style} for {decided_target} (draft was {style} for {target})")
+        ai_message = run_blocking(
+            generate_interjection,
+            build_interject_payload(context, decision.get('intent', ''), decided_style, decided_target)
+        )
+        if ai_message:
+            emit_interjection(room, ai_message, context_used, decision)
+        else:
+            print("Failed to parse AI interjection response")
+
+    except Exception as e:
+        cancel.set()
+        print(f"Error in parallel AI interjection: {e}")
+
+def request_agent_run(session_id: str, room: str) -> bool:
+    """
+    Start an agent run for a session unless one is already in flight,
+    in which case the trigger is coalesced into a rerun of that one
+    """
+    started = agent_manager.get_agent_scheduler().request(
+        session_id,
+        lambda: socketio.start_background_task(agent_run_task, session_id, room)
+    )
+    if not started:
+        print(f"🔁 Agent already running for session {session_id} - trigger coalesced")
+    return started
+
+def agent_run_task(session_id: str, room: str):
+    """
+    Background task holding the session's single agent slot.
+    Reruns once with the latest context if triggers arrived while it ran.
+    """
+    scheduler = agent_manager.get_agent_scheduler()
+    try:
+        trigger_agent_background(session_id, room)
+
+        while scheduler.finish(session_id):
+            # Rerun after the cooldown, and only if the conversation still calls for it
+            socketio.sleep(agent_manager.get_cooldown_remaining(session_id))
+            if not agent_manager.should_trigger_agent(session_id):
+                scheduler.release(session_id, skipped_rerun=True)
+                return
+            print(f"🔁 Rerunning agent for session {session_id} with latest context")
+            trigger_agent_background(session_id, room)
+
+    except Exception as e:
+        print(f"Error in agent run task: {e}")
+        scheduler.release(session_id)
+
 def trigger_agent_background(session_id: str, room: str):
     """
     Background task to trigger Janitor AI agent
     Uses new agent_manager for proper orchestration
     """
     try:
-        success, response_text, error = agent_manager.trigger_agent(session_id)
+        success, response_text, error = run_blocking(agent_manager.trigger_agent, session_id)
         
         if success:
             # Generate TTS audio for agent response
             try:
-                audio_bytes = stream_tts(response_text)
+                audio_bytes = get_bank_audio(response_text) or run_blocking(stream_tts_parallel, response_text)
                 audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
                 
                 socketio.emit('agent_response', {
@@ -935,8 +1234,8 @@ def handle_trigger_agent(data):
             emit('agent_response', {'error': 'No session found'})
             return
         
-        # Trigger agent using background task
-        socketio.start_background_task(trigger_agent_background, session_id, room)
+        # Trigger agent using background task (coalesced if one is already running)
+        request_agent_run(session_id, room)
         
         # Immediately acknowledge
         emit('agent_triggered', {'session_id': session_id})
@@ -983,6 +1282,17 @@ def handle_update_phase(data):
 if __name__ == '__main__':
     # Initialize profile system
     profile_manager.init_profiles()
+
+    # Open keep-alive connections to the LLM before the first agent turn
+    agent_manager.start_llm_client()
+
+    # VAD needs ffmpeg for the browser's webm/opus chunks
+    check_ffmpeg()
+
+    # Pre-render fallback lines so the degraded path needs no live TTS (real thread:
+    # the TTS calls block)
+    threading.Thread(target=warm_audio_bank, args=(agent_manager.get_bank_lines(),),
+                     name="audio-bank-warm", daemon=True).start()
     
     # Clean up any leftover session files from previous runs
     # MVP: Delete ALL old sessions on startup (fresh start)
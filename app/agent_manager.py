@@ -1,14 +1,30 @@
 """
 Agent Manager for Janitor AI Host
 Handles LLM calls, prompt building, and response management
-No streaming - waits for complete responses
+Blocking calls wait for complete responses; the streaming path hands out
+sentences as soon as the LLM finishes them
 """
+import os
+import re
 import time
 import json
+import heapq
+import queue
+import threading
 import requests
-from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
+from app import sse
+
+try:
+    import anthropic
+except ImportError:  # Claude hedging is optional
+    anthropic = None
+
 # Agent configuration
 JANITOR_AI_URL = "https://janitorai.com/hackathon/completions"
 JANITOR_AI_KEY = "calhacks2047"
@@ -17,12 +33,67 @@ JANITOR_AI_KEY = "calhacks2047"
 MAX_TURNS_IN_PROMPT = 12  # Maximum conversation turns to include in prompt (captures ~15 seconds of conversation)
 SUMMARY_MAX_TOKENS = 250  # Target summary length
 REPLY_MAX_CHARS = 300  # Maximum characters in agent reply (shorter for faster, punchier responses)
+REPLY_MAX_SENTENCES = 2  # Generation is cancelled once this many sentences have arrived
 CONNECT_TIMEOUT = 3  # Connection timeout in seconds
 READ_TIMEOUT = 20  # Read timeout in seconds
 MAX_RETRIES = 2  # Number of retry attempts
 BACKOFF_MS = [400, 800]  # Backoff delays in milliseconds
 AGENT_COOLDOWN_SEC = 15  # Minimum seconds between agent responses (increased to reduce frequency)
 
+# Connection pool for the completions endpoint
+LLM_POOL_CONNECTIONS = 2  # Number of host pools to keep (one per upstream host)
+LLM_POOL_MAXSIZE = 8  # Keep-alive connections kept open per host
+LLM_WARM_CONNECTIONS = 2  # Connections opened ahead of time when warming
+LLM_IDLE_REWARM_SEC = 45  # Re-warm the pool after this long without traffic
+
+# Cross-session LLM dispatch
+LLM_MAX_CONCURRENCY = 4  # Completions in flight at once across all sessions
+LLM_RATE_PER_SEC = 2.0  # Token bucket refill rate (requests per second)
+LLM_RATE_BURST = 4  # Token bucket capacity
+LLM_QUEUE_TIMEOUT_SEC = 8  # Longest a request waits for a slot before falling back
+LLM_RATE_LIMIT_PAUSE_SEC = 2.0  # Dispatch pause after the provider returns 429
+LLM_SUPERSEDED = "Superseded by newer turn"  # Error for requests dropped as obsolete
+
+# Adaptive deadlines and circuit breaker
+LLM_LATENCY_WINDOW = 50  # Recent successful request latencies kept for percentiles
+LLM_MIN_LATENCY_SAMPLES = 5  # Use READ_TIMEOUT until this many latencies are known
+LLM_DEADLINE_PERCENTILE = 95  # Per-attempt deadline is based on this latency percentile
+LLM_DEADLINE_HEADROOM = 1.5  # ...times this factor, clamped to [LLM_MIN_ATTEMPT_SEC, READ_TIMEOUT]
+LLM_MIN_ATTEMPT_SEC = 4  # Shortest per-attempt deadline
+LLM_REQUEST_BUDGET_SEC = 15  # Total time send_to_llm may spend across all retries
+LLM_BREAKER_WINDOW = 20  # Recent outcomes the error rate is computed over
+LLM_BREAKER_MIN_CALLS = 6  # Outcomes needed before the breaker can trip
+LLM_BREAKER_ERROR_RATE = 0.5  # Trip when this share of recent calls failed
+LLM_BREAKER_COOLDOWN_SEC = 20  # Time open before a half-open probe is let through
+LLM_CIRCUIT_OPEN = "Circuit open"  # Error for calls rejected by the breaker
+
+# Multi-provider hedging
+CLAUDE_MODEL = os.getenv('CLAUDE_MODEL', "claude-sonnet-4-5-20250929")
+LLM_STUB = os.getenv('LLM_STUB', 'false').lower() == 'true'  # Offline stub providers instead of real APIs
+LLM_HEDGE_PERCENTILE = 90  # Start the next provider once the current one passes this latency percentile
+LLM_HEDGE_DEFAULT_DELAY_SEC = 4.0  # Hedge delay until a provider has LLM_MIN_LATENCY_SAMPLES latencies
+LLM_HEDGE_MIN_DELAY_SEC = 1.0  # Never hedge sooner than this
+LLM_CANCELLED = "Cancelled by faster provider"  # Error returned by the losing provider
+
+# Rolling summary of turns that fell out of the prompt window
+SUMMARY_BATCH_TURNS = 8  # Fold evicted turns once this many are waiting...
+SUMMARY_IDLE_SEC = 10  # ...or sooner once the conversation pauses this long
+SUMMARY_MAX_BATCH_TURNS = 40  # Most turns folded in one summarizer call
+SUMMARY_CHECK_SEC = 2  # Summarizer wake-up interval
+SUMMARY_RETRY_SEC = 30  # Back-off after a failed summarizer call
+
+# Speculative replies (off unless enable_speculation() is called)
+SPECULATIVE_LEAD_SEC = 4  # Start generating this long before the cooldown ends
+SPECULATIVE_MAX_NEW_TURNS = 3  # Candidate is stale once this many lines arrived after it was built
+SPECULATIVE_MAX_AGE_SEC = 30  # ...or once it is this old
+SPECULATIVE_JOIN_SEC = 5  # A trigger waits this long for a candidate still generating
+
+# Streaming replies
+MIN_SENTENCE_CHARS = 20  # Shorter sentences are merged into the next one before TTS
+
+# Sentence boundary: terminal punctuation plus closing quotes/brackets, followed by whitespace
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*(?=\s)')
+
 
 AGENT_RULES = """You are 'Lana,' a warm, observant, sarcasticdating show host who helps people connect. Be brief (1-2 sentences MAXIMUM). No emojis.
 
@@ -83,7 +154,41 @@ Style 5 (Awkward moment - playful): "Okay, that got quiet fast. Let's shake thin
 1-2 sentences MAX. Reference their ACTUAL words. Rotate between different approaches."""
 
 # Track agent state per session
-_agent_state = {}  # session_id -> {'busy': bool, 'last_call': timestamp}
+_agent_state = {}  # session_id -> {'busy': bool, 'last_call': timestamp, 'last_reply': timestamp}
+
+# Incrementally maintained prompt context per session
+_prompt_contexts = {}  # session_id -> _PromptContext
+
+# Incrementally maintained trigger state per session
+_trigger_states = {}  # session_id -> _TriggerState
+
+# Guards a session's prompt context and trigger state, which the transcript
+# listener, agent worker threads and the summarizer all touch
+_session_locks = {}  # session_id -> threading.RLock
+_session_locks_guard = threading.Lock()
+
+# Speakers whose lines are never quoted back to the LLM
+PROMPT_SKIP_SPEAKERS = ['janitor', 'agent', 'ai', 'lana']
+
+# Speaker labels the agent's own lines are stored under
+AGENT_SPEAKERS = ['janitor', 'agent', 'ai']
+
+# Trigger rules
+TRIGGER_MIN_TURNS = 3  # No trigger before this many transcript lines
+TRIGGER_TURNS_SINCE_AGENT = 10  # Trigger after this many user turns without the agent
+TRIGGER_RECENT_LINES = 3  # Lines checked for trigger keywords
+TRIGGER_PATTERNS = [
+    '?',  # Questions
+    'awkward',
+    'help',
+    'advice',
+    'janitor',
+    'host'
+]
+_TRIGGER_MATCHER = re.compile('|'.join(re.escape(p) for p in TRIGGER_PATTERNS), re.IGNORECASE)
+
+CONTEXT_INSTRUCTION = """Recent conversation:
+The conversation below is what the users JUST said. Pay attention and reference it directly."""
 
 # Fallback responses for errors
 FALLBACK_RESPONSES = [
@@ -94,6 +199,467 @@ FALLBACK_RESPONSES = [
     "This is going well! B, what's something you're passionate about?"
 ]
 
+# Other fixed lines the host may speak; pre-rendered alongside the fallbacks
+STOCK_LINES: List[str] = []
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 if empty)"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker for the completions endpoint.
+
+    Closed: calls go through and their outcomes are recorded. Once at least
+    LLM_BREAKER_MIN_CALLS outcomes are known and the failure share of the last
+    LLM_BREAKER_WINDOW reaches LLM_BREAKER_ERROR_RATE, the breaker opens and
+    calls are rejected without touching the network. After
+    LLM_BREAKER_COOLDOWN_SEC a single half-open probe is let through; success
+    closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, window: int = LLM_BREAKER_WINDOW, min_calls: int = LLM_BREAKER_MIN_CALLS,
+                 error_rate: float = LLM_BREAKER_ERROR_RATE, cooldown: float = LLM_BREAKER_COOLDOWN_SEC):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+
+        self.state = 'closed'  # closed, open, half_open
+        self._outcomes = deque(maxlen=window)  # True = success
+        self._opened_at = 0.0
+        self._probe_started = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {'trips': 0, 'rejected': 0, 'probes': 0}
+
+    def rejecting(self) -> bool:
+        """True while open and still cooling down (a call now would be rejected)"""
+        with self._lock:
+            return self.state == 'open' and time.time() - self._opened_at < self.cooldown
+
+    def allow(self) -> bool:
+        """
+        Ask to make one call; every allowed call must be followed by record()
+
+        Returns:
+            True if the call may go ahead
+        """
+        with self._lock:
+            if self.state == 'closed':
+                return True
+
+            now = time.time()
+            if self.state == 'open':
+                if now - self._opened_at < self.cooldown:
+                    self.stats['rejected'] += 1
+                    return False
+                self.state = 'half_open'
+                print("🔌 LLM circuit half-open - sending probe")
+
+            # Half-open: one probe at a time (a lost probe is replaced after a cooldown)
+            if self._probe_in_flight and now - self._probe_started < self.cooldown:
+                self.stats['rejected'] += 1
+                return False
+            self._probe_in_flight = True
+            self._probe_started = now
+            self.stats['probes'] += 1
+            return True
+
+    def record(self, success: bool):
+        """Record the outcome of an allowed call"""
+        with self._lock:
+            if self.state == 'half_open':
+                self._probe_in_flight = False
+                if success:
+                    self.state = 'closed'
+                    self._outcomes.clear()
+                    print("🔌 LLM circuit closed - provider recovered")
+                else:
+                    self._trip()
+                return
+
+            if self.state == 'open':
+                return  # Late result from a call started before the trip
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+                self._trip()
+
+    def _trip(self):
+        self.state = 'open'
+        self._opened_at = time.time()
+        self._outcomes.clear()
+        self.stats['trips'] += 1
+        print(f"🔌 LLM circuit open - failing fast for {self.cooldown:.0f}s")
+
+    def get_stats(self) -> Dict:
+        """Breaker state and counters"""
+        with self._lock:
+            outcomes = list(self._outcomes)
+            state = self.state
+
+        return {
+            **self.stats,
+            'state': state,
+            'error_rate': outcomes.count(False) / len(outcomes) if outcomes else 0
+        }
+
+
+class LLMClient:
+    """
+    Shared keep-alive HTTP client for the JanitorAI completions endpoint.
+
+    Keeps a tuned urllib3 connection pool so agent turns reuse an open
+    TLS connection instead of paying DNS, TCP and TLS setup each time.
+    The pool is warmed at startup and re-warmed by a background thread
+    whenever it has been idle longer than LLM_IDLE_REWARM_SEC.
+
+    Callers report each request's outcome with record_result(); recent
+    latencies drive attempt_timeout() and failures feed the circuit breaker.
+    """
+
+    def __init__(self, url: str = JANITOR_AI_URL, api_key: str = JANITOR_AI_KEY):
+        self.url = url
+        parts = urlsplit(url)
+        self.warm_url = f"{parts.scheme}://{parts.netloc}/"
+
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(
+            pool_connections=LLM_POOL_CONNECTIONS,
+            pool_maxsize=LLM_POOL_MAXSIZE,
+            max_retries=0  # send_to_llm owns retry policy
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Connection": "keep-alive"
+        })
+
+        self.last_used = 0.0
+        self.requests_sent = 0
+        self.warmups = 0
+        self.warmup_failures = 0
+        self._keepalive_thread = None
+        self._lock = threading.Lock()
+
+        self.breaker = CircuitBreaker()
+        self._latencies = deque(maxlen=LLM_LATENCY_WINDOW)  # Seconds per successful request
+
+    def attempt_timeout(self) -> float:
+        """
+        Deadline for one attempt, from recent latencies
+
+        Returns:
+            LLM_DEADLINE_PERCENTILE latency times LLM_DEADLINE_HEADROOM, clamped to
+            [LLM_MIN_ATTEMPT_SEC, READ_TIMEOUT]; READ_TIMEOUT until enough samples exist
+        """
+        with self._lock:
+            samples = sorted(self._latencies)
+
+        if len(samples) < LLM_MIN_LATENCY_SAMPLES:
+            return READ_TIMEOUT
+
+        deadline = _percentile(samples, LLM_DEADLINE_PERCENTILE) * LLM_DEADLINE_HEADROOM
+        return max(LLM_MIN_ATTEMPT_SEC, min(READ_TIMEOUT, deadline))
+
+    def record_result(self, success: bool, latency: Optional[float] = None):
+        """
+        Report one request's outcome
+
+        Args:
+            success: False for timeouts, connection errors and 5xx responses
+            latency: Seconds the request took (successful requests only)
+        """
+        if success and latency is not None:
+            with self._lock:
+                self._latencies.append(latency)
+        self.breaker.record(success)
+
+    def post(self, payload: Dict, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), stream: bool = False) -> requests.Response:
+        """POST a completion request over the pooled session"""
+        with self._lock:
+            self.requests_sent += 1
+            self.last_used = time.time()
+        return self.session.post(self.url, data=encode_payload(payload), timeout=timeout, stream=stream)
+
+    def warm(self, connections: int = LLM_WARM_CONNECTIONS):
+        """Open keep-alive connections ahead of the next completion request"""
+        def _open():
+            try:
+                self.session.head(self.warm_url, timeout=(CONNECT_TIMEOUT, CONNECT_TIMEOUT))
+                with self._lock:
+                    self.warmups += 1
+            except requests.exceptions.RequestException as e:
+                with self._lock:
+                    self.warmup_failures += 1
+                print(f"LLM pool warm-up failed: {e}")
+
+        # Concurrent requests force the pool to hold several open connections
+        workers = [threading.Thread(target=_open, daemon=True) for _ in range(max(1, connections))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.last_used = time.time()
+
+    def start_keepalive(self):
+        """Warm now and keep the pool warm across idle periods (background thread)"""
+        if self._keepalive_thread and self._keepalive_thread.is_alive():
+            return
+
+        def _loop():
+            self.warm()
+            while True:
+                idle = time.time() - self.last_used
+                if idle >= LLM_IDLE_REWARM_SEC:
+                    self.warm()
+                    idle = 0
+                time.sleep(max(1.0, LLM_IDLE_REWARM_SEC - idle))
+
+        self._keepalive_thread = threading.Thread(target=_loop, name="llm-keepalive", daemon=True)
+        self._keepalive_thread.start()
+
+    def get_stats(self) -> Dict:
+        """Connection reuse metrics for the completions host"""
+        host = urlsplit(self.url).hostname
+        new_connections = 0
+        pooled_requests = 0
+
+        # requests keys pools by TLS settings too, so sum every pool for the host
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None and pool.host == host:
+                new_connections += pool.num_connections
+                pooled_requests += pool.num_requests
+
+        reused = max(0, pooled_requests - new_connections)
+
+        with self._lock:
+            latencies = sorted(self._latencies)
+
+        return {
+            'requests': self.requests_sent,
+            'warmups': self.warmups,
+            'warmup_failures': self.warmup_failures,
+            'pooled_requests': pooled_requests,
+            'new_connections': new_connections,
+            'reused_connections': reused,
+            'reuse_rate': reused / pooled_requests if pooled_requests else 0,
+            'idle_seconds': time.time() - self.last_used if self.last_used else None,
+            'latency_p50_ms': _percentile(latencies, 50) * 1000,
+            'latency_p95_ms': _percentile(latencies, 95) * 1000,
+            'attempt_timeout_sec': self.attempt_timeout(),
+            'breaker': self.breaker.get_stats()
+        }
+
+
+_llm_client: Optional[LLMClient] = None
+
+
+def get_llm_client() -> LLMClient:
+    """Get the process-wide JanitorAI client"""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient()
+    return _llm_client
+
+
+def start_llm_client():
+    """Warm the LLM connection pool at startup and keep it warm"""
+    get_llm_client().start_keepalive()
+    print("🔥 LLM connection pool warming in background")
+
+
+def get_llm_client_stats() -> Dict:
+    """Get connection reuse metrics for the shared LLM client"""
+    return get_llm_client().get_stats()
+
+
+class _DispatchTicket:
+    """One queued LLM request waiting for a dispatch slot"""
+
+    def __init__(self, session_id: str, turn: int, stale_since: float, seq: int):
+        self.session_id = session_id
+        self.turn = turn  # Transcript length the request was built from
+        self.stale_since = stale_since  # When the agent last replied in this conversation
+        self.seq = seq
+        self.enqueued_at = time.time()
+        self.state = 'queued'  # queued, granted, superseded, expired, done
+
+    def __lt__(self, other):
+        # Conversation the agent has ignored longest first, FIFO within a tie
+        return (self.stale_since, self.seq) < (other.stale_since, other.seq)
+
+
+class LLMDispatcher:
+    """
+    Central gate for LLM calls across all sessions.
+
+    Callers acquire a ticket before calling the provider and release it
+    afterwards. Tickets are granted in order of conversation staleness
+    (time since the agent last replied, from the staleness callable),
+    subject to a concurrency limit and a token-bucket rate limit. A newer
+    request from the same session supersedes a queued older one (which is
+    dropped) and inherits its place in line. A 429 pauses dispatch for
+    everyone instead of turning every queued request into a fallback.
+
+    acquire blocks on a threading.Condition, so call it from a real thread,
+    never from an eventlet greenlet.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 rate_per_sec: float = LLM_RATE_PER_SEC, burst: int = LLM_RATE_BURST,
+                 staleness: Optional[Callable[[str], float]] = None):
+        self.max_concurrency = max_concurrency
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.staleness = staleness  # session_id -> timestamp; None ranks by enqueue time
+
+        self._cond = threading.Condition()
+        self._heap: List[_DispatchTicket] = []
+        self._queued: Dict[str, _DispatchTicket] = {}  # session_id -> queued ticket
+        self._in_flight = 0
+        self._tokens = float(burst)
+        self._last_refill = time.time()
+        self._paused_until = 0.0
+        self._seq = 0
+
+        self._waits = deque(maxlen=200)  # Recent queue wait times (seconds)
+        self.stats = {'granted': 0, 'superseded': 0, 'expired': 0, 'rate_limited': 0}
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_per_sec)
+        self._last_refill = now
+
+    def _top(self) -> Optional[_DispatchTicket]:
+        """Head of the queue, discarding tickets that already left it"""
+        while self._heap and self._heap[0].state != 'queued':
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def acquire(self, session_id: str, turn: int = 0, timeout: float = LLM_QUEUE_TIMEOUT_SEC) -> _DispatchTicket:
+        """
+        Wait for a dispatch slot
+        
+        Args:
+            session_id: Session the request is for
+            turn: Transcript length the prompt was built from
+            timeout: Seconds to wait before giving up
+            
+        Returns:
+            Ticket whose state is 'granted' (call release when done),
+            'superseded' (a newer turn replaced it) or 'expired' (timed out)
+        """
+        deadline = time.time() + timeout
+
+        stale_since = self.staleness(session_id) if self.staleness else time.time()
+
+        with self._cond:
+            previous = self._queued.get(session_id)
+            if previous is not None:
+                # Newer turn makes the queued request obsolete; keep its place in line
+                previous.state = 'superseded'
+                self.stats['superseded'] += 1
+                stale_since = min(stale_since, previous.stale_since)
+
+            self._seq += 1
+            ticket = _DispatchTicket(session_id, turn, stale_since, self._seq)
+            self._queued[session_id] = ticket
+            heapq.heappush(self._heap, ticket)
+            self._cond.notify_all()
+
+            while True:
+                if ticket.state == 'superseded':
+                    print(f"⏭️ LLM request for {session_id} superseded by a newer turn")
+                    return ticket
+
+                now = time.time()
+                self._refill(now)
+                if (self._top() is ticket and self._in_flight < self.max_concurrency
+                        and now >= self._paused_until and self._tokens >= 1):
+                    heapq.heappop(self._heap)
+                    self._queued.pop(session_id, None)
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    ticket.state = 'granted'
+                    self._waits.append(now - ticket.enqueued_at)
+                    self.stats['granted'] += 1
+                    self._cond.notify_all()  # Next in line may now be eligible
+                    return ticket
+
+                if now >= deadline:
+                    ticket.state = 'expired'
+                    if self._queued.get(session_id) is ticket:
+                        del self._queued[session_id]
+                    self.stats['expired'] += 1
+                    self._cond.notify_all()
+                    print(f"⌛ LLM request for {session_id} expired after {now - ticket.enqueued_at:.1f}s in queue")
+                    return ticket
+
+                # Wake for releases, new tickets, or the next token refill
+                wait = deadline - now
+                if self._tokens < 1:
+                    wait = min(wait, (1 - self._tokens) / self.rate_per_sec)
+                if now < self._paused_until:
+                    wait = min(wait, self._paused_until - now)
+                self._cond.wait(max(0.01, wait))
+
+    def release(self, ticket: _DispatchTicket, rate_limited: bool = False):
+        """Return a slot; rate_limited=True pauses dispatch after a 429"""
+        with self._cond:
+            if ticket.state != 'granted':
+                return
+            ticket.state = 'done'
+            self._in_flight -= 1
+            if rate_limited:
+                self.stats['rate_limited'] += 1
+                self._paused_until = time.time() + LLM_RATE_LIMIT_PAUSE_SEC
+                self._tokens = 0
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        """Queue depth, in-flight count and wait-time metrics"""
+        with self._cond:
+            waits = sorted(self._waits)
+            depth = len(self._queued)
+            in_flight = self._in_flight
+
+        return {
+            **self.stats,
+            'queue_depth': depth,
+            'in_flight': in_flight,
+            'max_concurrency': self.max_concurrency,
+            'wait_avg_ms': sum(waits) / len(waits) * 1000 if waits else 0,
+            'wait_p95_ms': _percentile(waits, 95) * 1000,
+            'wait_max_ms': waits[-1] * 1000 if waits else 0
+        }
+
+
+_llm_dispatcher: Optional[LLMDispatcher] = None
+
+
+def get_llm_dispatcher() -> LLMDispatcher:
+    """Get the process-wide LLM dispatcher"""
+    global _llm_dispatcher
+    if _llm_dispatcher is None:
+        _llm_dispatcher = LLMDispatcher(staleness=_without_agent_since)
+    return _llm_dispatcher
+
+
+def get_dispatcher_stats() -> Dict:
+    """Get queue depth and wait-time metrics for the LLM dispatcher"""
+    return get_llm_dispatcher().get_stats()
+
 
 def _get_timestamp() -> str:
     """Get current ISO 8601 timestamp"""
@@ -198,6 +764,20 @@ def _is_agent_busy(session_id: str) -> bool:
     return False
 
 
+def _without_agent_since(session_id: str) -> float:
+    """
+    When the agent last spoke in this conversation (dispatch priority)
+
+    Background requests (":summary", ":speculative") rank as if they had
+    just been answered, so they queue behind every waiting conversation.
+    A session the agent has not answered yet counts from its first request.
+    """
+    if ':' in session_id:
+        return time.time()
+    state = _agent_state.setdefault(session_id, {})
+    return state.get('last_reply') or state.setdefault('first_request', time.time())
+
+
 def _set_agent_busy(session_id: str, busy: bool):
     """Set agent busy state"""
     if session_id not in _agent_state:
@@ -208,10 +788,485 @@ def _set_agent_busy(session_id: str, busy: bool):
         _agent_state[session_id]['last_call'] = time.time()
 
 
+def _encode_messages(messages: List[Dict]) -> bytes:
+    """JSON-encode a run of messages without the surrounding brackets"""
+    return json.dumps(messages).encode('utf-8')[1:-1]
+
+
+class PromptPayload(dict):
+    """
+    LLM payload whose first prefix_len messages are a stable per-session prefix.
+
+    The prefix (rules, personality, profile summary) only changes when a
+    profile is edited, so its JSON is encoded once and kept in prefix_bytes;
+    encode() serializes just the volatile suffix around it. Providers with
+    prompt caching can mark the end of the prefix as a cache breakpoint.
+    """
+
+    def __init__(self, *args, prefix_len: int = 0, prefix_bytes: bytes = b'', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefix_len = prefix_len
+        self.prefix_bytes = prefix_bytes
+
+    def with_options(self, **overrides) -> 'PromptPayload':
+        """Copy with top-level fields replaced (e.g. stream=True), keeping the prefix"""
+        return PromptPayload(self, prefix_len=self.prefix_len, prefix_bytes=self.prefix_bytes, **overrides)
+
+    def encode(self) -> bytes:
+        """Request body, reusing the pre-encoded prefix"""
+        head = json.dumps({k: v for k, v in self.items() if k != 'messages'}).encode('utf-8')[1:-1]
+        suffix = _encode_messages(self['messages'][self.prefix_len:])
+        messages = b', '.join(part for part in (self.prefix_bytes, suffix) if part)
+        return b'{' + head + (b', ' if head else b'') + b'"messages": [' + messages + b']}'
+
+
+def _payload_with(payload: Dict, **overrides) -> Dict:
+    """Copy a payload with top-level fields replaced, keeping any cached prefix"""
+    if isinstance(payload, PromptPayload):
+        return payload.with_options(**overrides)
+    return dict(payload, **overrides)
+
+
+def encode_payload(payload: Dict) -> bytes:
+    """Request body for a payload (PromptPayloads reuse their encoded prefix)"""
+    if isinstance(payload, PromptPayload):
+        return payload.encode()
+    return json.dumps(payload).encode('utf-8')
+
+
+class _PromptContext:
+    """
+    Prompt state for one session, updated as each transcript line is appended.
+
+    Holds the last MAX_TURNS_IN_PROMPT transcript entries already cleaned,
+    a cached profile summary and a rolling awkwardness count, so building
+    the payload on the trigger path only returns what is already rendered.
+    """
+
+    def __init__(self):
+        # (speaker_role, cleaned_text, is_awkward), or None for skipped entries
+        self.lines = deque(maxlen=MAX_TURNS_IN_PROMPT)
+        self.awkward_lines = 0
+        self.transcript_len = 0
+        self.profile_version = None
+        self.names = {'A': 'User A', 'B': 'User B'}
+        self.profile_summary = ""
+        self.summary = ""  # Rolling summary of turns older than the window
+        self.prefix = []  # Stable leading messages, rebuilt on profile edits
+        self.prefix_bytes = b''  # JSON of self.prefix, encoded once
+        self.payload = None  # Rendered payload, None when stale
+
+    def append(self, entry: Dict):
+        """Push one transcript entry, evicting the oldest if full"""
+        if len(self.lines) == self.lines.maxlen:
+            evicted = self.lines[0]
+            if evicted and evicted[2]:
+                self.awkward_lines -= 1
+
+        speaker_role = entry.get('speaker', 'Unknown')
+        text = _clean_text(entry.get('text', ''))
+
+        if not text or speaker_role.lower() in PROMPT_SKIP_SPEAKERS:
+            self.lines.append(None)
+        else:
+            is_awkward = 'awkward' in text.lower()
+            if is_awkward:
+                self.awkward_lines += 1
+            self.lines.append((speaker_role, text, is_awkward))
+
+        self.transcript_len += 1
+        self.payload = None
+
+    def rebuild(self, transcript: List[Dict]):
+        """Reset from a full transcript (cold start or out-of-band edits)"""
+        self.lines.clear()
+        self.awkward_lines = 0
+        for entry in transcript[-MAX_TURNS_IN_PROMPT:]:
+            self.append(entry)
+        self.transcript_len = len(transcript)
+        self.payload = None
+
+    def refresh_profiles(self, session_id: str, version: int) -> bool:
+        """Rebuild the cached profile summary after a profile edit"""
+        from app import profile_manager
+
+        profiles = profile_manager.get_both_profiles(session_id)
+        profile_a = profiles.get('A')
+        profile_b = profiles.get('B')
+
+        if not profile_a or not profile_b:
+            return False
+
+        self.names = {
+            'A': profile_a.get('name', 'User A'),
+            'B': profile_b.get('name', 'User B')
+        }
+        self.profile_summary = f"""About the participants:
+- {self.names['A']}: Interested in {', '.join(profile_a.get('interests', [])[:2]) or 'conversation'}
+- {self.names['B']}: Interested in {', '.join(profile_b.get('interests', [])[:2]) or 'conversation'}
+
+Your task: Listen to their recent conversation and ask a relevant follow-up question."""
+        self.prefix = [
+            {"role": "system", "content": AGENT_RULES},
+            {"role": "system", "content": AGENT_PERSONALITY_SEXY},
+            {"role": "system", "content": self.profile_summary}
+        ]
+        self.prefix_bytes = _encode_messages(self.prefix)
+        self.profile_version = version
+        self.payload = None
+        return True
+
+    def set_summary(self, summary: str):
+        """Use a new rolling summary, trimmed to SUMMARY_MAX_TOKENS"""
+        summary = _trim_to_tokens(summary or "", SUMMARY_MAX_TOKENS)
+        if summary != self.summary:
+            self.summary = summary
+            self.payload = None
+
+    def render(self) -> Optional[Dict]:
+        """Render and cache the LLM payload from the current state"""
+        conversation_lines = [
+            f"{self.names.get(line[0], line[0])}: {line[1]}"
+            for line in self.lines if line
+        ]
+        if not conversation_lines:
+            return None
+
+        full_conversation = "\n".join(conversation_lines)
+
+        if self.awkward_lines > 0:
+            prompt_instruction = f"Here's what they just said:\n\n{full_conversation}\n\nThe conversation seems a bit awkward. Respond as Lana with a playful, lightly sarcastic comment to break the tension, then redirect to an easier topic. Use their actual names."
+        else:
+            prompt_instruction = f"Here's what they just said:\n\n{full_conversation}\n\nNow respond as Lana. Vary your style - don't repeat the same format as last time. Use their actual names (not User A/B). Help them connect by referencing what they discussed."
+
+        # Stable prefix first so provider-side prompt caches can match it
+        messages = list(self.prefix)
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary so far: {self.summary}"})
+        messages.append({"role": "system", "content": CONTEXT_INSTRUCTION})
+        messages.append({"role": "user", "content": prompt_instruction})
+
+        self.payload = PromptPayload(
+            {
+                "model": "ignored",
+                "messages": messages,
+                "max_tokens": 200,  # Keep responses concise
+                "stream": False  # Explicitly disable streaming
+            },
+            prefix_len=len(self.prefix),
+            prefix_bytes=self.prefix_bytes
+        )
+        return self.payload
+
+
+def _session_lock(session_id: str) -> threading.RLock:
+    """Lock for a session's _prompt_contexts and _trigger_states entries"""
+    with _session_locks_guard:
+        lock = _session_locks.get(session_id)
+        if lock is None:
+            lock = _session_locks[session_id] = threading.RLock()
+        return lock
+
+
+def _get_prompt_context(session_id: str, session: Dict) -> _PromptContext:
+    """
+    Get the prompt context for a session, resyncing if the transcript moved
+    underneath it (hold _session_lock while using it)
+    """
+    ctx = _prompt_contexts.get(session_id)
+    if ctx is None:
+        ctx = _PromptContext()
+        _prompt_contexts[session_id] = ctx
+
+    transcript = session.get('transcript', [])
+    if ctx.transcript_len != len(transcript):
+        ctx.rebuild(transcript)
+
+    ctx.set_summary(session.get('summary', ''))
+    return ctx
+
+
+def _approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return (len(text) + 3) // 4
+
+
+def _trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, at a sentence end where possible"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    ends = [m.end() for m in _SENTENCE_END.finditer(cut)]
+    return cut[:ends[-1]] if ends else cut.rsplit(' ', 1)[0]
+
+
+SUMMARY_INSTRUCTION = """You keep running notes on a live dating-show conversation for the host, Lana.
+Merge the new lines into the existing notes. Keep names, facts each person shared (hobbies, plans, preferences, stories), topics already covered, and the overall mood.
+Write plain prose with no lists or labels, under {words} words."""
+
+
+class _Summarizer:
+    """
+    Background worker that folds turns evicted from the prompt window into
+    session['summary'].
+
+    The transcript listener only records when a session last grew; the
+    worker thread wakes every SUMMARY_CHECK_SEC and summarizes a session once
+    SUMMARY_BATCH_TURNS turns have fallen out of the last MAX_TURNS_IN_PROMPT,
+    or fewer if the conversation has paused for SUMMARY_IDLE_SEC. Each call
+    sends the previous summary plus the new turns, so cost stays flat no
+    matter how long the date runs.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._last_append: Dict[str, float] = {}  # session_id -> time of newest transcript line
+        self._retry_at: Dict[str, float] = {}  # session_id -> earliest retry after a failure
+        self._thread = None
+        self.stats = {'runs': 0, 'turns_folded': 0, 'failures': 0}
+
+    def notify(self, session_id: str):
+        """Record a transcript append (called on the hot path - no I/O)"""
+        with self._cond:
+            self._last_append[session_id] = time.time()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="summarizer", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(SUMMARY_CHECK_SEC)
+            with self._cond:
+                candidates = list(self._last_append.items())
+            for session_id, last_append in candidates:
+                try:
+                    self._maybe_summarize(session_id, time.time() - last_append)
+                except Exception as e:
+                    print(f"Summarizer error for {session_id}: {e}")
+
+    def _forget(self, session_id: str):
+        with self._cond:
+            self._last_append.pop(session_id, None)
+            self._retry_at.pop(session_id, None)
+
+    def _maybe_summarize(self, session_id: str, idle: float):
+        from app import session_manager
+
+        if time.time() < self._retry_at.get(session_id, 0):
+            return
+
+        session = session_manager.load_session(session_id)
+        if not session or session.get('status') == 'ended':
+            self._forget(session_id)
+            return
+
+        transcript = session.get('transcript', [])
+        done = session.get('summarized_turns', 0)
+        evicted = len(transcript) - MAX_TURNS_IN_PROMPT
+        pending = evicted - done
+
+        if pending <= 0:
+            if idle >= SUMMARY_IDLE_SEC:
+                self._forget(session_id)  # Nothing to fold until the next append
+            return
+        if pending < SUMMARY_BATCH_TURNS and idle < SUMMARY_IDLE_SEC:
+            return
+
+        end = min(evicted, done + SUMMARY_MAX_BATCH_TURNS)
+        with _session_lock(session_id):
+            ctx = _prompt_contexts.get(session_id)
+            names = dict(ctx.names) if ctx else {}
+        summary = _fold_summary(session_id, session.get('summary', ''), transcript[done:end], names)
+
+        if summary is None:
+            self.stats['failures'] += 1
+            self._retry_at[session_id] = time.time() + SUMMARY_RETRY_SEC
+            return
+
+        session_manager.update_summary(session_id, summary, summarized_turns=end)
+        self.stats['runs'] += 1
+        self.stats['turns_folded'] += end - done
+        print(f"🧾 Folded {end - done} turn(s) into summary for {session_id} (~{_approx_tokens(summary)} tokens)")
+
+        with _session_lock(session_id):
+            ctx = _prompt_contexts.get(session_id)
+            if ctx is not None:
+                ctx.set_summary(summary)
+
+
+def _fold_summary(session_id: str, previous: str, entries: List[Dict], names: Dict[str, str]) -> Optional[str]:
+    """
+    Ask the LLM to merge transcript entries into the running summary
+
+    Returns:
+        New summary trimmed to SUMMARY_MAX_TOKENS, or None on failure
+    """
+    lines = []
+    for entry in entries:
+        speaker = entry.get('speaker', 'Unknown')
+        text = _clean_text(entry.get('text', ''))
+        if not text:
+            continue
+        label = 'Lana' if speaker.lower() in PROMPT_SKIP_SPEAKERS else names.get(speaker, speaker)
+        lines.append(f"{label}: {text}")
+
+    if not lines:
+        return previous  # Only empty lines - advance without a call
+
+    payload = {
+        "model": "ignored",
+        "messages": [
+            {"role": "system", "content": SUMMARY_INSTRUCTION.format(words=SUMMARY_MAX_TOKENS * 3 // 4)},
+            {"role": "user", "content": f"Existing notes:\n{previous or '(none yet)'}\n\nNew lines:\n" + "\n".join(lines)}
+        ],
+        "max_tokens": SUMMARY_MAX_TOKENS,
+        "stream": False
+    }
+
+    # Background work waits its turn like any other request
+    dispatcher = get_llm_dispatcher()
+    ticket = dispatcher.acquire(f"{session_id}:summary")
+    if ticket.state != 'granted':
+        return None
+
+    client = get_llm_client()
+    rate_limited = False
+    try:
+        if not client.breaker.allow():
+            return None
+        try:
+            response = client.post(payload, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        except requests.exceptions.RequestException as e:
+            client.record_result(False)
+            print(f"Summary request failed: {e}")
+            return None
+
+        client.record_result(response.status_code < 500)
+        rate_limited = response.status_code == 429
+        if response.status_code != 200:
+            print(f"Summary request failed (status: {response.status_code})")
+            return None
+
+        summary = _clean_text(sse.parse_sse_text(response.text))
+        return _trim_to_tokens(summary, SUMMARY_MAX_TOKENS) if summary else None
+    finally:
+        dispatcher.release(ticket, rate_limited=rate_limited)
+
+
+_summarizer = _Summarizer()
+
+
+def get_summarizer_stats() -> Dict:
+    """Get rolling-summary worker counters"""
+    return dict(_summarizer.stats)
+
+
+class _TriggerState:
+    """
+    Trigger bookkeeping for one session, updated as each line is appended.
+
+    Tracks turns since the last agent line, the last speaker and which of
+    the last three lines matched a trigger keyword, so should_trigger_agent
+    decides in O(1) instead of rescanning the transcript per chunk.
+    """
+
+    def __init__(self):
+        self.transcript_len = 0
+        self.turns_since_agent = 0
+        self.agent_messages = 0
+        self.last_speaker = ""
+        self.recent_hits = deque(maxlen=TRIGGER_RECENT_LINES)  # Matched keyword or None, per line
+
+    def append(self, entry: Dict):
+        """Fold in one transcript entry (keyword matcher runs over its text only)"""
+        speaker = entry.get('speaker', '')
+        if speaker.lower() in AGENT_SPEAKERS:
+            self.turns_since_agent = 0
+            self.agent_messages += 1
+        else:
+            self.turns_since_agent += 1
+
+        match = _TRIGGER_MATCHER.search(entry.get('text', ''))
+        self.recent_hits.append(match.group(0).lower() if match else None)
+        self.last_speaker = speaker
+        self.transcript_len += 1
+
+    def rebuild(self, transcript: List[Dict]):
+        """Reset from a full transcript (cold start or out-of-band edits)"""
+        self.__init__()
+        for entry in transcript:
+            self.append(entry)
+
+    def keyword(self) -> Optional[str]:
+        """First trigger keyword among the recent lines, if any"""
+        for hit in self.recent_hits:
+            if hit:
+                return hit
+        return None
+
+
+def _get_trigger_state(session_id: str, session: Dict) -> _TriggerState:
+    """
+    Get the trigger state for a session, resyncing if the transcript moved
+    underneath it (hold _session_lock while using it)
+    """
+    state = _trigger_states.get(session_id)
+    if state is None:
+        state = _TriggerState()
+        _trigger_states[session_id] = state
+
+    transcript = session.get('transcript', [])
+    if state.transcript_len != len(transcript):
+        state.rebuild(transcript)
+
+    return state
+
+
+def _on_transcript_appended(session_id: str, entry: Dict):
+    """Session listener: fold a new transcript line into the trigger state and prompt context"""
+    from app import session_manager, profile_manager
+
+    session = session_manager.load_session(session_id)
+    with _session_lock(session_id):
+        if not session or session.get('status') == 'ended':
+            _prompt_contexts.pop(session_id, None)
+            _trigger_states.pop(session_id, None)
+            return
+
+        state = _trigger_states.get(session_id)
+        if state is None or state.transcript_len != len(session.get('transcript', [])) - 1:
+            _get_trigger_state(session_id, session)
+        else:
+            state.append(entry)
+
+        ctx = _prompt_contexts.get(session_id)
+        if ctx is None or ctx.transcript_len != len(session.get('transcript', [])) - 1:
+            # Unknown or out of sync - rebuild from the transcript (includes the new entry)
+            ctx = _get_prompt_context(session_id, session)
+        else:
+            ctx.append(entry)
+
+        # Render eagerly so the trigger path finds the payload ready
+        if session.get('status') == 'active':
+            version = profile_manager.get_profile_version(session_id)
+            if ctx.profile_version == version or ctx.refresh_profiles(session_id, version):
+                ctx.render()
+
+    _summarizer.notify(session_id)
+
+    if _speculator and session.get('status') == 'active':
+        _speculator.on_append(session_id, session, entry)
+
+
 def build_agent_prompt(session_id: str) -> Optional[Dict]:
     """
     Build complete prompt for Janitor AI from session data and profiles
     
+    The payload comes from the session's incrementally maintained prompt
+    context, so repeated calls between transcript appends return the same
+    cached dict. Treat it as read-only.
+    
     Args:
         session_id: Session ID
         
@@ -224,108 +1279,33 @@ def build_agent_prompt(session_id: str) -> Optional[Dict]:
         # Load session
         session = session_manager.load_session(session_id)
         if not session:
+            with _session_lock(session_id):
+                _prompt_contexts.pop(session_id, None)
             print(f"❌ Session {session_id} not found")
-            print(f"   Available sessions: {list(session_manager.sessions.keys())}")
             return None
 
         # Check if session is active (both users have joined)
         session_status = session.get('status', 'unknown')
         if session_status != 'active':
             print(f"⚠️ Session {session_id} is not active yet (status: {session_status})")
-            print(f"   Session has user_a: {'user_a' in session}, user_b: {'user_b' in session}")
-            return None
-
-        print(f"✅ Session {session_id} is active, building prompt...")
-
-        # Load profiles
-        profiles = profile_manager.get_both_profiles(session_id)
-        profile_a = profiles.get('A')
-        profile_b = profiles.get('B')
-
-        if not profile_a or not profile_b:
-            print(f"Profiles not found for session {session_id} (session may not be fully initialized)")
             return None
-        
-        # Build concise profile summary
-        profile_summary = f"""About the participants:
-- {profile_a.get('name', 'User A')}: Interested in {', '.join(profile_a.get('interests', [])[:2]) or 'conversation'}
-- {profile_b.get('name', 'User B')}: Interested in {', '.join(profile_b.get('interests', [])[:2]) or 'conversation'}
-
-Your task: Listen to their recent conversation and ask a relevant follow-up question."""
-
-        # Get transcript
-        transcript = session.get('transcript', [])
 
-        # Build conversation context instruction
-        context_instruction = """Recent conversation:
-The conversation below is what the users JUST said. Pay attention and reference it directly."""
-        
-        # Build messages array
-        messages = [
-            {"role": "system", "content": AGENT_RULES},
-            {"role": "system", "content": AGENT_PERSONALITY_SEXY},
-            {"role": "system", "content": profile_summary},
-            {"role": "system", "content": context_instruction}
-        ]
-        
-        # Add recent conversation turns (last MAX_TURNS_IN_PROMPT)
-        recent_transcript = transcript[-MAX_TURNS_IN_PROMPT:] if len(transcript) > MAX_TURNS_IN_PROMPT else transcript
+        with _session_lock(session_id):
+            ctx = _get_prompt_context(session_id, session)
 
-        # Build conversation as one coherent block for better context
-        conversation_lines = []
-        for entry in recent_transcript:
-            speaker_role = entry.get('speaker', 'Unknown')
-            text = _clean_text(entry.get('text', ''))
+            # Refresh cached profile summary only when a profile was edited
+            version = profile_manager.get_profile_version(session_id)
+            if ctx.profile_version != version and not ctx.refresh_profiles(session_id, version):
+                print(f"Profiles not found for session {session_id} (session may not be fully initialized)")
+                return None
 
-            if not text:
-                continue
-
-            # Skip previous AI messages (we only want user dialogue)
-            if speaker_role.lower() in ['janitor', 'agent', 'ai', 'lana']:
-                continue
-
-            # Get actual name instead of just "A" or "B"
-            if speaker_role == 'A':
-                speaker_name = profile_a.get('name', 'User A')
-            elif speaker_role == 'B':
-                speaker_name = profile_b.get('name', 'User B')
-            else:
-                speaker_name = speaker_role
-
-            conversation_lines.append(f"{speaker_name}: {text}")
-
-        # Add the full conversation as ONE user message for clarity
-        if conversation_lines:
-            full_conversation = "\n".join(conversation_lines)
-
-            # Check if "awkward" appears in conversation
-            is_awkward = 'awkward' in full_conversation.lower()
-
-            if is_awkward:
-                prompt_instruction = f"Here's what they just said:\n\n{full_conversation}\n\nThe conversation seems a bit awkward. Respond as Lana with a playful, lightly sarcastic comment to break the tension, then redirect to an easier topic. Use their actual names."
-            else:
-                prompt_instruction = f"Here's what they just said:\n\n{full_conversation}\n\nNow respond as Lana. Vary your style - don't repeat the same format as last time. Use their actual names (not User A/B). Help them connect by referencing what they discussed."
-
-            messages.append({
-                "role": "user",
-                "content": prompt_instruction
-            })
-
-            print(f"📝 Conversation context ({len(conversation_lines)} lines) {'[AWKWARD MODE]' if is_awkward else ''}:")
-            for line in conversation_lines[-3:]:  # Show last 3 for debugging
-                print(f"   {line}")
-        else:
+            payload = ctx.payload or ctx.render()
+            awkward = ctx.awkward_lines
+        if not payload:
             print("⚠️ No conversation to respond to!")
             return None
-        
-        # Build final payload
-        payload = {
-            "model": "ignored",
-            "messages": messages,
-            "max_tokens": 200,  # Keep responses concise
-            "stream": False  # Explicitly disable streaming
-        }
-        
+
+        print(f"📝 Prompt ready for session {session_id} {'[AWKWARD MODE]' if awkward else ''}")
         return payload
         
     except Exception as e:
@@ -333,85 +1313,88 @@ The conversation below is what the users JUST said. Pay attention and reference
         return None
 
 
-def send_to_llm(payload: Dict) -> Tuple[Optional[str], Optional[str]]:
+def send_to_llm(payload: Dict, cancel: Optional[threading.Event] = None) -> Tuple[Optional[str], Optional[str]]:
     """
-    Send request to LLM and get complete response (no streaming)
+    Send request to LLM and wait for the reply
+    Reads the streamed completion only until the reply is long enough
+    (REPLY_MAX_SENTENCES / REPLY_MAX_CHARS), then cancels the rest
     Includes retry logic with exponential backoff
-    
+
+    Each attempt gets a deadline derived from recent latencies and all
+    attempts share LLM_REQUEST_BUDGET_SEC. While the circuit breaker is open
+    the call fails immediately with LLM_CIRCUIT_OPEN so callers fall back.
+
     Args:
         payload: Request payload
-        
+        cancel: Optional event; once set, reading stops and (None, LLM_CANCELLED)
+            is returned (used when another provider answered first)
+
     Returns:
         Tuple of (response_text, error_message)
         If successful: (text, None)
         If failed: (None, error_message)
     """
-    headers = {
-        "Authorization": f"Bearer {JANITOR_AI_KEY}",
-        "Content-Type": "application/json"
-    }
-    
+    client = get_llm_client()
     last_error = None
-    
+    budget_end = time.time() + LLM_REQUEST_BUDGET_SEC
+
     for attempt in range(MAX_RETRIES + 1):
+        if cancel is not None and cancel.is_set():
+            return (None, LLM_CANCELLED)
+
+        delay_ms = BACKOFF_MS[min(attempt - 1, len(BACKOFF_MS) - 1)] if attempt > 0 else 0
+
+        # No retry that could not finish inside the budget
+        if attempt > 0 and time.time() + delay_ms / 1000.0 + LLM_MIN_ATTEMPT_SEC > budget_end:
+            break
+
+        # Checked before any backoff sleep so a sick provider fails fast
+        if not client.breaker.allow():
+            last_error = last_error or LLM_CIRCUIT_OPEN
+            break
+
         try:
             # Add delay for retries
             if attempt > 0:
-                delay_ms = BACKOFF_MS[min(attempt - 1, len(BACKOFF_MS) - 1)]
                 time.sleep(delay_ms / 1000.0)
                 print(f"Retry attempt {attempt + 1}/{MAX_RETRIES + 1}")
-            
-            # Make request
+
+            # Make request - streamed so generation can be cut off early
             start_time = time.time()
-            response = requests.post(
-                JANITOR_AI_URL,
-                headers=headers,
-                json=payload,
-                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
-                stream=False  # No streaming
+            attempt_timeout = min(client.attempt_timeout(), budget_end - start_time)
+            response = client.post(
+                _payload_with(payload, stream=True),
+                timeout=(CONNECT_TIMEOUT, attempt_timeout),
+                stream=True
             )
-            
-            latency = time.time() - start_time
-            print(f"LLM request completed in {latency:.2f}s (status: {response.status_code})")
-            
+
             # Handle response codes
             if response.status_code == 200:
-                # Success - parse response
                 try:
-                    response.encoding = 'utf-8'
-                    data = response.json()
-                    
-                    # Handle streaming format (data: prefix on each line)
-                    if isinstance(data, str):
-                        # Parse SSE format
-                        message = _parse_sse_response(data)
-                        if message:
-                            return (_clean_text(message), None)
-                    
-                    # Handle standard JSON format
-                    if 'choices' in data and len(data['choices']) > 0:
-                        content = data['choices'][0].get('message', {}).get('content', '')
-                        if not content:
-                            # Try delta format
-                            content = data['choices'][0].get('delta', {}).get('content', '')
-
-                        if content:
-                            # Extract only Lana's dialogue, removing context
-                            dialogue = _extract_lana_dialogue(content)
-                            return (_clean_text(dialogue), None)
-                    
-                    # If we got here, couldn't parse response
-                    return (None, "Failed to parse LLM response format")
-                    
-                except json.JSONDecodeError as e:
-                    # Try parsing as SSE
-                    message = _parse_sse_response(response.text)
-                    if message:
-                        dialogue = _extract_lana_dialogue(message)
-                        return (_clean_text(dialogue), None)
-                    return (None, f"JSON decode error: {e}")
-            
-            elif response.status_code == 429:
+                    dialogue = _read_limited_reply(response, deadline=start_time + attempt_timeout, cancel=cancel)
+                finally:
+                    response.close()
+
+                if cancel is not None and cancel.is_set():
+                    client.record_result(True)  # Abandoned, not failed
+                    return (None, LLM_CANCELLED)
+
+                latency = time.time() - start_time
+                client.record_result(True, latency)
+                print(f"LLM request completed in {latency:.2f}s (status: {response.status_code})")
+
+                if dialogue:
+                    return (_clean_text(dialogue), None)
+
+                # If we got here, couldn't parse response
+                return (None, "Failed to parse LLM response format")
+
+            response.close()
+            # 4xx (including 429) means the provider is up; only 5xx counts against it
+            client.record_result(response.status_code < 500)
+            print(f"LLM request failed in {time.time() - start_time:.2f}s (status: {response.status_code})")
+
+            if response.status_code == 429:
                 # Rate limit - don't retry, use fallback
                 last_error = "Rate limit exceeded"
                 break
@@ -427,58 +1410,148 @@ def send_to_llm(payload: Dict) -> Tuple[Optional[str], Optional[str]]:
                 continue
             
         except requests.exceptions.Timeout:
+            client.record_result(False)
             last_error = "Request timeout"
             continue
-        
+
         except requests.exceptions.ConnectionError:
+            client.record_result(False)
             last_error = "Connection error"
             continue
-        
+
         except Exception as e:
+            client.record_result(False)
             last_error = f"Unexpected error: {str(e)}"
             continue
-    
+
     # All retries failed
     return (None, last_error)
 
 
-def _parse_sse_response(response_text: str) -> Optional[str]:
+def _current_turn(session_id: str) -> int:
+    """Transcript length a prompt for this session is being built from"""
+    ctx = _prompt_contexts.get(session_id)
+    return ctx.transcript_len if ctx else 0
+
+
+def dispatch_to_llm(session_id: str, payload: Dict, turn: int = 0) -> Tuple[Optional[str], Optional[str]]:
     """
-    Parse Server-Sent Events (SSE) streaming response format
-    Even though we don't stream, the API might return in SSE format
+    Send a request through the cross-session dispatcher
+    
+    Waits for a slot, races the configured providers (see HedgedLLM), and on a
+    429 waits out the pause and tries again while the queue deadline allows
+    instead of falling back at once.
+    
+    Args:
+        session_id: Session the request is for
+        payload: Request payload
+        turn: Transcript length the prompt was built from
+        
+    Returns:
+        Tuple of (response_text, error_message) like send_to_llm
     """
-    try:
-        complete_message = []
-        lines = response_text.strip().split('\n')
+    # Don't hold a queue slot for a call the breaker would reject anyway
+    # (with a second provider configured, the race fails over to it instead)
+    if get_llm_client().breaker.rejecting() and len(get_hedged_llm().providers) < 2:
+        return (None, LLM_CIRCUIT_OPEN)
+
+    dispatcher = get_llm_dispatcher()
+    deadline = time.time() + LLM_QUEUE_TIMEOUT_SEC
+
+    while True:
+        ticket = dispatcher.acquire(session_id, turn, timeout=max(0, deadline - time.time()))
+        if ticket.state == 'superseded':
+            return (None, LLM_SUPERSEDED)
+        if ticket.state != 'granted':
+            return (None, "LLM queue timeout")
+
+        rate_limited = False
+        try:
+            response_text, error = get_hedged_llm().complete(payload)
+            rate_limited = error == "Rate limit exceeded"
+        finally:
+            dispatcher.release(ticket, rate_limited=rate_limited)
 
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith(':'):
-                continue
+        if not rate_limited or time.time() >= deadline:
+            return (response_text, error)
 
-            if line.startswith('data: '):
-                json_str = line[6:]  # Remove 'data: ' prefix
+        print(f"⏳ Rate limited - requeueing LLM request for {session_id}")
 
-                try:
-                    chunk = json.loads(json_str)
 
-                    # Extract content from delta
-                    if 'choices' in chunk and len(chunk['choices']) > 0:
-                        choice = chunk['choices'][0]
+def _count_sentences(text: str) -> int:
+    """Count complete sentences (terminal punctuation followed by more text or the end)"""
+    return len(_SENTENCE_END.findall(text + ' '))
 
-                        # Try delta format
-                        content = choice.get('delta', {}).get('content', '')
-                        if not content:
-                            # Try message format
-                            content = choice.get('message', {}).get('content', '')
 
-                        if content:
-                            complete_message.append(content)
+def _limit_reply(dialogue: str) -> Tuple[str, bool]:
+    """
+    Cut a partial reply at REPLY_MAX_SENTENCES sentences or REPLY_MAX_CHARS
+    
+    Returns:
+        Tuple of (reply, is_complete) - is_complete means stop generating
+    """
+    ends = [m.end() for m in _SENTENCE_END.finditer(dialogue)]
+    if len(ends) >= REPLY_MAX_SENTENCES:
+        return (dialogue[:ends[REPLY_MAX_SENTENCES - 1]], True)
+    if len(dialogue) >= REPLY_MAX_CHARS:
+        return (dialogue, True)
+    return (dialogue, False)
+
+
+def _read_limited_reply(response: requests.Response, deadline: Optional[float] = None,
+                        cancel: Optional[threading.Event] = None) -> Optional[str]:
+    """
+    Read a streamed completion only until the reply is long enough
+
+    Stops reading as soon as Lana's dialogue holds REPLY_MAX_SENTENCES
+    complete sentences or REPLY_MAX_CHARS characters; the caller closes the
+    response, which drops the connection and cancels the rest of generation.
+
+    Args:
+        response: Streamed 200 response
+        deadline: Wall-clock time to give up at; a trickling stream is cut at
+            its last complete sentence, or raises Timeout if it has none
+        cancel: Optional event; once set, reading stops and None is returned
+
+    Returns:
+        Lana's dialogue (labels stripped), or None if nothing was received
+    """
+    raw = []
+    raw_len = 0
+
+    for delta in sse.iter_sse_deltas(response.iter_content(chunk_size=None)):
+        raw.append(delta)
+        raw_len += len(delta)
+
+        if cancel is not None and cancel.is_set():
+            return None
+
+        if deadline is not None and time.time() > deadline:
+            dialogue = _extract_lana_dialogue(''.join(raw))
+            ends = [m.end() for m in _SENTENCE_END.finditer(dialogue + ' ')]
+            if not ends:
+                raise requests.exceptions.Timeout("LLM stream passed its attempt deadline")
+            print(f"⌛ LLM stream hit its deadline - keeping {len(ends)} sentence(s)")
+            return _limit_reply(dialogue[:ends[-1]])[0]
+
+        # Only re-check when a sentence could have ended or we hit the length cap
+        if raw_len >= REPLY_MAX_CHARS or any(c in delta for c in '.!?\n '):
+            dialogue, complete = _limit_reply(_extract_lana_dialogue(''.join(raw)))
+            if complete:
+                print(f"✂️ Cut LLM generation after {raw_len} chars")
+                return dialogue
+
+    text = ''.join(raw)
+    return _extract_lana_dialogue(text) if text else None
 
-                except json.JSONDecodeError:
-                    continue
 
-        result = ''.join(complete_message)
+def _parse_sse_response(response_text: str) -> Optional[str]:
+    """
+    Parse Server-Sent Events (SSE) streaming response format
+    Even though we don't stream, the API might return in SSE format
+    """
+    try:
+        result = sse.parse_sse_text(response_text)
 
         # Extract only dialogue from the SSE response
         if result:
@@ -491,12 +1564,595 @@ def _parse_sse_response(response_text: str) -> Optional[str]:
         return None
 
 
+def _pop_sentences(buffer: str) -> Tuple[List[str], str]:
+    """
+    Split complete sentences off the front of a streaming buffer.
+    
+    Returns:
+        Tuple of (complete_sentences, remaining_buffer)
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(buffer):
+        candidate = buffer[start:match.end()].strip()
+        if len(candidate) < MIN_SENTENCE_CHARS:
+            continue  # Too short to be worth its own TTS call - keep growing
+        sentences.append(candidate)
+        start = match.end()
+    return sentences, buffer[start:]
+
+
+def _finish_sentence(sentence: str) -> str:
+    """Strip speaker labels and fillers from one streamed sentence"""
+    if re.match(r'^(User [AB]:|[AB]:)', sentence, re.IGNORECASE):
+        return ""  # Echoed participant line, not Lana's dialogue
+    return _clean_text(_extract_lana_dialogue(sentence))
+
+
+def stream_llm_sentences(payload: Dict):
+    """
+    Stream a completion and yield Lana's reply one sentence at a time
+    
+    Stops after REPLY_MAX_SENTENCES sentences or REPLY_MAX_CHARS characters
+    and closes the connection so the rest of the generation is dropped.
+    
+    Args:
+        payload: Request payload (a streaming copy is sent, the original is untouched)
+        
+    Yields:
+        Cleaned sentences in order, as soon as each one is complete
+        
+    Raises:
+        RuntimeError: If the request fails before or during streaming, or the
+            circuit breaker is open (message LLM_CIRCUIT_OPEN)
+    """
+    stream_payload = _payload_with(payload, stream=True)
+    client = get_llm_client()
+    if not client.breaker.allow():
+        raise RuntimeError(LLM_CIRCUIT_OPEN)
+
+    try:
+        start_time = time.time()
+        attempt_timeout = client.attempt_timeout()
+        response = client.post(stream_payload, timeout=(CONNECT_TIMEOUT, attempt_timeout), stream=True)
+    except requests.exceptions.RequestException as e:
+        client.record_result(False)
+        raise RuntimeError(f"LLM stream request failed: {e}")
+
+    healthy = response.status_code < 500
+    try:
+        if response.status_code != 200:
+            raise RuntimeError(f"LLM stream returned status {response.status_code}")
+
+        buffer = ""
+        sentence_count = 0
+        reply_chars = 0
+        for delta in sse.iter_sse_deltas(response.iter_content(chunk_size=None)):
+            if time.time() - start_time > attempt_timeout:
+                if sentence_count:
+                    print(f"⌛ LLM stream hit its deadline after {sentence_count} sentence(s)")
+                    return
+                healthy = False
+                raise RuntimeError("LLM stream passed its attempt deadline")
+
+            buffer += delta
+            sentences, buffer = _pop_sentences(buffer)
+            for sentence in sentences:
+                sentence = _finish_sentence(sentence)
+                if not sentence:
+                    continue
+                if sentence_count == 0:
+                    print(f"LLM first sentence after {time.time() - start_time:.2f}s")
+
+                sentence_count += _count_sentences(sentence)
+                reply_chars += len(sentence)
+                yield sentence
+
+                # Long enough - stop reading; closing the response cancels generation
+                if sentence_count >= REPLY_MAX_SENTENCES or reply_chars >= REPLY_MAX_CHARS:
+                    print(f"✂️ Cut LLM stream after {sentence_count} sentence(s)")
+                    return
+
+            if reply_chars + len(buffer) >= REPLY_MAX_CHARS:
+                break  # Runaway sentence - emit what fits below
+
+        tail = buffer.strip()
+        if reply_chars + len(tail) > REPLY_MAX_CHARS:
+            tail = tail[:max(0, REPLY_MAX_CHARS - reply_chars)].rsplit(' ', 1)[0] + "..."
+        tail = _finish_sentence(tail)
+        if tail:
+            yield tail
+
+    except requests.exceptions.RequestException as e:
+        healthy = False
+        raise RuntimeError(f"LLM stream interrupted: {e}")
+
+    finally:
+        response.close()
+        client.record_result(healthy, time.time() - start_time if response.status_code == 200 else None)
+
+
+class LLMProvider:
+    """
+    One completion backend for the agent reply.
+
+    complete() takes the payload from build_agent_prompt and returns
+    (text, error) like send_to_llm. It should stop work and return
+    (None, LLM_CANCELLED) soon after `cancel` is set.
+    """
+
+    name = "provider"
+
+    def available(self) -> bool:
+        """False if the provider is not configured"""
+        return True
+
+    def complete(self, payload: Dict, cancel: threading.Event) -> Tuple[Optional[str], Optional[str]]:
+        raise NotImplementedError
+
+
+class JanitorAIProvider(LLMProvider):
+    """JanitorAI completions over the shared keep-alive client"""
+
+    name = "janitor"
+
+    def complete(self, payload, cancel):
+        return send_to_llm(payload, cancel=cancel)
+
+
+class ClaudeProvider(LLMProvider):
+    """
+    Anthropic Messages API (needs the anthropic package and ANTHROPIC_API_KEY).
+
+    System messages from the payload become the system prompt. The stable
+    prefix of a PromptPayload is sent as its own block with a cache_control
+    marker, so repeat turns in a session read it from Anthropic's prompt
+    cache. The reply is streamed and cut with the same REPLY_MAX_SENTENCES
+    rule as JanitorAI; leaving the stream context closes the connection.
+    """
+
+    name = "claude"
+
+    def __init__(self, api_key: Optional[str] = None, model: str = CLAUDE_MODEL):
+        self.model = model
+        api_key = api_key if api_key is not None else os.getenv('ANTHROPIC_API_KEY', '')
+        self.client = None
+        if anthropic is not None and api_key:
+            self.client = anthropic.Anthropic(api_key=api_key, max_retries=0, timeout=READ_TIMEOUT)
+
+    def available(self):
+        return self.client is not None
+
+    def complete(self, payload, cancel):
+        if self.client is None:
+            return (None, "Claude not configured")
+
+        prefix_len = getattr(payload, 'prefix_len', 0)
+        system = []
+        for part, cached in ((payload['messages'][:prefix_len], True), (payload['messages'][prefix_len:], False)):
+            text = "\n\n".join(m['content'] for m in part if m['role'] == 'system')
+            if text:
+                block = {"type": "text", "text": text}
+                if cached:
+                    block["cache_control"] = {"type": "ephemeral"}
+                system.append(block)
+
+        messages = [{"role": m['role'], "content": m['content']}
+                    for m in payload['messages'] if m['role'] != 'system']
+        raw = []
+
+        try:
+            with self.client.messages.stream(
+                model=self.model,
+                max_tokens=payload.get('max_tokens', 200),
+                system=system,
+                messages=messages
+            ) as stream:
+                for delta in stream.text_stream:
+                    if cancel.is_set():
+                        return (None, LLM_CANCELLED)
+                    raw.append(delta)
+                    if any(c in delta for c in '.!?\n '):
+                        dialogue, complete = _limit_reply(_extract_lana_dialogue(''.join(raw)))
+                        if complete:
+                            return (_clean_text(dialogue), None)
+        except Exception as e:
+            return (None, f"Claude error: {e}")
+
+        text = _clean_text(_extract_lana_dialogue(''.join(raw)))
+        return (text, None) if text else (None, "Empty Claude response")
+
+
+class StubProvider(LLMProvider):
+    """Offline provider with a scripted latency and reply, for tests and demos"""
+
+    def __init__(self, name: str = "stub", latency: float = 0.5,
+                 text: str = "Stub reply from Lana. What do you two think?", error: Optional[str] = None):
+        self.name = name
+        self.latency = latency
+        self.text = text
+        self.error = error
+
+    def complete(self, payload, cancel):
+        if cancel.wait(self.latency):
+            return (None, LLM_CANCELLED)
+        if self.error:
+            return (None, self.error)
+        return (self.text, None)
+
+
+class _ProviderStats:
+    """Outcome counters and recent latencies for one provider"""
+
+    def __init__(self):
+        self.latencies = deque(maxlen=LLM_LATENCY_WINDOW)  # Seconds per successful reply
+        self.calls = 0
+        self.hedges = 0  # Times started as a backup for a slower provider
+        self.wins = 0
+        self.errors = 0
+        self.cancelled = 0
+
+
+class HedgedLLM:
+    """
+    Races completion providers for one prompt.
+
+    The first provider starts at once. If it has not answered by its own
+    LLM_HEDGE_PERCENTILE latency, or fails before then, the next provider
+    is started with the same payload. The first successful reply wins and
+    the others are cancelled.
+    """
+
+    def __init__(self, providers: List[LLMProvider]):
+        self.providers = [p for p in providers if p.available()]
+        self._stats = {p.name: _ProviderStats() for p in self.providers}
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, provider: LLMProvider) -> float:
+        """Seconds to wait on a provider before starting the next one"""
+        with self._lock:
+            samples = sorted(self._stats[provider.name].latencies)
+        if len(samples) < LLM_MIN_LATENCY_SAMPLES:
+            return LLM_HEDGE_DEFAULT_DELAY_SEC
+        return max(LLM_HEDGE_MIN_DELAY_SEC, _percentile(samples, LLM_HEDGE_PERCENTILE))
+
+    def _run(self, provider: LLMProvider, payload: Dict, cancel: threading.Event, results: queue.Queue):
+        start = time.time()
+        try:
+            text, error = provider.complete(payload, cancel)
+        except Exception as e:
+            text, error = None, f"{provider.name} error: {e}"
+        latency = time.time() - start
+
+        with self._lock:
+            stats = self._stats[provider.name]
+            if text:
+                stats.latencies.append(latency)
+            elif error == LLM_CANCELLED:
+                stats.cancelled += 1
+            else:
+                stats.errors += 1
+        results.put((provider, text, error, latency))
+
+    def complete(self, payload: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Get a reply from whichever provider answers first
+
+        Returns:
+            Tuple of (response_text, error_message) like send_to_llm
+        """
+        if not self.providers:
+            return (None, "No LLM provider available")
+
+        cancel = threading.Event()
+        results = queue.Queue()
+        launched = 0
+        pending = 0
+        launched_at = 0.0
+        last_error = None
+
+        def _launch():
+            nonlocal launched, pending, launched_at
+            provider = self.providers[launched]
+            with self._lock:
+                self._stats[provider.name].calls += 1
+                if launched:
+                    self._stats[provider.name].hedges += 1
+            threading.Thread(target=self._run, args=(provider, payload, cancel, results),
+                             name=f"llm-{provider.name}", daemon=True).start()
+            launched += 1
+            pending += 1
+            launched_at = time.time()
+
+        _launch()
+        while pending:
+            timeout = None
+            if launched < len(self.providers):
+                timeout = max(0, self.hedge_delay(self.providers[launched - 1]) - (time.time() - launched_at))
+
+            try:
+                provider, text, error, latency = results.get(timeout=timeout)
+            except queue.Empty:
+                print(f"🏁 {self.providers[launched - 1].name} past its p{LLM_HEDGE_PERCENTILE} - "
+                      f"hedging with {self.providers[launched].name}")
+                _launch()
+                continue
+
+            pending -= 1
+            if text:
+                cancel.set()  # Losers stop reading and drop their connections
+                with self._lock:
+                    self._stats[provider.name].wins += 1
+                if launched > 1:
+                    print(f"🏁 {provider.name} won the race in {latency:.2f}s")
+                return (text, None)
+
+            last_error = error
+            if launched < len(self.providers):
+                _launch()  # Failed before the hedge point - fail over now
+
+        return (None, last_error)
+
+    def get_stats(self) -> Dict:
+        """Per-provider win rates and latency percentiles"""
+        with self._lock:
+            snapshot = {name: (stats.calls, stats.hedges, stats.wins, stats.errors,
+                               stats.cancelled, sorted(stats.latencies))
+                        for name, stats in self._stats.items()}
+
+        result = {}
+        for name, (calls, hedges, wins, errors, cancelled, latencies) in snapshot.items():
+            result[name] = {
+                'calls': calls,
+                'hedges': hedges,
+                'wins': wins,
+                'win_rate': wins / calls if calls else 0,
+                'errors': errors,
+                'cancelled': cancelled,
+                'latency_p50_ms': _percentile(latencies, 50) * 1000,
+                'latency_p90_ms': _percentile(latencies, 90) * 1000
+            }
+        return result
+
+
+_hedged_llm: Optional[HedgedLLM] = None
+
+
+def get_hedged_llm() -> HedgedLLM:
+    """
+    Get the process-wide provider race
+
+    JanitorAI first, Claude as the hedge when configured. With LLM_STUB=true
+    two local stub providers are used instead, so the path runs offline.
+    """
+    global _hedged_llm
+    if _hedged_llm is None:
+        if LLM_STUB:
+            providers = [StubProvider("stub-primary", latency=2.0), StubProvider("stub-hedge", latency=0.5)]
+        else:
+            providers = [JanitorAIProvider(), ClaudeProvider()]
+        _hedged_llm = HedgedLLM(providers)
+        print(f"LLM providers: {', '.join(p.name for p in _hedged_llm.providers) or 'none'}")
+    return _hedged_llm
+
+
+def set_llm_providers(providers: List[LLMProvider]):
+    """Replace the provider race (e.g. with StubProviders in tests)"""
+    global _hedged_llm
+    _hedged_llm = HedgedLLM(providers)
+
+
+def get_provider_stats() -> Dict:
+    """Get per-provider win rates and latencies"""
+    return get_hedged_llm().get_stats()
+
+
+class _Candidate:
+    """One speculative reply, built from the transcript as it was at `turn`"""
+
+    def __init__(self, turn: int):
+        self.turn = turn
+        self.created = time.time()
+        self.text = None
+        self.audio = None
+        self.discarded = False
+        self.ready = threading.Event()
+
+
+class Speculator:
+    """
+    Speculative reply pre-generation during the agent cooldown.
+
+    Once a session's cooldown is within SPECULATIVE_LEAD_SEC of expiring,
+    each transcript append makes sure a candidate reply (and, with a
+    render_audio callable, its audio) is being generated in the background.
+    A candidate goes stale after SPECULATIVE_MAX_NEW_TURNS more lines or
+    SPECULATIVE_MAX_AGE_SEC and is replaced. When the trigger fires, a fresh
+    candidate is served instead of calling the LLM; one still generating is
+    waited on for up to SPECULATIVE_JOIN_SEC.
+    """
+
+    def __init__(self, render_audio=None):
+        self.render_audio = render_audio
+        self._lock = threading.Lock()
+        self._candidates: Dict[str, _Candidate] = {}
+        self._served_audio: Dict[str, Tuple[str, bytes]] = {}  # session_id -> (text, audio)
+        self.stats = {'generated': 0, 'failed': 0, 'hits': 0, 'misses': 0, 'wasted': 0, 'audio_hits': 0}
+
+    def _fresh(self, candidate: _Candidate, transcript_len: int) -> bool:
+        return (transcript_len - candidate.turn < SPECULATIVE_MAX_NEW_TURNS
+                and time.time() - candidate.created < SPECULATIVE_MAX_AGE_SEC)
+
+    def _discard(self, session_id: str, candidate: _Candidate):
+        """Drop a candidate (caller holds the lock)"""
+        if self._candidates.get(session_id) is candidate:
+            del self._candidates[session_id]
+        if not candidate.discarded:
+            candidate.discarded = True
+            if candidate.text:
+                self.stats['wasted'] += 1
+
+    def on_append(self, session_id: str, session: Dict, entry: Dict):
+        """Transcript listener hook: start or refresh the session's candidate"""
+        transcript_len = len(session.get('transcript', []))
+
+        with self._lock:
+            candidate = self._candidates.get(session_id)
+
+            if entry.get('speaker', '').lower() in AGENT_SPEAKERS:
+                # The agent just spoke - any candidate answers an old context
+                if candidate:
+                    self._discard(session_id, candidate)
+                return
+
+            if candidate and self._fresh(candidate, transcript_len):
+                return
+            if candidate:
+                self._discard(session_id, candidate)
+
+            # Only in the run-up to the end of a cooldown, i.e. after the agent has spoken
+            state = _agent_state.get(session_id, {})
+            if (state.get('busy') or 'last_call' not in state
+                    or get_cooldown_remaining(session_id) > SPECULATIVE_LEAD_SEC):
+                return
+
+            candidate = _Candidate(transcript_len)
+            self._candidates[session_id] = candidate
+
+        threading.Thread(target=self._generate, args=(session_id, candidate),
+                         name="speculative-reply", daemon=True).start()
+
+    def _generate(self, session_id: str, candidate: _Candidate):
+        text = None
+        audio = None
+        try:
+            payload = build_agent_prompt(session_id)
+            if payload:
+                # Own dispatcher key so it never supersedes (or is superseded by) the real request
+                text, error = dispatch_to_llm(f"{session_id}:speculative", payload, candidate.turn)
+            if text and self.render_audio:
+                try:
+                    audio = self.render_audio(text)
+                except Exception as e:
+                    print(f"Speculative TTS failed: {e}")
+        except Exception as e:
+            print(f"Speculative generation failed for {session_id}: {e}")
+
+        with self._lock:
+            if text:
+                candidate.text = text
+                candidate.audio = audio
+                self.stats['generated'] += 1
+                if candidate.discarded:
+                    self.stats['wasted'] += 1  # Went stale while generating
+            else:
+                self.stats['failed'] += 1
+                self._discard(session_id, candidate)
+        candidate.ready.set()
+
+    def take(self, session_id: str) -> Optional[str]:
+        """
+        Claim the session's candidate for the turn being triggered
+
+        Returns:
+            Reply text if a fresh candidate exists (its audio is held for
+            pop_audio), or None to generate the reply normally
+        """
+        from app import session_manager
+
+        with self._lock:
+            candidate = self._candidates.get(session_id)
+        if candidate is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        candidate.ready.wait(SPECULATIVE_JOIN_SEC)
+
+        session = session_manager.load_session(session_id)
+        transcript_len = len(session.get('transcript', [])) if session else 0
+
+        with self._lock:
+            if (self._candidates.get(session_id) is not candidate or not candidate.text
+                    or not self._fresh(candidate, transcript_len)):
+                self.stats['misses'] += 1
+                self._discard(session_id, candidate)
+                return None
+
+            del self._candidates[session_id]
+            self.stats['hits'] += 1
+            if candidate.audio:
+                self._served_audio[session_id] = (candidate.text, candidate.audio)
+
+        print(f"⚡ Serving speculative reply for {session_id} "
+              f"(built {time.time() - candidate.created:.1f}s ago, {transcript_len - candidate.turn} new line(s))")
+        return candidate.text
+
+    def pop_audio(self, session_id: str, text: str) -> Optional[bytes]:
+        """Pre-rendered audio for a reply just served by take(), if any"""
+        with self._lock:
+            item = self._served_audio.pop(session_id, None)
+            if item and item[0] == text:
+                self.stats['audio_hits'] += 1
+                return item[1]
+        return None
+
+    def get_stats(self) -> Dict:
+        """Hit, miss and wasted-generation counters and rates"""
+        with self._lock:
+            stats = dict(self.stats)
+            pending = len(self._candidates)
+
+        served = stats['hits'] + stats['misses']
+        return {
+            **stats,
+            'pending': pending,
+            'hit_rate': stats['hits'] / served if served else 0,
+            'waste_rate': stats['wasted'] / stats['generated'] if stats['generated'] else 0
+        }
+
+
+_speculator: Optional[Speculator] = None
+
+
+def enable_speculation(render_audio=None):
+    """
+    Turn on speculative reply pre-generation
+
+    Args:
+        render_audio: Optional callable(text) -> audio bytes, to pre-render TTS too
+    """
+    global _speculator
+    _speculator = Speculator(render_audio)
+    print(f"⚡ Speculative agent replies enabled{' (with audio)' if render_audio else ''}")
+
+
+def _take_speculative_reply(session_id: str) -> Optional[str]:
+    """Serve a fresh speculative reply if speculation is on"""
+    return _speculator.take(session_id) if _speculator else None
+
+
+def pop_speculative_audio(session_id: str, text: str) -> Optional[bytes]:
+    """Get pre-rendered audio for a speculative reply that was just served"""
+    return _speculator.pop_audio(session_id, text) if _speculator else None
+
+
+def get_speculation_stats() -> Dict:
+    """Get speculative generation hit/miss/waste metrics"""
+    return _speculator.get_stats() if _speculator else {'enabled': False}
+
+
 def get_fallback_response() -> str:
     """Get a safe fallback response"""
     import random
     return random.choice(FALLBACK_RESPONSES)
 
 
+def get_bank_lines() -> List[str]:
+    """Fixed lines worth pre-rendering to audio at startup (fallback + stock lines)"""
+    return FALLBACK_RESPONSES + STOCK_LINES
+
+
 def handle_agent_response(session_id: str, text: str) -> bool:
     """
     Process and save agent response to session
@@ -522,6 +2178,7 @@ def handle_agent_response(session_id: str, text: str) -> bool:
         
         # Append to session transcript
         session_manager.append_transcript(session_id, "Janitor", text)
+        _agent_state.setdefault(session_id, {})['last_reply'] = time.time()
         
         print(f"Agent response saved to session {session_id}: {text[:100]}...")
         return True
@@ -553,13 +2210,21 @@ def trigger_agent(session_id: str) -> Tuple[bool, Optional[str], Optional[str]]:
         _set_agent_busy(session_id, True)
         
         try:
+            # A reply generated ahead of time during the cooldown, if still fresh
+            speculative = _take_speculative_reply(session_id)
+            if speculative:
+                handle_agent_response(session_id, speculative)
+                return (True, speculative, None)
+            
             # Build prompt
             payload = build_agent_prompt(session_id)
             if not payload:
                 return (False, None, "Failed to build prompt")
             
-            # Call LLM
-            response_text, error = send_to_llm(payload)
+            # Call LLM through the cross-session dispatcher
+            response_text, error = dispatch_to_llm(session_id, payload, _current_turn(session_id))
+            if error == LLM_SUPERSEDED:
+                return (False, None, error)
             
             # Handle response
             if response_text:
@@ -584,6 +2249,190 @@ def trigger_agent(session_id: str) -> Tuple[bool, Optional[str], Optional[str]]:
         return (False, None, f"Exception: {str(e)}")
 
 
+def trigger_agent_streaming(session_id: str, on_sentence) -> Tuple[bool, Optional[str], Optional[str]]:
+    """
+    Streaming orchestrator: like trigger_agent, but hands each sentence of the
+    reply to on_sentence(index, sentence) as soon as the LLM completes it
+    
+    If the stream fails before producing anything, falls back to the blocking
+    send_to_llm path and then to a canned response, delivered as one sentence.
+    
+    Args:
+        session_id: Session ID
+        on_sentence: Callback receiving (index, sentence) in order
+        
+    Returns:
+        Tuple of (success, response_text, error_message)
+    """
+    try:
+        if _is_agent_busy(session_id):
+            print(f"⏳ Agent busy for session {session_id}, skipping streaming trigger")
+            return (False, None, "Agent is busy or in cooldown")
+
+        _set_agent_busy(session_id, True)
+
+        try:
+            speculative = _take_speculative_reply(session_id)
+            if speculative:
+                on_sentence(0, speculative)
+                handle_agent_response(session_id, speculative)
+                return (True, speculative, None)
+
+            payload = build_agent_prompt(session_id)
+            if not payload:
+                return (False, None, "Failed to build prompt")
+
+            sentences = []
+            stream_error = None
+            turn = _current_turn(session_id)
+
+            dispatcher = get_llm_dispatcher()
+
+            if get_llm_client().breaker.rejecting():
+                # Provider is down - skip the queue and go to the fallback below
+                stream_error = LLM_CIRCUIT_OPEN
+                ticket = None
+            else:
+                ticket = dispatcher.acquire(session_id, turn)
+                if ticket.state == 'superseded':
+                    return (False, None, LLM_SUPERSEDED)
+                if ticket.state != 'granted':
+                    stream_error = "LLM queue timeout"
+
+            if ticket is not None and ticket.state == 'granted':
+                try:
+                    for sentence in stream_llm_sentences(payload):
+                        on_sentence(len(sentences), sentence)
+                        sentences.append(sentence)
+                except RuntimeError as e:
+                    stream_error = str(e)
+                    print(f"⚠️ Agent stream error after {len(sentences)} sentence(s): {e}")
+                finally:
+                    dispatcher.release(ticket, rate_limited='status 429' in (stream_error or ''))
+
+            if sentences:
+                response_text = " ".join(sentences)
+                handle_agent_response(session_id, response_text)
+                return (True, response_text, None)
+
+            # Nothing streamed - use the blocking path with its retries
+            response_text, error = dispatch_to_llm(session_id, payload, turn)
+            if error == LLM_SUPERSEDED:
+                return (False, None, error)
+            if response_text:
+                on_sentence(0, response_text)
+                handle_agent_response(session_id, response_text)
+                return (True, response_text, None)
+
+            fallback = get_fallback_response()
+            on_sentence(0, fallback)
+            handle_agent_response(session_id, fallback)
+            return (True, fallback, f"Used fallback due to: {error or stream_error}")
+
+        finally:
+            _set_agent_busy(session_id, False)
+
+    except Exception as e:
+        _set_agent_busy(session_id, False)
+        return (False, None, f"Exception: {str(e)}")
+
+
+def get_cooldown_remaining(session_id: str) -> float:
+    """Seconds until the agent may speak again in this session"""
+    state = _agent_state.get(session_id, {})
+    return max(0, AGENT_COOLDOWN_SEC - (time.time() - state.get('last_call', 0)))
+
+
+class AgentScheduler:
+    """
+    Single-flight agent runs per session.
+
+    request() claims the session's slot and starts a run, or - if a run is
+    already in flight - sets its rerun flag instead of starting another.
+    The run calls finish() when done; True means triggers arrived meanwhile
+    and it should run again against the latest context (after the cooldown),
+    then call finish() again. release() drops the slot unconditionally.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[str, Dict] = {}  # session_id -> {'rerun': bool, 'started': float}
+        self.stats = {'started': 0, 'coalesced': 0, 'reruns': 0, 'reruns_skipped': 0}
+
+    def request(self, session_id: str, start) -> bool:
+        """
+        Ask for an agent run
+
+        Args:
+            session_id: Session ID
+            start: Callable that launches the run (e.g. a background task)
+
+        Returns:
+            True if a run was started, False if coalesced into the one in flight
+        """
+        with self._lock:
+            run = self._runs.get(session_id)
+            if run is not None:
+                run['rerun'] = True
+                self.stats['coalesced'] += 1
+                return False
+            self._runs[session_id] = {'rerun': False, 'started': time.time()}
+            self.stats['started'] += 1
+
+        try:
+            start()
+        except Exception:
+            self.release(session_id)
+            raise
+        return True
+
+    def finish(self, session_id: str) -> bool:
+        """
+        End a run
+
+        Returns:
+            True if the slot is kept for a rerun, False if it was released
+        """
+        with self._lock:
+            run = self._runs.get(session_id)
+            if run is not None and run['rerun']:
+                run['rerun'] = False
+                self.stats['reruns'] += 1
+                return True
+            self._runs.pop(session_id, None)
+            return False
+
+    def release(self, session_id: str, skipped_rerun: bool = False):
+        """Drop the session's slot (skipped_rerun: a pending rerun was not needed)"""
+        with self._lock:
+            self._runs.pop(session_id, None)
+            if skipped_rerun:
+                self.stats['reruns_skipped'] += 1
+
+    def in_flight(self, session_id: str) -> bool:
+        """True while a run holds the session's slot"""
+        with self._lock:
+            return session_id in self._runs
+
+    def get_stats(self) -> Dict:
+        """Run, coalescing and rerun counters"""
+        with self._lock:
+            return {**self.stats, 'in_flight': len(self._runs)}
+
+
+_agent_scheduler = AgentScheduler()
+
+
+def get_agent_scheduler() -> AgentScheduler:
+    """Get the process-wide agent run scheduler"""
+    return _agent_scheduler
+
+
+def get_scheduler_stats() -> Dict:
+    """Get single-flight run and coalescing metrics"""
+    return _agent_scheduler.get_stats()
+
+
 def should_trigger_agent(session_id: str) -> bool:
     """
     Determine if agent should be triggered based on conversation state
@@ -601,52 +2450,34 @@ def should_trigger_agent(session_id: str) -> bool:
         if _is_agent_busy(session_id):
             return False
 
-        # Load session
+        # Load session (cached) - only its length is checked against the trigger state
         session = session_manager.load_session(session_id)
         if not session:
             return False
 
-        transcript = session.get('transcript', [])
+        with _session_lock(session_id):
+            state = _get_trigger_state(session_id, session)
+            transcript_len = state.transcript_len
+            last_speaker = state.last_speaker
+            turns_since_agent = state.turns_since_agent
+            keyword = state.keyword()
 
-        if len(transcript) < 3:
+        if transcript_len < TRIGGER_MIN_TURNS:
             return False
 
         # Check last speaker
-        if transcript:
-            last_speaker = transcript[-1].get('speaker', '')
-            if last_speaker.lower() in ['janitor', 'agent', 'ai']:
-                return False
-
-        # Count turns since last agent message
-        turns_since_agent = 0
-        for entry in reversed(transcript):
-            speaker = entry.get('speaker', '').lower()
-            if speaker in ['janitor', 'agent', 'ai']:
-                break
-            turns_since_agent += 1
+        if last_speaker.lower() in AGENT_SPEAKERS:
+            return False
 
         # Trigger after 6-8 user turns (increased to reduce frequency)
-        if turns_since_agent >= 10:
+        if turns_since_agent >= TRIGGER_TURNS_SINCE_AGENT:
             print(f"🤖 Agent triggering after {turns_since_agent} user turns")
             return True
 
-        # Check for trigger patterns in recent messages
-        recent = transcript[-3:]
-        recent_text = " ".join([e.get('text', '').lower() for e in recent])
-
-        trigger_patterns = [
-            '?',  # Questions
-            'awkward',
-            'help',
-            'advice',
-            'janitor',
-            'host'
-        ]
-
-        for pattern in trigger_patterns:
-            if pattern in recent_text:
-                print(f"🤖 Agent triggering due to keyword: '{pattern}'")
-                return True
+        # Check for trigger keywords matched when the recent lines were appended
+        if keyword:
+            print(f"🤖 Agent triggering due to keyword: '{keyword}'")
+            return True
 
         return False
 
@@ -674,25 +2505,38 @@ def get_agent_stats(session_id: str) -> Dict:
         if not session:
             return {}
         
-        transcript = session.get('transcript', [])
-        
-        agent_messages = [
-            e for e in transcript 
-            if e.get('speaker', '').lower() in ['janitor', 'agent', 'ai']
-        ]
+        with _session_lock(session_id):
+            trigger = _get_trigger_state(session_id, session)
+            total = trigger.transcript_len
+            agent_messages = trigger.agent_messages
+            turns_since_agent = trigger.turns_since_agent
+            last_speaker = trigger.last_speaker
         
         state = _agent_state.get(session_id, {})
         
         return {
-            'total_messages': len(transcript),
-            'agent_messages': len(agent_messages),
-            'agent_percentage': len(agent_messages) / len(transcript) * 100 if transcript else 0,
+            'total_messages': total,
+            'agent_messages': agent_messages,
+            'agent_percentage': agent_messages / total * 100 if total else 0,
+            'turns_since_agent': turns_since_agent,
+            'last_speaker': last_speaker,
             'is_busy': state.get('busy', False),
             'last_call': state.get('last_call', 0),
-            'cooldown_remaining': max(0, AGENT_COOLDOWN_SEC - (time.time() - state.get('last_call', 0)))
+            'cooldown_remaining': get_cooldown_remaining(session_id),
+            'run_in_flight': _agent_scheduler.in_flight(session_id),
+            'summarized_turns': session.get('summarized_turns', 0),
+            'summary_tokens': _approx_tokens(session.get('summary', ''))
         }
         
     except Exception as e:
         print(f"Error getting agent stats: {e}")
         return {}
 
+
+def _register_session_hooks():
+    """Keep per-session prompt state current as transcripts grow"""
+    from app import session_manager
+    session_manager.add_transcript_listener(_on_transcript_appended)
+
+
+_register_session_hooks()
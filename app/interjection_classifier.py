@@ -0,0 +1,219 @@
+"""
+Local interjection classifier
+Scores whether the AI should interject with a small logistic model, so only
+borderline cases need the remote Claude decision
+"""
+import os
+import re
+import json
+import threading
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+# Fitted weights written by tests/eval_interjection_classifier.py --save
+WEIGHTS_FILE = os.path.join("sessions", "interjection_weights.json")
+
+# Probability bands: below SKIP -> no interjection, above INTERJECT -> interject
+# without asking Claude, anything in between escalates to Claude
+SKIP_BELOW = 0.3
+INTERJECT_ABOVE = 0.8
+
+RECENT_TURNS = 3  # Turns the question/keyword features look at
+GAP_CAP_SEC = 10.0  # Pause length that counts as full silence
+TURNS_CAP = 20  # Turns since the last interjection that count as "long overdue"
+WORDS_CAP = 30
+
+KEYWORDS = [
+    'what do you think',
+    'any suggestions',
+    'help',
+    'advice',
+    'how about',
+    'should we',
+    'can you',
+    'what if'
+]
+_KEYWORD_MATCHER = re.compile('|'.join(re.escape(k) for k in KEYWORDS))
+_ADDRESS_MATCHER = re.compile(r'\b(ai|assistant|janitor|bot)\b')
+
+FEATURES = [
+    'last_is_question',   # Last turn contains '?'
+    'recent_questions',   # '?' count over the recent turns (capped)
+    'recent_keywords',    # Trigger phrases over the recent turns (capped)
+    'addresses_ai',       # Someone spoke to the assistant directly
+    'gap',                # Pause before the last turn
+    'turns_since_ai',     # Turns since the last interjection
+    'last_words',         # Length of the last turn
+]
+
+# Hand-tuned starting point; replaced by the fitted file when present
+DEFAULT_WEIGHTS = {
+    'bias': -2.2,
+    'last_is_question': 1.6,
+    'recent_questions': 0.8,
+    'recent_keywords': 1.4,
+    'addresses_ai': 2.5,
+    'gap': 1.5,
+    'turns_since_ai': 1.2,
+    'last_words': -0.4,
+}
+
+# Verdicts
+SKIP = "skip"
+INTERJECT = "interject"
+ESCALATE = "escalate"
+
+
+def extract_features(texts: Sequence[str], gap_sec: float = 0.0,
+                     turns_since_ai: Optional[int] = None) -> np.ndarray:
+    """
+    Build the feature vector for a conversation window
+
+    Args:
+        texts: Transcript lines, oldest first (the last one just arrived)
+        gap_sec: Seconds of silence before the last line
+        turns_since_ai: Lines since the AI last spoke (defaults to len(texts))
+
+    Returns:
+        Vector in FEATURES order, every entry scaled to 0..1
+    """
+    if turns_since_ai is None:
+        turns_since_ai = len(texts)
+
+    recent = [t.lower() for t in texts[-RECENT_TURNS:]]
+    last = recent[-1] if recent else ""
+    recent_text = " ".join(recent)
+
+    return np.array([
+        1.0 if '?' in last else 0.0,
+        min(recent_text.count('?'), RECENT_TURNS) / RECENT_TURNS,
+        min(len(_KEYWORD_MATCHER.findall(recent_text)), 2) / 2,
+        1.0 if _ADDRESS_MATCHER.search(last) else 0.0,
+        min(max(gap_sec, 0.0), GAP_CAP_SEC) / GAP_CAP_SEC,
+        min(turns_since_ai, TURNS_CAP) / TURNS_CAP,
+        min(len(last.split()), WORDS_CAP) / WORDS_CAP,
+    ])
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class InterjectionClassifier:
+    """Logistic scorer over FEATURES with a skip / interject / escalate band"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None,
+                 skip_below: float = SKIP_BELOW, interject_above: float = INTERJECT_ABOVE):
+        self.set_weights(weights or DEFAULT_WEIGHTS)
+        self.skip_below = skip_below
+        self.interject_above = interject_above
+        self._lock = threading.Lock()
+        self.counts = {SKIP: 0, INTERJECT: 0, ESCALATE: 0}
+
+    def set_weights(self, weights: Dict[str, float]):
+        self.bias = float(weights.get('bias', 0.0))
+        self.weights = np.array([float(weights.get(name, 0.0)) for name in FEATURES])
+
+    def get_weights(self) -> Dict[str, float]:
+        weights = {'bias': round(self.bias, 4)}
+        weights.update({name: round(float(w), 4) for name, w in zip(FEATURES, self.weights)})
+        return weights
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Interjection probability for one feature vector or a (n, features) matrix"""
+        return _sigmoid(features @ self.weights + self.bias)
+
+    def verdict(self, probability: float) -> str:
+        if probability < self.skip_below:
+            return SKIP
+        if probability > self.interject_above:
+            return INTERJECT
+        return ESCALATE
+
+    def classify(self, features: np.ndarray) -> Dict:
+        """
+        Decide locally where the model is confident
+
+        Returns:
+            dict with verdict (skip / interject / escalate) and probability
+        """
+        probability = float(self.score(features))
+        verdict = self.verdict(probability)
+        with self._lock:
+            self.counts[verdict] += 1
+        return {'verdict': verdict, 'probability': round(probability, 3)}
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self.counts)
+        total = sum(counts.values())
+        return {
+            **counts,
+            'total': total,
+            'escalation_rate': round(counts[ESCALATE] / total, 3) if total else None,
+            'thresholds': {'skip_below': self.skip_below, 'interject_above': self.interject_above},
+            'weights': self.get_weights()
+        }
+
+
+def load_weights(path: str = WEIGHTS_FILE) -> Optional[Dict[str, float]]:
+    """Fitted weights from disk, or None to use DEFAULT_WEIGHTS"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring interjection weights {path}: {e}")
+        return None
+
+
+def save_weights(weights: Dict[str, float], path: str = WEIGHTS_FILE):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(weights, f, indent=2)
+
+
+_classifier: Optional[InterjectionClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier() -> InterjectionClassifier:
+    """Shared classifier, loading fitted weights on first use"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = InterjectionClassifier(load_weights())
+    return _classifier
+
+
+# ========== REMOTE DECISION PROMPT ==========
+# Shared by app.claude_decision and the offline evaluation so labels match production
+
+def build_decision_prompt(context: str, silence_detected: bool = False) -> str:
+    silence_note = "\n\nIMPORTANT: There has been 3+ seconds of silence. You should interject to keep the conversation flowing." if silence_detected else ""
+
+    return f"""Analyze this conversation and decide if an AI assistant should interject:
+
+{context}{silence_note}
+
+Respond with ONLY valid JSON (no markdown):
+{{
+  "should_interject": true or false,
+  "intent": "brief reason",
+  "target_user": "A" or "B" or "both",
+  "response_style": "conversational" or "informative" or "supportive" or "question"
+}}"""
+
+
+def parse_decision(decision_text: str) -> Dict:
+    """Parse Claude's JSON decision (handles markdown fences); raises ValueError"""
+    decision_text = decision_text.strip()
+    if decision_text.startswith('```json'):
+        decision_text = decision_text[7:]
+    if decision_text.startswith('```'):
+        decision_text = decision_text[3:]
+    if decision_text.endswith('```'):
+        decision_text = decision_text[:-3]
+    return json.loads(decision_text.strip())
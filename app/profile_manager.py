@@ -10,6 +10,9 @@ from typing import Dict, Optional, Any
 # Directory for storing profile JSON files
 PROFILES_DIR = "profiles"
 
+# Bumped whenever a session's profiles change, so caches can tell they are stale
+_profile_versions: Dict[str, int] = {}
+
 # Default profile templates
 DEFAULT_PROFILES = {
     "user_A": {
@@ -44,6 +47,24 @@ def _get_profile_path(user_id: str) -> str:
     return os.path.join(PROFILES_DIR, f"{user_id}.json")
 
 
+def _bump_profile_version(session_id: str):
+    """Mark a session's profiles as changed"""
+    _profile_versions[session_id] = _profile_versions.get(session_id, 0) + 1
+
+
+def get_profile_version(session_id: str) -> int:
+    """
+    Get the edit counter for a session's profiles
+    
+    Args:
+        session_id: Session ID
+        
+    Returns:
+        Integer that changes every time the session profiles are edited
+    """
+    return _profile_versions.get(session_id, 0)
+
+
 # ========== INITIALIZATION ==========
 
 def init_profiles():
@@ -197,6 +218,7 @@ def attach_profiles_to_session(session_id: str) -> bool:
     }
     
     session_manager.save_session(session_id, session)
+    _bump_profile_version(session_id)
     print(f"Attached profiles to session {session_id}")
     return True
 
@@ -239,6 +261,7 @@ def update_session_profile(session_id: str, user_id: str, field: str, value: Any
     if role in session["participant_profiles"]:
         session["participant_profiles"][role]["profile"][field] = value
         session_manager.save_session(session_id, session)
+        _bump_profile_version(session_id)
         
         print(f"Updated {role} profile in session {session_id}: {field} = {value}")
         return session["participant_profiles"][role]["profile"]
@@ -284,6 +307,7 @@ def update_session_profile_bulk(session_id: str, user_id: str, updates: Dict[str
             session["participant_profiles"][role]["profile"][field] = value
         
         session_manager.save_session(session_id, session)
+        _bump_profile_version(session_id)
         print(f"Bulk updated {role} profile in session {session_id}")
         return session["participant_profiles"][role]["profile"]
     
@@ -360,6 +384,7 @@ def reset_profile_to_base(session_id: str, user_id: str) -> Optional[Dict]:
     }
     
     session_manager.save_session(session_id, session)
+    _bump_profile_version(session_id)
     print(f"Reset {role} profile to base in session {session_id}")
     return base_profile
 
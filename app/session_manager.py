@@ -6,7 +6,7 @@ Stores session data as JSON files on disk, no database required.
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 import csv
 
 # Directory for storing session JSON files
@@ -16,6 +16,9 @@ LOG_FILE = os.path.join(SESSIONS_DIR, "log.csv")
 # In-memory cache for quick access
 _session_cache: Dict[str, Dict] = {}
 
+# Callbacks run after every transcript append: callback(session_id, entry)
+_transcript_listeners: List[Callable[[str, Dict], None]] = []
+
 
 def _ensure_sessions_dir():
     """Create sessions directory if it doesn't exist"""
@@ -65,6 +68,7 @@ def create_session(user_id: str, session_id: Optional[str] = None) -> Dict:
         "phase": "waiting",
         "transcript": [],
         "summary": "",
+        "summarized_turns": 0,  # Transcript entries folded into the summary
         "status": "waiting",  # waiting, active, ended
         "created_at": _timestamp(),
         "last_activity": _timestamp()
@@ -190,22 +194,58 @@ def append_transcript(session_id: str, speaker: str, text: str) -> Dict:
     
     save_session(session_id, session)
     _log_to_csv(session_id, speaker, text)
+    _notify_transcript_listeners(session_id, transcript_entry)
     
     return session
 
 
-def update_summary(session_id: str, summary: str) -> Dict:
+def add_transcript_listener(callback: Callable[[str, Dict], None]):
+    """
+    Register a callback to run after each transcript append
+    
+    Args:
+        callback: Called as callback(session_id, entry) with the new entry
+    """
+    if callback not in _transcript_listeners:
+        _transcript_listeners.append(callback)
+
+
+def _notify_transcript_listeners(session_id: str, entry: Dict):
+    """Run transcript listeners, never letting one break the append"""
+    for callback in _transcript_listeners:
+        try:
+            callback(session_id, entry)
+        except Exception as e:
+            print(f"Error in transcript listener: {e}")
+
+
+def update_summary(session_id: str, summary: str, summarized_turns: Optional[int] = None) -> Dict:
     """
     Update the session summary
     
     Args:
         session_id: Session to update
         summary: New summary text
+        summarized_turns: Optional count of transcript entries the summary covers
         
     Returns:
         Updated session data
     """
-    return update_session_state(session_id, "summary", summary)
+    if summarized_turns is None:
+        return update_session_state(session_id, "summary", summary)
+    
+    session = load_session(session_id)
+    
+    if session is None:
+        raise ValueError(f"Session {session_id} not found")
+    
+    session["summary"] = summary
+    session["summarized_turns"] = summarized_turns
+    session["last_activity"] = _timestamp()
+    
+    save_session(session_id, session)
+    
+    return session
 
 
 def update_phase(session_id: str, phase: str) -> Dict:
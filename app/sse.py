@@ -0,0 +1,162 @@
+"""
+Incremental Server-Sent Events (SSE) decoder for JanitorAI completions
+Consumes raw byte chunks as they arrive and yields content deltas
+"""
+import codecs
+import json
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Bound once - avoids attribute lookups per event
+_json_loads = json.JSONDecoder().decode
+
+
+def _extract_content(chunk: Dict) -> str:
+    """Pull the text delta out of one completion chunk"""
+    try:
+        choice = chunk['choices'][0]
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+    delta = choice.get('delta')
+    if delta:
+        content = delta.get('content')
+        if content:
+            return content
+
+    message = choice.get('message')
+    if message:
+        return message.get('content') or ""
+
+    return ""
+
+
+class SSEDecoder:
+    """
+    Incremental SSE decoder.
+
+    Feed it byte chunks straight from iter_content; it keeps partial lines
+    and partial UTF-8 sequences between chunks and returns the content
+    deltas of every complete `data:` line. Non-SSE lines are kept so a
+    plain JSON body (server ignored stream=True) still parses on flush().
+    """
+
+    def __init__(self):
+        self._utf8 = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pending = ""  # Partial line carried to the next chunk
+        self._non_sse: List[str] = []
+        self.done = False  # Saw the [DONE] sentinel
+        self.events = 0  # data: lines decoded
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """
+        Decode one chunk of bytes
+
+        Args:
+            chunk: Raw bytes as received (may split lines or UTF-8 characters)
+
+        Returns:
+            Content deltas from every line completed by this chunk
+        """
+        text = self._utf8.decode(chunk)
+        if not text:
+            return []
+
+        if self._pending:
+            text = self._pending + text
+
+        lines = text.split('\n')
+        self._pending = lines.pop()
+
+        deltas = []
+        for line in lines:
+            content = self._decode_line(line)
+            if content:
+                deltas.append(content)
+        return deltas
+
+    def flush(self) -> List[str]:
+        """
+        Finish decoding at end of stream
+
+        Returns:
+            Deltas from a trailing unterminated line, or the message content of
+            a plain JSON body if the response was not SSE at all
+        """
+        tail = self._pending + self._utf8.decode(b'', final=True)
+        self._pending = ""
+
+        deltas = []
+        content = self._decode_line(tail)
+        if content:
+            deltas.append(content)
+
+        if self._non_sse and not self.events:
+            try:
+                body = _json_loads('\n'.join(self._non_sse))
+                # Some gateways wrap the whole SSE stream in a JSON string
+                content = parse_sse_text(body) if isinstance(body, str) else _extract_content(body)
+            except ValueError:
+                content = ""
+            if content:
+                deltas.append(content)
+        self._non_sse = []
+
+        return deltas
+
+    def _decode_line(self, line: str) -> Optional[str]:
+        """Decode one complete line, returning its content delta if any"""
+        if line.endswith('\r'):
+            line = line[:-1]
+
+        if not line or line[0] == ':':
+            return None
+
+        if not line.startswith('data:'):
+            if not self.events:
+                self._non_sse.append(line)
+            return None
+
+        data = line[6:] if line.startswith('data: ') else line[5:]
+        if data == '[DONE]':
+            self.done = True
+            return None
+
+        try:
+            chunk = _json_loads(data)
+        except ValueError:
+            return None
+
+        self.events += 1
+        return _extract_content(chunk)
+
+
+def iter_sse_deltas(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Yield content deltas from an iterable of byte chunks
+
+    Args:
+        chunks: e.g. response.iter_content(chunk_size=None) on a streamed response
+    """
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        if chunk:
+            yield from decoder.feed(chunk)
+        if decoder.done:
+            break
+    yield from decoder.flush()
+
+
+def parse_sse_text(response_text: str) -> str:
+    """
+    Decode a fully buffered SSE (or plain JSON) response into its message text
+
+    Args:
+        response_text: Complete response body
+
+    Returns:
+        Concatenated content of every delta
+    """
+    decoder = SSEDecoder()
+    deltas = decoder.feed(response_text.encode('utf-8'))
+    deltas.extend(decoder.flush())
+    return ''.join(deltas)
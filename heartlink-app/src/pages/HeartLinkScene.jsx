@@ -8,6 +8,7 @@ import "../index.css";
 import socketService from "../services/socketService";
 import webrtcService from "../services/webrtcService";
 import apiService from "../services/apiService";
+import audioStreamPlayer from "../services/audioStreamPlayer";
 
 export default function HeartLinkScene() {
   const [activeSpeaker, setActiveSpeaker] = useState("user1");
@@ -25,6 +26,7 @@ export default function HeartLinkScene() {
   const localVideoRef = useRef(null);
   const remoteVideoRef = useRef(null);
   const currentAudioRef = useRef(null); // Track currently playing AI audio
+  const audioSegmentQueueRef = useRef([]); // Streamed agent audio segments waiting to play
 
   const navigate = useNavigate();
   const location = useLocation();
@@ -58,10 +60,16 @@ export default function HeartLinkScene() {
 
   const getCurrentColor = (colorId) => flameColors[colorId] || 0xff4500;
 
+  // Playable URL for agent audio sent as a binary attachment or as base64
+  const toAudioUrl = (audio, format = 'wav', mime = `audio/${format}`) => (typeof audio === 'string'
+    ? `data:${mime.split(';')[0]};base64,${audio}`
+    : URL.createObjectURL(new Blob([audio], { type: mime })));
+
   // Helper function to play AI audio safely (prevent overlaps)
   const playAIAudio = (audioData) => {
     try {
       // Stop currently playing audio if any
+      audioStreamPlayer.reset();
       if (currentAudioRef.current && !currentAudioRef.current.paused) {
         console.log('⏹️ Stopping previous AI audio');
         currentAudioRef.current.pause();
@@ -79,11 +87,14 @@ export default function HeartLinkScene() {
         console.error('❌ Failed to play AI audio:', err);
       });
 
-      // Clean up reference when done
+      // Clean up reference when done, then play the next streamed segment
       audio.onended = () => {
         console.log('🏁 AI audio finished');
+        if (audioData.startsWith('blob:')) URL.revokeObjectURL(audioData);
         if (currentAudioRef.current === audio) {
           currentAudioRef.current = null;
+          const next = audioSegmentQueueRef.current.shift();
+          if (next) playAIAudio(next);
         }
       };
     } catch (err) {
@@ -223,6 +234,26 @@ export default function HeartLinkScene() {
           // Use speaker_name from backend if available, otherwise fall back to user_id comparison
           const speakerName = data.speaker_name || (data.user_id === socket.id ? avatarName : remoteUserName);
 
+          // Streaming ASR: interim text for an utterance is replaced in place until its final
+          // arrives (an empty final means it was noise)
+          if (data.utterance_id !== undefined && data.utterance_id !== null) {
+            setTranscripts(prev => {
+              const index = prev.findIndex(t => t.utteranceKey === `${data.user_id}:${data.utterance_id}`);
+              if (index === -1 && !data.text) return prev;
+              const entry = {
+                speaker: speakerName,
+                text: data.text,
+                type: 'user',
+                interim: !data.final,
+                utteranceKey: `${data.user_id}:${data.utterance_id}`
+              };
+              if (index === -1) return [...prev, entry];
+              if (!data.text) return prev.filter((_, i) => i !== index);
+              return prev.map((t, i) => (i === index ? entry : t));
+            });
+            return;
+          }
+
           // Add transcript with deduplication check
           setTranscripts(prev => {
             // Check if this exact transcript was just added (within last 2 seconds)
@@ -266,20 +297,42 @@ export default function HeartLinkScene() {
 
           // Play audio if available (for backward compatibility)
           if (data.audio) {
-            const audioData = `data:audio/wav;base64,${data.audio}`;
-            playAIAudio(audioData);
+            playAIAudio(toAudioUrl(data.audio, data.format, data.mime));
           }
         });
 
         // Listen for agent audio (separate from text for faster response)
         socket.on('agent_audio', (data) => {
-          console.log('🔊 Agent audio received');
+          console.log('🔊 Agent audio received', data.streaming ? `(segment ${data.segment})` : '');
           if (data.audio) {
-            const audioData = `data:audio/wav;base64,${data.audio}`;
+            const audioData = toAudioUrl(data.audio, data.format, data.mime);
+
+            // Later segments of a streamed reply queue behind the one playing
+            if (data.streaming && data.segment > 0 && currentAudioRef.current) {
+              audioSegmentQueueRef.current.push(audioData);
+              return;
+            }
+
+            audioSegmentQueueRef.current = [];
             playAIAudio(audioData);
           }
         });
 
+        // Chunked agent audio: playback starts on the first chunk
+        socket.on('agent_audio_chunk', (data) => {
+          // First chunk of a new reply interrupts whatever is playing
+          if (data.seq === 0 && !data.segment) {
+            if (currentAudioRef.current) {
+              currentAudioRef.current.pause();
+              currentAudioRef.current = null;
+            }
+            audioSegmentQueueRef.current = [];
+            audioStreamPlayer.reset();
+            console.log('🔊 Agent audio stream started');
+          }
+          audioStreamPlayer.push(data);
+        });
+
         // Load both profiles to get remote user name
         if (sessionId) {
           try {
@@ -303,6 +356,7 @@ export default function HeartLinkScene() {
     return () => {
       // Cleanup on unmount
       webrtcService.cleanup();
+      audioStreamPlayer.reset();
     };
   }, [sessionId, userRole, avatarName, remoteUserName]);
 
@@ -547,7 +601,7 @@ export default function HeartLinkScene() {
                 ) : (
                   <span className="font-bold">{t.speaker}: </span>
                 )}
-                <span>{t.text}</span>
+                <span className={t.interim ? 'text-gray-400 italic' : undefined}>{t.text}</span>
               </p>
             ))
           )}
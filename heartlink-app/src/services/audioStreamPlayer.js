@@ -0,0 +1,157 @@
+// Plays streamed agent audio (agent_audio_chunk events) through Web Audio as
+// chunks arrive, instead of waiting for the whole WAV file.
+//
+// Each stream is one WAV file split into ordered chunks: the first chunk
+// carries the header, the rest are 16-bit PCM. Streams queue back to back.
+
+const START_DELAY_SEC = 0.05; // Small lead so the first buffer isn't scheduled in the past
+
+// Binary attachments arrive as ArrayBuffer, base64 fallback as a string
+const toBytes = (audio) => (typeof audio === 'string'
+  ? Uint8Array.from(atob(audio), (c) => c.charCodeAt(0))
+  : new Uint8Array(audio));
+
+const concatBytes = (a, b) => {
+  if (!a.length) return b;
+  const out = new Uint8Array(a.length + b.length);
+  out.set(a);
+  out.set(b, a.length);
+  return out;
+};
+
+// Returns { channels, sampleRate, bitsPerSample, dataOffset } once the header is complete
+const parseWavHeader = (bytes) => {
+  if (bytes.length < 12) return null;
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.length);
+  const tag = (pos) => String.fromCharCode(...bytes.subarray(pos, pos + 4));
+  if (tag(0) !== 'RIFF' || tag(8) !== 'WAVE') return { invalid: true };
+
+  let format = null;
+  let pos = 12;
+  while (pos + 8 <= bytes.length) {
+    const id = tag(pos);
+    const size = view.getUint32(pos + 4, true);
+    if (id === 'fmt ') {
+      if (pos + 24 > bytes.length) return null;
+      format = {
+        channels: view.getUint16(pos + 10, true),
+        sampleRate: view.getUint32(pos + 12, true),
+        bitsPerSample: view.getUint16(pos + 22, true),
+      };
+    } else if (id === 'data') {
+      return format ? { ...format, dataOffset: pos + 8 } : { invalid: true };
+    }
+    pos += 8 + size;
+  }
+  return null;
+};
+
+class AudioStreamPlayer {
+  constructor() {
+    this.context = null;
+    this.streams = new Map(); // stream_id -> reassembly state
+    this.sources = [];
+    this.nextStartTime = 0;
+  }
+
+  getContext() {
+    if (!this.context) {
+      this.context = new (window.AudioContext || window.webkitAudioContext)();
+    }
+    if (this.context.state === 'suspended') {
+      this.context.resume();
+    }
+    return this.context;
+  }
+
+  // Stop everything that is playing or queued
+  reset() {
+    this.sources.forEach((source) => {
+      try { source.stop(); } catch (err) { /* already stopped */ }
+    });
+    this.sources = [];
+    this.streams.clear();
+    this.nextStartTime = 0;
+  }
+
+  // Feed one agent_audio_chunk event; chunks are applied in seq order
+  push(chunk) {
+    let stream = this.streams.get(chunk.stream_id);
+    if (!stream) {
+      stream = { header: null, pending: new Uint8Array(0), expected: 0, waiting: new Map() };
+      this.streams.set(chunk.stream_id, stream);
+    }
+
+    stream.waiting.set(chunk.seq, chunk);
+    while (stream.waiting.has(stream.expected)) {
+      const next = stream.waiting.get(stream.expected);
+      stream.waiting.delete(stream.expected);
+      stream.expected += 1;
+
+      if (next.end) {
+        this.streams.delete(chunk.stream_id);
+        if (next.error) console.error('❌ Agent audio stream failed:', next.error);
+        return;
+      }
+      this.consume(stream, toBytes(next.audio));
+    }
+  }
+
+  consume(stream, bytes) {
+    let buffer = concatBytes(stream.pending, bytes);
+
+    if (!stream.header) {
+      const header = parseWavHeader(buffer);
+      if (!header) {
+        stream.pending = buffer; // Header not complete yet
+        return;
+      }
+      if (header.invalid || header.bitsPerSample !== 16) {
+        console.error('❌ Unsupported agent audio stream format');
+        stream.header = { invalid: true };
+      } else {
+        stream.header = header;
+      }
+      buffer = buffer.subarray(header.dataOffset || buffer.length);
+    }
+    if (stream.header.invalid) return;
+
+    // Only schedule whole frames; carry the remainder into the next chunk
+    const frameBytes = 2 * stream.header.channels;
+    const usable = buffer.length - (buffer.length % frameBytes);
+    stream.pending = buffer.slice(usable);
+    if (usable) this.schedule(stream.header, buffer.subarray(0, usable));
+  }
+
+  schedule(header, pcm) {
+    const context = this.getContext();
+    const { channels, sampleRate } = header;
+    const frames = pcm.length / (2 * channels);
+    const view = new DataView(pcm.buffer, pcm.byteOffset, pcm.length);
+
+    const audioBuffer = context.createBuffer(channels, frames, sampleRate);
+    for (let ch = 0; ch < channels; ch++) {
+      const samples = audioBuffer.getChannelData(ch);
+      for (let i = 0; i < frames; i++) {
+        samples[i] = view.getInt16((i * channels + ch) * 2, true) / 32768;
+      }
+    }
+
+    const source = context.createBufferSource();
+    source.buffer = audioBuffer;
+    source.connect(context.destination);
+
+    const startAt = Math.max(context.currentTime + START_DELAY_SEC, this.nextStartTime);
+    source.start(startAt);
+    this.nextStartTime = startAt + audioBuffer.duration;
+
+    this.sources.push(source);
+    source.onended = () => {
+      this.sources = this.sources.filter((s) => s !== source);
+    };
+  }
+}
+
+// Singleton instance
+const audioStreamPlayer = new AudioStreamPlayer();
+export default audioStreamPlayer;
@@ -0,0 +1,86 @@
+// Continuous mic capture for streaming STT: the mic track is resampled to
+// 16-bit mono PCM and handed out in fixed-length frames, with no gaps
+// between them (unlike MediaRecorder stop/start blobs).
+
+// Runs on the audio thread; forwards each 128-sample render quantum
+const WORKLET_SOURCE = `
+class PcmTap extends AudioWorkletProcessor {
+  process(inputs) {
+    const channel = inputs[0] && inputs[0][0];
+    if (channel) this.port.postMessage(channel.slice(0));
+    return true;
+  }
+}
+registerProcessor('pcm-tap', PcmTap);
+`;
+
+class PcmCapture {
+  constructor() {
+    this.context = null;
+    this.source = null;
+    this.node = null;
+    this.sink = null;
+    this.pending = []; // Resampled Int16 samples not yet sent
+    this.position = 0; // Fractional read position into the input for resampling
+    this.previous = 0; // Last input sample of the previous block (interpolation)
+  }
+
+  // onFrame(ArrayBuffer) is called with frameMs of 16-bit PCM at sampleRate
+  async start(mediaStream, { sampleRate, frameMs }, onFrame) {
+    this.stop();
+
+    const context = new (window.AudioContext || window.webkitAudioContext)();
+    const moduleUrl = URL.createObjectURL(new Blob([WORKLET_SOURCE], { type: 'application/javascript' }));
+    try {
+      await context.audioWorklet.addModule(moduleUrl);
+    } finally {
+      URL.revokeObjectURL(moduleUrl);
+    }
+
+    const frameSamples = Math.round((sampleRate * frameMs) / 1000);
+    const step = context.sampleRate / sampleRate;
+
+    this.context = context;
+    this.source = context.createMediaStreamSource(mediaStream);
+    this.node = new AudioWorkletNode(context, 'pcm-tap');
+    // The node has to reach the destination to be pulled; keep it silent
+    this.sink = context.createGain();
+    this.sink.gain.value = 0;
+    this.source.connect(this.node).connect(this.sink).connect(context.destination);
+
+    this.node.port.onmessage = ({ data: input }) => {
+      // Linear-interpolation resampler that carries its phase across blocks;
+      // positions are in input samples, -1 being the previous block's last one
+      let pos = this.position;
+      while (pos < input.length - 1) {
+        const i = Math.floor(pos);
+        const a = i < 0 ? this.previous : input[i];
+        const b = input[i + 1];
+        const sample = a + (b - a) * (pos - i);
+        this.pending.push(Math.max(-32768, Math.min(32767, Math.round(sample * 32767))));
+        pos += step;
+      }
+      this.position = pos - input.length;
+      this.previous = input[input.length - 1];
+
+      while (this.pending.length >= frameSamples) {
+        const frame = Int16Array.from(this.pending.splice(0, frameSamples));
+        onFrame(frame.buffer);
+      }
+    };
+
+    if (context.state === 'suspended') await context.resume();
+  }
+
+  stop() {
+    if (this.node) this.node.port.onmessage = null;
+    [this.source, this.node, this.sink].forEach((node) => node && node.disconnect());
+    if (this.context) this.context.close();
+    this.context = this.source = this.node = this.sink = null;
+    this.pending = [];
+    this.position = 0;
+    this.previous = 0;
+  }
+}
+
+export default PcmCapture;
@@ -3,11 +3,25 @@ import { io } from 'socket.io-client';
 // Use environment variable for backend URL (ngrok tunnel) or fall back to localhost
 const BACKEND_URL = import.meta.env.VITE_BACKEND_URL || `https://${window.location.hostname}`;
 
+// TTS formats to ask the server for, most preferred first. WAV plays from the
+// first streamed chunk; on mobile or data-saver connections compressed audio
+// wins, since a WAV reply is several hundred KB.
+const preferredAudioFormats = () => {
+  const probe = new Audio();
+  const compressed = [
+    ['opus', 'audio/ogg; codecs=opus'],
+    ['mp3', 'audio/mpeg'],
+  ].filter(([, mime]) => probe.canPlayType(mime)).map(([format]) => format);
+  const constrained = navigator.connection?.saveData || /Mobi|Android/i.test(navigator.userAgent);
+  return constrained ? [...compressed, 'wav'] : ['wav', ...compressed];
+};
+
 class SocketService {
   constructor() {
     this.socket = null;
     this.sessionId = null;
     this.userRole = null;
+    this.audioStreamConfig = null; // Set when the server accepts streaming mic audio
   }
 
   connect() {
@@ -32,6 +46,19 @@ class SocketService {
       timeout: 20000,           // 20s connection timeout
       forceNew: false,          // Reuse existing connection
       multiplex: true,          // Allow multiplexing
+      auth: {
+        binary_audio: true, // Receive agent audio as binary attachments instead of base64
+        audio_formats: preferredAudioFormats(),
+        // Stream continuous PCM frames for STT instead of 2-second recordings
+        audio_stream: import.meta.env.VITE_AUDIO_STREAMING !== 'false',
+        // transcript_update also carries interim (final: false) text while someone is still talking
+        interim_transcripts: true,
+      },
+    });
+
+    // Sent right after connect; older servers never send it and get audio_chunk recordings
+    this.socket.on('audio_stream_config', (config) => {
+      this.audioStreamConfig = config;
     });
 
     this.socket.on('connect', () => {
@@ -102,6 +129,10 @@ class SocketService {
     return this.socket;
   }
 
+  getAudioStreamConfig() {
+    return this.audioStreamConfig;
+  }
+
   getSessionId() {
     return this.sessionId;
   }
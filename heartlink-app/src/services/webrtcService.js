@@ -5,6 +5,13 @@ const configuration = {
   ]
 };
 
+import socketService from './socketService';
+import PcmCapture from './pcmCapture';
+
+// Length of each recorded STT chunk; stretched while the server's ASR queue is backed up
+const CAPTURE_MS = 2000;
+const SLOW_CAPTURE_MS = 4000;
+
 class WebRTCService {
   constructor() {
     this.peerConnection = null;
@@ -19,6 +26,10 @@ class WebRTCService {
     this.audioChunks = [];
     this.isRecording = false;
     this.isCallInitiated = false; // Flag to prevent duplicate calls
+    this.slowDownUntil = 0; // Send longer chunks until then (asr_slow_down)
+    this.pcmCapture = null; // Streaming mode: continuous PCM frames instead of recordings
+    this.frameSeq = 0;
+    this.streamingFailed = false; // AudioWorklet unavailable: stay on recordings
   }
 
   setSocket(socket) {
@@ -29,6 +40,11 @@ class WebRTCService {
   setupSocketListeners() {
     if (!this.socket) return;
 
+    this.socket.on('asr_slow_down', (data) => {
+      this.slowDownUntil = Date.now() + Math.max(data.retry_after_ms || 0, SLOW_CAPTURE_MS);
+      console.warn(`🐢 ASR backlog (${data.queue_depth} queued), sending longer audio chunks`);
+    });
+
     this.socket.on('user_joined', (data) => {
       console.log('👤 User joined:', data.id);
       console.log('   My socket ID:', this.socket.id);
@@ -108,6 +124,13 @@ class WebRTCService {
       }
       
       const audioOnlyStream = new MediaStream([audioTrack]);
+
+      const streamConfig = socketService.getAudioStreamConfig();
+      if (streamConfig && !this.streamingFailed) {
+        this.startStreamingCapture(audioOnlyStream, streamConfig);
+        return;
+      }
+
       // Use reasonable bitrate for good STT accuracy
       this.mediaRecorder = new MediaRecorder(audioOnlyStream, {
         mimeType: 'audio/webm',
@@ -128,21 +151,22 @@ class WebRTCService {
         if (audioBlob.size < 2000) {
           console.log('⏭️ Skipping small audio chunk');
           if (this.isRecording) this.scheduleNextCapture();
+          else if (this.socket) this.socket.emit('audio_stream_end', {});
           return;
         }
 
-        // Convert to base64 and send via socket
-        const reader = new FileReader();
-        reader.readAsDataURL(audioBlob);
-        reader.onloadend = () => {
-          const base64Audio = reader.result.split(',')[1];
+        // Send the raw bytes as a binary attachment (no base64 inflation)
+        const stopped = !this.isRecording;
+        audioBlob.arrayBuffer().then((audioBuffer) => {
           if (this.socket) {
             this.socket.emit('audio_chunk', {
-              audio: base64Audio,
+              audio: audioBuffer,
               room: 'matchmaking'
             });
+            // Server stitches recordings into utterances; the last one ends here
+            if (stopped) this.socket.emit('audio_stream_end', {});
           }
-        };
+        });
 
         // Restart recording for continuous capture
         if (this.isRecording) {
@@ -158,7 +182,7 @@ class WebRTCService {
         if (this.isRecording && this.mediaRecorder && this.mediaRecorder.state === 'recording') {
           this.mediaRecorder.stop();
         }
-      }, 2000);
+      }, this.captureDurationMs());
 
       console.log('🎤 Audio capture started for STT');
     } catch (error) {
@@ -173,12 +197,45 @@ class WebRTCService {
         if (this.isRecording && this.mediaRecorder && this.mediaRecorder.state === 'recording') {
           this.mediaRecorder.stop();
         }
-      }, 2000);
+      }, this.captureDurationMs());
     }
   }
 
+  captureDurationMs() {
+    return Date.now() < this.slowDownUntil ? SLOW_CAPTURE_MS : CAPTURE_MS;
+  }
+
+  // Server cuts utterances at pauses, so frames are sent back to back with no gaps
+  startStreamingCapture(audioOnlyStream, streamConfig) {
+    this.pcmCapture = new PcmCapture();
+    this.frameSeq = 0;
+    this.isRecording = true;
+
+    this.pcmCapture.start(audioOnlyStream, streamConfig, (pcm) => {
+      if (this.socket) {
+        this.socket.emit('audio_frame', {
+          seq: this.frameSeq++,
+          sample_rate: streamConfig.sample_rate,
+          pcm
+        });
+      }
+    }).then(() => {
+      console.log('🎤 Streaming audio capture started for STT');
+    }).catch((error) => {
+      console.warn('⚠️ Streaming capture unavailable, using chunked recording:', error);
+      this.pcmCapture = null;
+      this.streamingFailed = true;
+      this.startAudioCapture();
+    });
+  }
+
   stopAudioCapture() {
     this.isRecording = false;
+    if (this.pcmCapture) {
+      this.pcmCapture.stop();
+      this.pcmCapture = null;
+      if (this.socket) this.socket.emit('audio_stream_end', {});
+    }
     if (this.mediaRecorder && this.mediaRecorder.state !== 'inactive') {
       this.mediaRecorder.stop();
     }
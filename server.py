@@ -4,6 +4,7 @@ from app import routes
 from app import session_manager
 from app import profile_manager
 from app import agent_manager
+from app import sse
 import sys
 import os
 import socket
@@ -11,6 +12,11 @@ import base64
 import requests
 import json
 import time
+import uuid
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import anthropic
 from dotenv import load_dotenv
 
@@ -19,7 +25,15 @@ load_dotenv()
 
 # Add src directory to path for Fish Audio imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-from fish import stream_asr, stream_tts
+from fish import negotiate_format, AUDIO_FORMATS
+from fish import get_tts_cache_stats, get_audio_bank, warm_audio_bank, get_bank_audio
+from fish import stream_tts_parallel, iter_tts_parallel, get_parallel_tts_stats
+from fish.tts import iter_audio_chunks
+from fish import get_asr_pool, get_asr_pool_stats, get_vad_stats, check_ffmpeg
+from fish.asr_pool import QUEUED, THROTTLED
+from fish.segmenter import SpeechSegmenter, STREAM_SAMPLE_RATE
+from fish.asr_stream import StreamingTranscriber
+from fish.vad import decode_pcm
 
 app = Flask(__name__, template_folder='app/templates', static_folder='app/static')
 app.config['SECRET_KEY'] = 'your-secret-key-here'
@@ -40,6 +54,18 @@ socketio = SocketIO(
 active_users = {}  # socket_id -> user_info
 user_sessions = {}  # socket_id -> session_id
 
+# Audio delivery negotiated per client at connect: sid -> {'binary': bool, 'format': str}
+# binary: raw attachments instead of base64; format: TTS output format (wav/mp3/opus)
+client_audio = {}
+
+# Audio bytes moved over Socket.IO, per encoding
+audio_transport_stats = {
+    'sent_binary_events': 0, 'sent_binary_bytes': 0,
+    'sent_base64_events': 0, 'sent_base64_bytes': 0,
+    'received_binary_chunks': 0, 'received_binary_bytes': 0,
+    'received_base64_chunks': 0, 'received_base64_bytes': 0
+}
+
 # Store transcript buffers per user/room
 transcript_buffers = {}
 
@@ -63,52 +89,117 @@ CLAUDE_MODEL = "claude-sonnet-4-5-20250929"
 
 # AI agent configuration (now handled by agent_manager.py)
 # Note: Agent timing and turn counting is managed in agent_manager.py
+# Stream agent replies sentence by sentence into TTS (set AGENT_STREAMING=0 for one-shot replies)
+AGENT_STREAMING = os.getenv('AGENT_STREAMING', 'true').lower() in ['1', 'true', 'yes']
+# Pre-generate the next agent reply (and optionally its audio) while the cooldown runs out
+AGENT_SPECULATIVE = os.getenv('AGENT_SPECULATIVE', 'false').lower() in ['1', 'true', 'yes']
+AGENT_SPECULATIVE_AUDIO = os.getenv('AGENT_SPECULATIVE_AUDIO', 'false').lower() in ['1', 'true', 'yes']
+# Send agent audio as ordered agent_audio_chunk events while TTS runs (set AGENT_AUDIO_CHUNKED=0 for one agent_audio per reply)
+AGENT_AUDIO_CHUNKED = os.getenv('AGENT_AUDIO_CHUNKED', 'true').lower() in ['1', 'true', 'yes']
+# Long replies are synthesized sentence by sentence in parallel (FISH_TTS_PARALLEL_WORKERS, 0 = one serial request)
 
 # Audio quality thresholds (optimized for demo)
 MIN_TRANSCRIPT_LENGTH = 5  # Minimum characters to be considered valid (increased to skip short noises)
 MIN_AUDIO_SIZE = 2000  # Minimum audio bytes (increased to filter out more noise)
 NOISE_KEYWORDS = ['[silence]', '[noise]', '[music]']  # Common noise patterns (removed um/uh/hmm for natural speech)
 
-def parse_streaming_response(response_text):
-    """
-    Parse Server-Sent Events (SSE) streaming response from JanitorAI.
-
-    Format: data: {"choices":[{"delta":{"content":"text"}}]}
+# ASR runs on the fish.asr_pool workers (FISH_ASR_WORKERS, FISH_ASR_MAX_QUEUE, FISH_ASR_OVERFLOW),
+# behind voice activity detection that drops silent chunks (FISH_VAD, FISH_VAD_DETECTOR);
+# finished jobs are handed back to the Socket.IO side through this queue
+asr_results = deque()  # (handler, args) in completion order
+ASR_RESULT_POLL_SEC = 0.05
+asr_pump_started = False
+
+# Continuous ingestion: clients that send audio_stream in the connect auth
+# stream PCM audio_frame events, cut into utterances per speaker server-side
+AUDIO_STREAM_INGEST = os.getenv('AUDIO_STREAM_INGEST', 'true').lower() in ['1', 'true', 'yes']
+AUDIO_FRAME_MS = 100  # Frame length clients are asked to send
+audio_segmenters = {}  # socket_id -> SpeechSegmenter
+
+# Interim transcripts: for clients that send interim_transcripts in the connect auth,
+# utterances are recognized while they are spoken (fish.asr_stream, FISH_ASR_STREAM_BACKEND)
+# and transcript_update carries final=False hypotheses; only finals reach the session.
+# Opt-in: the fish backend re-uploads the utterance for each interim, up to
+# FISH_ASR_MAX_INTERIMS extra requests per utterance on top of the final
+ASR_STREAMING = os.getenv('ASR_STREAMING', 'false').lower() in ['1', 'true', 'yes']
+asr_streams = {}  # socket_id -> StreamingTranscriber
+
+# eventlet runs without monkey-patching, so a blocking call (LLM, TTS) inside a
+# greenlet freezes every socket. Such calls go to these real threads and the
+# calling greenlet polls for the result (run_blocking / iter_blocking).
+BLOCKING_WORKERS = int(os.getenv('BLOCKING_WORKERS', 16))
+BLOCKING_POLL_SEC = 0.02
+blocking_pool = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix='blocking')
+
+def wait_for(future):
+    """Result of a future, yielding to other greenlets until it is done"""
+    while not future.done():
+        socketio.sleep(BLOCKING_POLL_SEC)
+    return future.result()
+
+def run_blocking(fn, *args, **kwargs):
+    """Call fn on a worker thread; only the calling greenlet waits for it"""
+    return wait_for(blocking_pool.submit(fn, *args, **kwargs))
+
+def drain_thread_queue(items):
+    """Next item from a queue.Queue filled by a worker thread, waiting cooperatively"""
+    while True:
+        try:
+            return items.get_nowait()
+        except queue.Empty:
+            socketio.sleep(BLOCKING_POLL_SEC)
 
-    Returns the complete message by aggregating all delta chunks.
+def iter_blocking(iterable):
     """
-    try:
-        complete_message = []
-
-        # Split by lines and process each data chunk
-        lines = response_text.strip().split('\n')
-
-        for line in lines:
-            line = line.strip()
+    Consume a blocking iterator (e.g. TTS chunks) on a worker thread, which
+    starts right away, and return a generator that hands its items to the
+    calling greenlet. Closing the generator stops the worker.
+    """
+    items = queue.Queue()
+    stop = threading.Event()
 
-            # Skip empty lines
-            if not line:
-                continue
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                items.put((True, item))
+                if stop.is_set():
+                    break
+        except Exception as e:
+            items.put((False, e))
+            return
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+        items.put((False, None))
 
-            # Remove 'data: ' prefix
-            if line.startswith('data: '):
-                json_str = line[6:]  # Remove 'data: '
+    blocking_pool.submit(produce)
 
-                try:
-                    chunk = json.loads(json_str)
+    def consume():
+        try:
+            while True:
+                ok, item = drain_thread_queue(items)
+                if ok:
+                    yield item
+                elif item is None:
+                    return
+                else:
+                    raise item
+        finally:
+            stop.set()
 
-                    # Extract content from delta
-                    if 'choices' in chunk and len(chunk['choices']) > 0:
-                        delta = chunk['choices'][0].get('delta', {})
-                        content = delta.get('content', '')
+    return consume()
 
-                        if content:
-                            complete_message.append(content)
+def parse_streaming_response(response_text):
+    """
+    Parse Server-Sent Events (SSE) streaming response from JanitorAI.
 
-                except json.JSONDecodeError:
-                    continue
+    Format: data: {"choices":[{"delta":{"content":"text"}}]}
 
-        result = ''.join(complete_message)
+    Returns the complete message by aggregating all delta chunks.
+    """
+    try:
+        result = sse.parse_sse_text(response_text)
         print(f"Parsed streaming message: {result}")
         return result
 
@@ -330,7 +421,7 @@ def api_trigger_agent():
     if not session_id:
         return jsonify({"error": "Missing session_id"}), 400
     
-    success, response_text, error = agent_manager.trigger_agent(session_id)
+    success, response_text, error = run_blocking(agent_manager.trigger_agent, session_id)
     
     if success:
         return jsonify({
@@ -351,6 +442,109 @@ def api_agent_stats(session_id):
     stats = agent_manager.get_agent_stats(session_id)
     return jsonify(stats)
 
+@app.route('/api/agent/llm-stats', methods=['GET'])
+def api_llm_stats():
+    """Get connection pool reuse metrics for the LLM client"""
+    return jsonify(agent_manager.get_llm_client_stats())
+
+@app.route('/api/agent/dispatch-stats', methods=['GET'])
+def api_dispatch_stats():
+    """Get LLM dispatcher queue depth and wait-time metrics"""
+    return jsonify(agent_manager.get_dispatcher_stats())
+
+@app.route('/api/agent/provider-stats', methods=['GET'])
+def api_provider_stats():
+    """Get per-provider win rates and latencies for hedged LLM calls"""
+    return jsonify(agent_manager.get_provider_stats())
+
+@app.route('/api/agent/run-stats', methods=['GET'])
+def api_run_stats():
+    """Get single-flight agent run and trigger coalescing metrics"""
+    return jsonify(agent_manager.get_scheduler_stats())
+
+@app.route('/api/agent/speculation-stats', methods=['GET'])
+def api_speculation_stats():
+    """Get speculative reply hit, miss and waste metrics"""
+    return jsonify(agent_manager.get_speculation_stats())
+
+@app.route('/api/tts/cache-stats', methods=['GET'])
+def api_tts_cache_stats():
+    """Get TTS cache hit, miss and latency-saved metrics"""
+    return jsonify(get_tts_cache_stats())
+
+@app.route('/api/audio/transport-stats', methods=['GET'])
+def api_audio_transport_stats():
+    """Get binary vs base64 audio event counts and bytes"""
+    formats = {}
+    for prefs in client_audio.values():
+        formats[prefs['format']] = formats.get(prefs['format'], 0) + 1
+    return jsonify(dict(audio_transport_stats,
+                        binary_clients=sum(1 for prefs in client_audio.values() if prefs['binary']),
+                        client_formats=formats))
+
+@app.route('/api/tts/bank-stats', methods=['GET'])
+def api_audio_bank_stats():
+    """Get pre-rendered fallback audio bank status"""
+    return jsonify(get_audio_bank().get_stats())
+
+@app.route('/api/asr/pool-stats', methods=['GET'])
+def api_asr_pool_stats():
+    """Get ASR queue depth, overflow and latency metrics"""
+    return jsonify(get_asr_pool_stats())
+
+@app.route('/api/asr/vad-stats', methods=['GET'])
+def api_vad_stats():
+    """Get how many audio chunks voice activity detection kept away from ASR"""
+    return jsonify(get_vad_stats())
+
+@app.route('/api/audio/stream-stats', methods=['GET'])
+def api_audio_stream_stats():
+    """Get per-speaker segmentation metrics for streaming mic ingestion"""
+    speakers = {sid: segmenter.get_stats() for sid, segmenter in list(audio_segmenters.items())}
+    return jsonify({
+        'enabled': AUDIO_STREAM_INGEST,
+        'streaming_clients': sum(1 for prefs in client_audio.values() if prefs.get('stream')),
+        'segments': sum(stats['segments'] for stats in speakers.values()),
+        'buffer_bytes': sum(stats['buffer_bytes'] for stats in speakers.values()),
+        'speakers': speakers
+    })
+
+@app.route('/api/asr/stream-stats', methods=['GET'])
+def api_asr_stream_stats():
+    """Get interim/final counts and how early text shows up with streaming ASR"""
+    speakers = {sid: stream.get_stats() for sid, stream in list(asr_streams.items())}
+    timed = [stats for stats in speakers.values() if stats['finals']]
+    utterances = sum(stats['utterances'] for stats in speakers.values())
+    asr_requests = sum(stats['asr_requests'] for stats in speakers.values())
+    return jsonify({
+        'enabled': ASR_STREAMING,
+        'interims': sum(stats['interims'] for stats in speakers.values()),
+        'finals': sum(stats['finals'] for stats in speakers.values()),
+        'utterances': utterances,
+        'asr_requests': asr_requests,
+        'asr_requests_per_utterance': asr_requests / utterances if utterances else 0,
+        'uploaded_bytes': sum(stats['uploaded_bytes'] for stats in speakers.values()),
+        'first_interim_avg_ms': sum(stats['first_interim_avg_ms'] for stats in timed) / len(timed) if timed else 0,
+        'final_lag_avg_ms': sum(stats['final_lag_avg_ms'] for stats in timed) / len(timed) if timed else 0,
+        'speakers': speakers
+    })
+
+@app.route('/api/tts/parallel-stats', methods=['GET'])
+def api_parallel_tts_stats():
+    """Get parallel sentence synthesis counters"""
+    return jsonify(get_parallel_tts_stats())
+
+def requested_audio_format(data: dict) -> str:
+    """
+    TTS format for an HTTP request: a 'formats' preference list or single
+    'format' in the body, else the Accept header, else WAV
+    """
+    accepted = data.get('formats') or ([data['format']] if data.get('format') else None)
+    if not accepted:
+        mime_to_format = {mime.split(';')[0]: fmt for fmt, mime in AUDIO_FORMATS.items()}
+        accepted = [mime_to_format[mime] for mime, _ in request.accept_mimetypes if mime in mime_to_format]
+    return negotiate_format(accepted)
+
 @app.route('/api/agent/tts', methods=['POST'])
 def api_agent_tts():
     """Convert agent text to speech"""
@@ -361,26 +555,48 @@ def api_agent_tts():
         return jsonify({"error": "Missing text"}), 400
     
     try:
-        # Generate audio using Fish Audio TTS
-        audio_bytes = stream_tts(text)
+        # Generate audio using Fish Audio TTS in the format the client asked for
+        audio_format = requested_audio_format(data)
+        audio_bytes = run_blocking(stream_tts_parallel, text, audio_format=audio_format)
         audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
         
         return jsonify({
             "success": True,
             "audio": audio_base64,
-            "format": "wav"
+            "format": audio_format,
+            "mime": AUDIO_FORMATS[audio_format]
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 @socketio.on('connect')
-def handle_connect():
-    print(f'Client connected: {request.sid}')
+def handle_connect(auth=None):
+    # Clients declare their audio capabilities in the connect auth payload
+    capabilities = auth if isinstance(auth, dict) else {}
+    client_audio[request.sid] = {
+        'binary': bool(capabilities.get('binary_audio')),
+        'format': negotiate_format(capabilities.get('audio_formats')),
+        'stream': bool(capabilities.get('audio_stream')) and AUDIO_STREAM_INGEST,
+        'interim': bool(capabilities.get('interim_transcripts')) and ASR_STREAMING
+    }
+    prefs = client_audio[request.sid]
+    print(f'Client connected: {request.sid} ({prefs["format"]} audio, {"binary" if prefs["binary"] else "base64"}'
+          f'{", streaming mic" if prefs["stream"] else ""}{", interim transcripts" if prefs["interim"] else ""})')
     emit('user_id', {'id': request.sid})
+    if prefs['stream']:
+        # Without this the client keeps sending 2-second audio_chunk recordings
+        emit('audio_stream_config', {'sample_rate': STREAM_SAMPLE_RATE, 'frame_ms': AUDIO_FRAME_MS})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     print(f'Client disconnected: {request.sid}')
+    client_audio.pop(request.sid, None)
+    audio_segmenters.pop(request.sid, None)
+    asr_stream = asr_streams.pop(request.sid, None)
+    if asr_stream:
+        asr_stream.close()
+    get_asr_pool().discard(request.sid)
+    get_asr_pool().discard(decode_job_key(request.sid))
     
     # End session if user was in one
     if request.sid in user_sessions:
@@ -543,7 +759,9 @@ def is_meaningful_transcript(transcript, audio_size):
 def handle_audio_chunk(data):
     """
     Handle incoming audio chunks for STT processing.
-    Audio is sent as base64-encoded data.
+    Audio is sent as a binary attachment, or as base64 by older clients.
+    The chunk is queued on the ASR pool via submit_asr, or for clients that
+    take interim transcripts decoded and streamed into their segmenter.
     """
     try:
         user_id = request.sid
@@ -554,60 +772,273 @@ def handle_audio_chunk(data):
             print(f"⚠️ Audio chunk from {user_id} - no session_id!")
             print(f"   Active user_sessions: {user_sessions}")
 
-        # Decode base64 audio data
-        audio_data = base64.b64decode(data['audio'])
+        audio_data = decode_audio_payload(data['audio'])
 
         # Check if audio is large enough (noise filter)
         if len(audio_data) < MIN_AUDIO_SIZE:
             return
 
-        # Use Fish Audio for STT
-        transcript = stream_asr(audio_data)
+        if client_audio.get(user_id, {}).get('interim'):
+            # Decode off the event loop (webm goes through ffmpeg), then stream it
+            ensure_asr_pump()
+            get_asr_pool().submit(
+                decode_job_key(user_id), audio_data,
+                on_result=lambda decoded, audio_size: asr_results.append(
+                    (ingest_decoded_chunk, (user_id, room, session_id, audio_data, decoded))),
+                on_error=lambda error: asr_results.append((report_stt_error, (user_id, error))),
+                transcribe=decode_pcm,
+                exempt=True  # Losing a decode loses audio the segmenter has already counted on
+            )
+            return
+
+        submit_asr(user_id, room, session_id, audio_data)
 
+    except Exception as e:
+        print(f"Error processing audio chunk: {e}")
+        emit('stt_error', {'error': str(e)})
+
+@socketio.on('audio_frame')
+def handle_audio_frame(data):
+    """
+    Streaming ingestion: one sequence-numbered frame of 16-bit mono PCM.
+    The speaker's segmenter cuts the stream at speech pauses and each
+    utterance goes to ASR once.
+    """
+    try:
+        user_id = request.sid
+        room = active_users.get(user_id, 'default')
+
+        segmenter = get_speech_segmenter(user_id, int(data.get('sample_rate', STREAM_SAMPLE_RATE)))
+        segments = segmenter.push(int(data['seq']), decode_audio_payload(data['pcm']))
+
+        if segmenter.in_speech:
+            # Live speech holds back agent audio before any transcript exists
+            last_user_audio[room] = time.time()
+
+        for segment in segments:
+            submit_asr(user_id, room, user_sessions.get(user_id), segment)
+
+    except Exception as e:
+        print(f"Error processing audio frame: {e}")
+        emit('stt_error', {'error': str(e)})
+
+@socketio.on('audio_stream_end')
+def handle_audio_stream_end(data=None):
+    """Mic stopped: send the utterance in progress to ASR"""
+    user_id = request.sid
+    if client_audio.get(user_id, {}).get('interim'):
+        # Recordings still being decoded belong before the end of the stream
+        ensure_asr_pump()
+        get_asr_pool().submit(
+            decode_job_key(user_id), b'',
+            on_result=lambda result, audio_size: asr_results.append((flush_segmenter, (user_id,))),
+            transcribe=lambda audio: None,
+            exempt=True
+        )
+        return
+    flush_segmenter(user_id)
+
+def flush_segmenter(user_id):
+    """End the user's audio stream: the utterance in progress goes to ASR"""
+    segmenter = audio_segmenters.get(user_id)
+    if segmenter is None:
+        return
+    room = active_users.get(user_id, 'default')
+    for segment in segmenter.flush():
+        submit_asr(user_id, room, user_sessions.get(user_id), segment)
+
+def get_speech_segmenter(user_id, sample_rate):
+    """
+    The user's segmenter for sample_rate. For clients that take interim
+    transcripts it hands utterances to a StreamingTranscriber as they are
+    spoken; otherwise push() returns whole utterances for submit_asr.
+    """
+    segmenter = audio_segmenters.get(user_id)
+    if segmenter is not None and segmenter.sample_rate == sample_rate:
+        return segmenter
+
+    listener = None
+    if client_audio.get(user_id, {}).get('interim'):
+        ensure_asr_pump()
+        previous = asr_streams.pop(user_id, None)
+        if previous:
+            previous.close()
+        listener = asr_streams[user_id] = StreamingTranscriber(
+            user_id, sample_rate=sample_rate,
+            on_hypothesis=lambda hypothesis: asr_results.append((handle_hypothesis, (user_id, hypothesis))),
+            on_error=lambda error: asr_results.append((report_stt_error, (user_id, error)))
+        )
+    segmenter = audio_segmenters[user_id] = SpeechSegmenter(sample_rate=sample_rate, listener=listener)
+    return segmenter
+
+def decode_job_key(user_id):
+    """Pool queue for decoding a user's chunks, apart from their recognizer steps"""
+    return f'{user_id}:decode'
+
+def ingest_decoded_chunk(user_id, room, session_id, audio_data, decoded):
+    """Stream a decoded audio_chunk into the user's segmenter (whole-chunk ASR if it didn't decode)"""
+    if decoded is None:
+        submit_asr(user_id, room, session_id, audio_data)
+        return
+    pcm, sample_rate = decoded
+    segmenter = get_speech_segmenter(user_id, sample_rate)
+    # Recordings follow each other, so they are numbered as consecutive frames
+    segmenter.push(segmenter.expected_seq, pcm.tobytes())
+    if segmenter.in_speech:
+        last_user_audio[room] = time.time()
+
+def submit_asr(user_id, room, session_id, audio_data):
+    """
+    Queue audio on the ASR pool; handle_transcript runs once it is
+    transcribed, in the order this user's audio arrived
+    """
+    ensure_asr_pump()
+
+    # Use Fish Audio for STT, off the event loop
+    asr_pool = get_asr_pool()
+    outcome = asr_pool.submit(
+        user_id, audio_data,
+        on_result=lambda transcript, audio_size: asr_results.append(
+            (handle_transcript, (user_id, room, session_id, transcript, audio_size))),
+        on_error=lambda error: asr_results.append((report_stt_error, (user_id, error)))
+    )
+
+    if outcome == THROTTLED:
+        # Backlog is full: ask the client to send fewer, longer chunks for a while
+        socketio.emit('asr_slow_down', {
+            'retry_after_ms': asr_pool.retry_after_ms(user_id),
+            'queue_depth': asr_pool.queue_depth(user_id)
+        }, room=user_id)
+    elif outcome != QUEUED:
+        print(f"⚠️ ASR backlog for {user_id}: {outcome}")
+
+def ensure_asr_pump():
+    """Start the background task that applies finished ASR jobs (once)"""
+    global asr_pump_started
+    if not asr_pump_started:
+        asr_pump_started = True
+        socketio.start_background_task(asr_result_pump)
+
+def asr_result_pump():
+    """
+    Background task: apply finished ASR jobs on the Socket.IO side.
+    Pool workers are plain threads, so they queue results here instead of
+    emitting themselves; per-speaker order is kept by the pool.
+    """
+    while True:
+        while asr_results:
+            handler, args = asr_results.popleft()
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"Error handling ASR result: {e}")
+        socketio.sleep(ASR_RESULT_POLL_SEC)
+
+def report_stt_error(user_id, error):
+    """Tell the user their chunk could not be transcribed"""
+    print(f"Error processing audio chunk: {error}")
+    socketio.emit('stt_error', {'error': str(error)}, room=user_id)
+
+def resolve_speaker(user_id, session_id):
+    """
+    Speaker role ('A'/'B') and display name of user_id in a session,
+    (None, None) if they aren't in one
+    """
+    speaker_role = None
+    speaker_name = None
+
+    if not session_id:
+        return speaker_role, speaker_name
+
+    try:
+        session = session_manager.load_session(session_id)
+        if session and 'participants' in session:
+            participants = session['participants']
+
+            # Determine speaker role (A or B)
+            if participants.get('A') == user_id:
+                speaker_role = 'A'
+            elif participants.get('B') == user_id:
+                speaker_role = 'B'
+            else:
+                print(f"⚠️ User {user_id} not found in session participants: {participants}")
+
+            if speaker_role:
+                # Get speaker name from profiles
+                try:
+                    profiles = profile_manager.get_both_profiles(session_id)
+                    speaker_profile = profiles.get(speaker_role)
+                    if speaker_profile:
+                        speaker_name = speaker_profile.get('name', f'User {speaker_role}')
+                except:
+                    speaker_name = f'User {speaker_role}'
+        else:
+            print(f"⚠️ Session {session_id} missing participants field")
+    except KeyError as e:
+        print(f"❌ Session missing required fields: {e}")
+    except Exception as e:
+        print(f"❌ Error loading session {session_id}: {e}")
+
+    return speaker_role, speaker_name
+
+def handle_hypothesis(user_id, hypothesis):
+    """
+    Apply one streaming ASR hypothesis. Interims are only broadcast (and
+    hold back agent audio); finals go through handle_transcript.
+    """
+    room = active_users.get(user_id, 'default')
+    session_id = user_sessions.get(user_id)
+
+    if hypothesis.final:
+        handle_transcript(user_id, room, session_id, hypothesis.text, hypothesis.audio_bytes,
+                          utterance_id=hypothesis.utterance)
+        return
+
+    speaker_role, speaker_name = resolve_speaker(user_id, session_id)
+    socketio.emit('transcript_update', {
+        'user_id': user_id,
+        'speaker_role': speaker_role,
+        'speaker_name': speaker_name,
+        'text': hypothesis.text,
+        'session_id': session_id,
+        'final': False,
+        'utterance_id': hypothesis.utterance
+    }, room=room)
+
+    last_audio_activity[room] = time.time()
+    last_user_audio[room] = time.time()
+
+def handle_transcript(user_id, room, session_id, transcript, audio_size, utterance_id=None):
+    """
+    Apply one ASR result: store it, broadcast it and check the agent trigger
+
+    Args:
+        utterance_id: Set for streaming finals; interims shown for the
+            utterance are replaced by this transcript, or cleared if it is noise
+    """
+    try:
         # Check if transcript is meaningful
-        if not is_meaningful_transcript(transcript, len(audio_data)):
+        if not is_meaningful_transcript(transcript, audio_size):
+            if utterance_id is not None:
+                socketio.emit('transcript_update', {
+                    'user_id': user_id,
+                    'text': '',
+                    'session_id': session_id,
+                    'final': True,
+                    'utterance_id': utterance_id
+                }, room=room)
             return
 
-        import time
-
         # Determine speaker info
-        speaker_role = None
-        speaker_name = None
+        speaker_role, speaker_name = resolve_speaker(user_id, session_id)
 
         # Store in session manager if user is in a session
-        if session_id:
+        if speaker_role:
             try:
-                session = session_manager.load_session(session_id)
-                if session and 'participants' in session:
-                    participants = session['participants']
-
-                    # Determine speaker role (A or B)
-                    if participants.get('A') == user_id:
-                        speaker_role = 'A'
-                    elif participants.get('B') == user_id:
-                        speaker_role = 'B'
-                    else:
-                        print(f"⚠️ User {user_id} not found in session participants: {participants}")
-                        speaker_role = None
-
-                    if speaker_role:
-                        # Get speaker name from profiles
-                        try:
-                            profiles = profile_manager.get_both_profiles(session_id)
-                            speaker_profile = profiles.get(speaker_role)
-                            if speaker_profile:
-                                speaker_name = speaker_profile.get('name', f'User {speaker_role}')
-                        except:
-                            speaker_name = f'User {speaker_role}'
-
-                        # Add to session transcript
-                        session_manager.append_transcript(session_id, speaker_role, transcript)
-
-                        print(f"✅ Added to session {session_id} - {speaker_role} ({speaker_name}): {transcript}")
-                else:
-                    print(f"⚠️ Session {session_id} missing participants field")
-            except KeyError as e:
-                print(f"❌ Session missing required fields: {e}")
+                # Add to session transcript
+                session_manager.append_transcript(session_id, speaker_role, transcript)
+
+                print(f"✅ Added to session {session_id} - {speaker_role} ({speaker_name}): {transcript}")
             except Exception as e:
                 print(f"❌ Error adding to session manager: {e}")
                 import traceback
@@ -623,13 +1054,15 @@ def handle_audio_chunk(data):
             'timestamp': time.time()
         })
 
-         # Emit transcript back to all users in room with speaker info
-        emit('transcript_update', {
+        # Emit transcript back to all users in room with speaker info
+        socketio.emit('transcript_update', {
             'user_id': user_id,
             'speaker_role': speaker_role,
             'speaker_name': speaker_name,
             'text': transcript,
-            'session_id': session_id
+            'session_id': session_id,
+            'final': True,
+            'utterance_id': utterance_id
         }, room=room)
 
         print(f"Transcribed from {user_id}: {transcript}")
@@ -651,13 +1084,13 @@ def handle_audio_chunk(data):
                     print(f"⏭️ Skipping AI interjection - session {session_id} not active")
                 else:
                     print(f"🤖 Triggering agent for session {session_id} (agent_manager says should trigger)")
-                    socketio.start_background_task(trigger_agent_background, session_id, room)
+                    request_agent_run(session_id, room)
         else:
             print(f"⚠️ No session_id available, cannot check agent trigger")
 
     except Exception as e:
-        print(f"Error processing audio chunk: {e}")
-        emit('stt_error', {'error': str(e)})
+        print(f"Error processing transcript: {e}")
+        socketio.emit('stt_error', {'error': str(e)}, room=user_id)
 
 @app.route('/api/transcript/buffer/<room_or_session>', methods=['GET'])
 def get_transcript_buffer(room_or_session):
@@ -731,13 +1164,15 @@ def tts_endpoint():
         if not text.strip():
             return jsonify({'error': 'Empty text'}), 400
 
-        # Generate audio using Fish Audio TTS
-        audio_bytes = stream_tts(text)
+        # Generate audio using Fish Audio TTS in the format the client asked for
+        audio_format = requested_audio_format(data)
+        audio_bytes = run_blocking(stream_tts_parallel, text, audio_format=audio_format)
         audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
 
         return jsonify({
             'audio': audio_base64,
-            'format': 'wav'
+            'format': audio_format,
+            'mime': AUDIO_FORMATS[audio_format]
         })
 
     except Exception as e:
@@ -746,17 +1181,74 @@ def tts_endpoint():
 
 
 
+def _wait_for_user_pause(room: str) -> float:
+    """
+    Hold agent audio while users are speaking (audio within the last 2 seconds).
+    Waits at most 4 seconds and returns seconds since the last user audio.
+    """
+    time_since_user_audio = time.time() - last_user_audio.get(room, 0)
+
+    if time_since_user_audio < 2.0:
+        print(f"⏸️ Waiting for users to finish speaking (last audio {time_since_user_audio:.1f}s ago)...")
+        for _ in range(20):  # 20 * 0.2s = 4s max wait
+            socketio.sleep(0.2)
+            time_since_user_audio = time.time() - last_user_audio.get(room, 0)
+            if time_since_user_audio >= 2.0:
+                break
+
+    return time_since_user_audio
+
+
+def request_agent_run(session_id: str, room: str) -> bool:
+    """
+    Start an agent run for a session unless one is already in flight,
+    in which case the trigger is coalesced into a rerun of that one
+    """
+    started = agent_manager.get_agent_scheduler().request(
+        session_id,
+        lambda: socketio.start_background_task(agent_run_task, session_id, room)
+    )
+    if not started:
+        print(f"🔁 Agent already running for session {session_id} - trigger coalesced")
+    return started
+
+
+def agent_run_task(session_id: str, room: str):
+    """
+    Background task holding the session's single agent slot.
+    Reruns once with the latest context if triggers arrived while it ran.
+    """
+    scheduler = agent_manager.get_agent_scheduler()
+    try:
+        trigger_agent_background(session_id, room)
+
+        while scheduler.finish(session_id):
+            # Rerun after the cooldown, and only if the conversation still calls for it
+            socketio.sleep(agent_manager.get_cooldown_remaining(session_id))
+            if not agent_manager.should_trigger_agent(session_id):
+                scheduler.release(session_id, skipped_rerun=True)
+                return
+            print(f"🔁 Rerunning agent for session {session_id} with latest context")
+            trigger_agent_background(session_id, room)
+
+    except Exception as e:
+        print(f"Error in agent run task: {e}")
+        scheduler.release(session_id)
+
+
 def trigger_agent_background(session_id: str, room: str):
     """
     Background task to trigger Janitor AI agent
     Uses new agent_manager for proper orchestration
     """
+    if AGENT_STREAMING:
+        trigger_agent_streaming_background(session_id, room)
+        return
+
     try:
-        success, response_text, error = agent_manager.trigger_agent(session_id)
+        success, response_text, error = run_blocking(agent_manager.trigger_agent, session_id)
 
         if success:
-            import time
-
             # Send text immediately to display without waiting for TTS
             socketio.emit('agent_response', {
                 'success': True,
@@ -769,31 +1261,9 @@ def trigger_agent_background(session_id: str, room: str):
 
             # Generate TTS audio in parallel (don't block on this)
             try:
-                import time
-                audio_bytes = stream_tts(response_text)
-                audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-
-                # Check if users are currently speaking (within last 2 seconds)
-                last_user_time = last_user_audio.get(room, 0)
-                time_since_user_audio = time.time() - last_user_time
-
-                # Wait for a brief pause in user speech before sending audio
-                if time_since_user_audio < 2.0:
-                    print(f"⏸️ Waiting for users to finish speaking (last audio {time_since_user_audio:.1f}s ago)...")
-                    # Wait up to 4 seconds for users to finish
-                    for _ in range(20):  # 20 * 0.2s = 4s max wait
-                        time.sleep(0.2)
-                        time_since_user_audio = time.time() - last_user_audio.get(room, 0)
-                        if time_since_user_audio >= 2.0:
-                            break
-
-                # Send audio separately after generation and wait (full audio in one message)
-                socketio.emit('agent_audio', {
-                    'audio': audio_base64,
-                    'format': 'wav'
-                }, room=room)
-
-                print(f"✅ Agent audio sent for session {session_id} (waited {time_since_user_audio:.1f}s)")
+                # Each client gets its negotiated format; WAV plays from the first chunk
+                if send_agent_audio(room, session_id, response_text, wait_for_pause=True):
+                    print(f"✅ Agent audio sent for session {session_id}")
 
             except Exception as tts_error:
                 print(f"❌ TTS generation failed: {tts_error}")
@@ -803,6 +1273,228 @@ def trigger_agent_background(session_id: str, room: str):
     except Exception as e:
         print(f"Error in agent background task: {e}")
 
+
+def decode_audio_payload(audio) -> bytes:
+    """Audio from a client event: binary attachment as-is, base64 strings decoded"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        audio_transport_stats['received_binary_chunks'] += 1
+        audio_transport_stats['received_binary_bytes'] += len(audio)
+        return bytes(audio)
+
+    audio_transport_stats['received_base64_chunks'] += 1
+    audio_transport_stats['received_base64_bytes'] += len(audio)
+    return base64.b64decode(audio)
+
+
+def emit_audio_event(event: str, payload: dict, audio: bytes, room: str, sids: list = None):
+    """
+    Emit an event carrying audio to everyone in room (or only the given sids
+    of it), as a binary attachment to clients that negotiated binary_audio
+    and as base64 to the rest. At most two emits to the room, and base64 is
+    only encoded if someone needs it. Given sids that are not tracked room
+    members get one emit each, never a room broadcast.
+    """
+    members = [sid for sid, member_room in active_users.items() if member_room == room]
+    targets = members if sids is None else [sid for sid in members if sid in sids]
+    binary_sids = [sid for sid in targets if client_audio.get(sid, {}).get('binary')]
+    base64_sids = [sid for sid in targets if sid not in binary_sids]
+
+    audio_base64 = None
+    for sid in ([] if sids is None else [sid for sid in sids if sid not in members]):
+        if client_audio.get(sid, {}).get('binary'):
+            socketio.emit(event, dict(payload, audio=audio), room=sid)
+            audio_transport_stats['sent_binary_events'] += 1
+            audio_transport_stats['sent_binary_bytes'] += len(audio)
+        else:
+            audio_base64 = audio_base64 or base64.b64encode(audio).decode('utf-8')
+            socketio.emit(event, dict(payload, audio=audio_base64), room=sid)
+            audio_transport_stats['sent_base64_events'] += 1
+            audio_transport_stats['sent_base64_bytes'] += len(audio_base64)
+
+    if binary_sids:
+        skip = [sid for sid in members if sid not in binary_sids]
+        socketio.emit(event, dict(payload, audio=audio), room=room, skip_sid=skip or None)
+        audio_transport_stats['sent_binary_events'] += 1
+        audio_transport_stats['sent_binary_bytes'] += len(audio) * len(binary_sids)
+
+    # Unknown membership (e.g. no join yet) keeps the old base64 broadcast to the room
+    if base64_sids or (not members and sids is None):
+        skip = [sid for sid in members if sid not in base64_sids]
+        audio_base64 = audio_base64 or base64.b64encode(audio).decode('utf-8')
+        socketio.emit(event, dict(payload, audio=audio_base64), room=room, skip_sid=skip or None)
+        audio_transport_stats['sent_base64_events'] += 1
+        audio_transport_stats['sent_base64_bytes'] += len(audio_base64) * max(1, len(base64_sids))
+
+
+def room_audio_formats(room: str) -> dict:
+    """Negotiated TTS format -> sids of the room's clients that use it (None = everyone, WAV)"""
+    groups = {}
+    for sid, member_room in active_users.items():
+        if member_room == room:
+            groups.setdefault(client_audio.get(sid, {}).get('format', 'wav'), []).append(sid)
+    return groups or {'wav': None}
+
+
+def send_agent_audio(room: str, session_id: str, text: str, segment: int = None,
+                     wait_for_pause: bool = False) -> bool:
+    """
+    Deliver the audio for one agent utterance to every client in room, in
+    the format each negotiated. WAV clients get agent_audio_chunk streams
+    (unless AGENT_AUDIO_CHUNKED is off); compressed formats get one
+    agent_audio event per utterance, synthesized once per format.
+
+    Args:
+        segment: Sentence index when the reply is streamed sentence by sentence
+        wait_for_pause: Hold the first emit until users pause speaking
+
+    Returns:
+        True if any audio was sent
+    """
+    groups = room_audio_formats(room)
+
+    # Pre-rendered and speculative audio only exist as WAV
+    prepared = None
+    if 'wav' in groups:
+        prepared = get_bank_audio(text) or agent_manager.pop_speculative_audio(session_id, text)
+
+    sent = False
+    for audio_format, sids in groups.items():
+        if audio_format == 'wav' and AGENT_AUDIO_CHUNKED:
+            sent |= stream_agent_audio(room, session_id, text, segment, wait_for_pause and not sent,
+                                       prepared=prepared, sids=sids)
+            continue
+
+        # Synthesize on a worker thread while waiting for users to pause
+        synthesis = None
+        if not (audio_format == 'wav' and prepared):
+            synthesis = blocking_pool.submit(stream_tts_parallel, text, audio_format=audio_format)
+
+        if wait_for_pause and not sent:
+            _wait_for_user_pause(room)
+
+        try:
+            audio_bytes = wait_for(synthesis) if synthesis else prepared
+        except Exception as tts_error:
+            print(f"❌ TTS ({audio_format}) failed for session {session_id}: {tts_error}")
+            continue
+
+        payload = {'format': audio_format, 'mime': AUDIO_FORMATS[audio_format]}
+        if segment is not None:
+            payload.update(segment=segment, streaming=True)
+        emit_audio_event('agent_audio', payload, audio_bytes, room, sids)
+        sent = True
+
+    return sent
+
+
+def stream_agent_audio(room: str, session_id: str, text: str, segment: int = None,
+                       wait_for_pause: bool = False, prepared: bytes = None, sids: list = None) -> bool:
+    """
+    Emit the WAV audio for text as ordered agent_audio_chunk events while it
+    is synthesized, so clients start playing on the first chunk.
+
+    Every event carries the stream_id and a seq number; the last one has
+    end=True (plus error if synthesis failed midway). Concatenating the
+    chunks of a stream gives the complete WAV file.
+
+    Args:
+        prepared: Already rendered WAV (audio bank, speculation) to replay instead of TTS
+        sids: Only these clients of the room (default: all)
+
+    Returns:
+        True if any audio was sent
+    """
+    stream_id = uuid.uuid4().hex[:12]
+    # Synthesis starts on a worker thread now and keeps going while we wait below
+    chunks = iter_audio_chunks(prepared) if prepared else iter_blocking(iter_tts_parallel(text))
+
+    seq = 0
+    error = None
+    try:
+        if wait_for_pause:
+            _wait_for_user_pause(room)
+
+        for chunk in chunks:
+            emit_audio_event('agent_audio_chunk', {
+                'stream_id': stream_id,
+                'seq': seq,
+                'segment': segment,
+                'format': 'wav',
+                'end': False
+            }, chunk, room, sids)
+            seq += 1
+    except Exception as tts_error:
+        error = str(tts_error)
+        print(f"❌ TTS stream failed for session {session_id} after {seq} chunk(s): {tts_error}")
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+    end_marker = {'stream_id': stream_id, 'seq': seq, 'segment': segment, 'end': True}
+    if error:
+        end_marker['error'] = error
+    members = [sid for sid, member_room in active_users.items() if member_room == room]
+    skip = [sid for sid in members if sid not in sids] if sids is not None else []
+    socketio.emit('agent_audio_chunk', end_marker, room=room, skip_sid=skip or None)
+
+    return seq > 0
+
+
+def trigger_agent_streaming_background(session_id: str, room: str):
+    """
+    Streaming agent turn: each sentence goes to TTS as soon as the LLM
+    completes it, and each audio segment is emitted in order as it is ready
+    """
+    started = time.time()
+    # The LLM streams on a worker thread; sentences cross over to the TTS greenlet here
+    sentence_queue = queue.Queue()
+
+    def tts_worker():
+        waited = False
+        while True:
+            item = drain_thread_queue(sentence_queue)
+            if item is None:
+                break
+
+            index, sentence = item
+            try:
+                # Only the first segment waits for a pause; later ones follow it
+                sent = send_agent_audio(room, session_id, sentence, segment=index, wait_for_pause=not waited)
+            except Exception as tts_error:
+                print(f"❌ TTS failed for segment {index}: {tts_error}")
+                continue
+
+            if sent and not waited:
+                waited = True
+                print(f"🔊 First agent audio for session {session_id} after {time.time() - started:.2f}s")
+
+    socketio.start_background_task(tts_worker)
+
+    def on_sentence(index, sentence):
+        # Called on the LLM thread: no emits here
+        sentence_queue.put((index, sentence))
+
+    try:
+        success, response_text, error = run_blocking(agent_manager.trigger_agent_streaming, session_id, on_sentence)
+
+        if success:
+            socketio.emit('agent_response', {
+                'success': True,
+                'response': response_text,
+                'audio': None,  # Audio segments are streamed separately
+                'used_fallback': error is not None
+            }, room=room)
+            print(f"Agent streamed response in session {session_id}: {response_text[:100]}...")
+        else:
+            print(f"Agent failed for session {session_id}: {error}")
+
+    except Exception as e:
+        print(f"Error in streaming agent task: {e}")
+
+    finally:
+        sentence_queue.put(None)
+
+
 @socketio.on('trigger_agent')
 def handle_trigger_agent(data):
     """
@@ -821,8 +1513,8 @@ def handle_trigger_agent(data):
             emit('agent_response', {'error': 'No session found'})
             return
         
-        # Trigger agent using background task
-        socketio.start_background_task(trigger_agent_background, session_id, room)
+        # Trigger agent using background task (coalesced if one is already running)
+        request_agent_run(session_id, room)
         
         # Immediately acknowledge
         emit('agent_triggered', {'session_id': session_id})
@@ -869,6 +1561,20 @@ def handle_update_phase(data):
 if __name__ == '__main__':
     # Initialize profile system
     profile_manager.init_profiles()
+
+    # Open keep-alive connections to the LLM before the first agent turn
+    agent_manager.start_llm_client()
+
+    if AGENT_SPECULATIVE:
+        agent_manager.enable_speculation(render_audio=stream_tts_parallel if AGENT_SPECULATIVE_AUDIO else None)
+
+    # VAD needs ffmpeg for the browser's webm/opus chunks
+    check_ffmpeg()
+
+    # Pre-render fallback lines so the degraded path needs no live TTS (real thread:
+    # the TTS calls block)
+    threading.Thread(target=warm_audio_bank, args=(agent_manager.get_bank_lines(),),
+                     name="audio-bank-warm", daemon=True).start()
     
     # Clean up any leftover session files from previous runs
     # MVP: Delete ALL old sessions on startup (fresh start)
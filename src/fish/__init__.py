@@ -7,6 +7,16 @@ with mock mode support for development.
 
 from .client import FishSessionManager
 from .asr import stream_asr
-from .tts import stream_tts
+from .tts import stream_tts, iter_tts, negotiate_format, AUDIO_FORMATS
+from .cache import TTSCache, get_tts_cache, get_tts_cache_stats
+from .bank import AudioBank, get_audio_bank, warm_audio_bank, get_bank_audio
+from .parallel import stream_tts_parallel, iter_tts_parallel, get_parallel_tts_stats
+from .asr_pool import ASRPool, get_asr_pool, get_asr_pool_stats
+from .vad import VoiceActivityGate, get_vad_stats, check_ffmpeg
+from .asr_stream import StreamingTranscriber, create_recognizer
 
-__all__ = ['FishSessionManager', 'stream_asr', 'stream_tts']
+__all__ = ['FishSessionManager', 'stream_asr', 'stream_tts', 'iter_tts', 'negotiate_format', 'AUDIO_FORMATS', 'TTSCache', 'get_tts_cache', 'get_tts_cache_stats',
+           'AudioBank', 'get_audio_bank', 'warm_audio_bank', 'get_bank_audio',
+           'stream_tts_parallel', 'iter_tts_parallel', 'get_parallel_tts_stats',
+           'ASRPool', 'get_asr_pool', 'get_asr_pool_stats', 'VoiceActivityGate', 'get_vad_stats', 'check_ffmpeg',
+           'StreamingTranscriber', 'create_recognizer']
@@ -0,0 +1,268 @@
+"""
+Fish Audio ASR worker pool.
+
+Runs stream_asr off the Socket.IO handlers on a bounded set of worker
+threads. Each speaker has a FIFO queue and at most one call in flight, so
+their transcripts come back in the order the audio was sent, and a slow
+Fish backend can only build up a bounded amount of queued audio.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional
+
+from .asr import stream_asr
+from . import vad
+
+
+ASR_WORKERS = int(os.getenv('FISH_ASR_WORKERS', 4))  # Concurrent ASR calls across all speakers
+ASR_MAX_QUEUE = int(os.getenv('FISH_ASR_MAX_QUEUE', 3))  # Queued chunks per speaker before overflow
+ASR_OVERFLOW = os.getenv('FISH_ASR_OVERFLOW', 'drop_oldest').lower()
+
+# Overflow policies
+DROP_OLDEST = 'drop_oldest'  # Discard the speaker's oldest queued chunk
+MERGE = 'merge'  # Append to the newest queued chunk (WAV only, else drop oldest)
+SLOW_DOWN = 'slow_down'  # Reject the chunk and tell the client to back off
+
+OVERFLOW_POLICIES = (DROP_OLDEST, MERGE, SLOW_DOWN)
+
+# submit() outcomes
+QUEUED = 'queued'
+DROPPED_OLDEST = 'dropped_oldest'
+MERGED = 'merged'
+THROTTLED = 'throttled'
+
+
+def _transcribe(audio: bytes) -> str:
+    """Default pool transcriber: VAD first when enabled, then Fish ASR"""
+    return vad.transcribe_with_vad(audio) if vad.VAD_ENABLED else stream_asr(audio)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def _merge_audio(older: bytes, newer: bytes) -> Optional[bytes]:
+    """One clip from two consecutive WAV clips, or None if they can't be joined"""
+    from .parallel import concat_wav
+
+    try:
+        return concat_wav([older, newer])
+    except ValueError:
+        # Compressed containers (webm/ogg) can't be spliced byte-wise
+        return None
+
+
+class _ASRJob:
+    """One chunk of a speaker's audio waiting for ASR"""
+
+    def __init__(self, speaker: str, audio: bytes, on_result: Callable, on_error: Optional[Callable],
+                 transcribe: Optional[Callable] = None, exempt: bool = False):
+        self.speaker = speaker
+        self.audio = audio
+        self.on_result = on_result
+        self.on_error = on_error
+        self.transcribe = transcribe  # Overrides the pool's transcriber for this job
+        self.exempt = exempt  # Never dropped, merged or throttled by the overflow policy
+        self.enqueued_at = time.time()
+        self.chunks = 1  # Client chunks merged into this job
+
+
+class ASRPool:
+    """
+    Bounded ASR execution stage with per-speaker ordering.
+
+    submit() queues a chunk and returns immediately; on_result(transcript,
+    audio_size) or on_error(exception) is called from a worker thread. A
+    speaker's callbacks run one at a time, in submission order. When a
+    speaker already has max_queue chunks waiting, the overflow policy
+    decides what happens to the new one. Exempt jobs (stream bookkeeping
+    whose loss would wedge the caller) bypass the policy and don't count
+    toward max_queue.
+    """
+
+    def __init__(self, workers: int = ASR_WORKERS, max_queue: int = ASR_MAX_QUEUE,
+                 overflow: str = ASR_OVERFLOW, transcribe: Callable[[bytes], str] = _transcribe):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown ASR overflow policy '{overflow}' (expected one of {', '.join(OVERFLOW_POLICIES)})")
+
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.overflow = overflow
+        self.transcribe = transcribe
+
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='fish-asr')
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[_ASRJob]] = {}
+        self._active = set()  # Speakers with a job on a worker
+
+        self._waits = deque(maxlen=200)  # Recent queue wait times (seconds)
+        self._latencies = deque(maxlen=200)  # Recent ASR call times (seconds)
+        self.max_depth_seen = 0
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0,
+                      'dropped_oldest': 0, 'merged': 0, 'throttled': 0, 'discarded': 0}
+
+    def submit(self, speaker: str, audio: bytes, on_result: Callable[[str, int], None],
+               on_error: Optional[Callable[[Exception], None]] = None,
+               transcribe: Optional[Callable[[bytes], object]] = None, exempt: bool = False) -> str:
+        """
+        Queue a chunk of speaker's audio for ASR
+
+        Args:
+            transcribe: Run this on the audio instead of the pool's
+                transcriber (e.g. a streaming recognizer step); its result
+                is what on_result receives
+            exempt: Always queue this job and never drop or merge it on
+                overflow (for jobs whose callback the caller depends on)
+
+        Returns:
+            QUEUED, or the overflow outcome: DROPPED_OLDEST (queued after
+            discarding the oldest waiting chunk), MERGED (appended to the
+            newest waiting chunk) or THROTTLED (not queued; back off)
+        """
+        with self._lock:
+            self.stats['submitted'] += 1
+            queue = self._queues.setdefault(speaker, deque())
+            outcome = QUEUED
+
+            waiting = [job for job in queue if not job.exempt]
+            if not exempt and len(waiting) >= self.max_queue:
+                if self.overflow == SLOW_DOWN:
+                    self.stats['throttled'] += 1
+                    return THROTTLED
+
+                newest = queue[-1]
+                mergeable = (self.overflow == MERGE and transcribe is None
+                             and not newest.exempt and newest.transcribe is None)
+                merged = _merge_audio(newest.audio, audio) if mergeable else None
+                if merged is not None:
+                    newest.audio = merged
+                    newest.chunks += 1
+                    self.stats['merged'] += 1
+                    return MERGED
+
+                queue.remove(waiting[0])
+                self.stats['dropped_oldest'] += 1
+                outcome = DROPPED_OLDEST
+
+            queue.append(_ASRJob(speaker, audio, on_result, on_error, transcribe, exempt))
+            self.max_depth_seen = max(self.max_depth_seen, len(queue))
+            self._schedule(speaker)
+
+        return outcome
+
+    def _schedule(self, speaker: str):
+        """Hand the speaker's next job to a worker unless one is already running (lock held)"""
+        if speaker in self._active or not self._queues.get(speaker):
+            return
+        self._active.add(speaker)
+        self._pool.submit(self._run, speaker)
+
+    def _run(self, speaker: str):
+        with self._lock:
+            queue = self._queues.get(speaker)
+            if not queue:
+                self._active.discard(speaker)
+                return
+            job = queue.popleft()
+            self._waits.append(time.time() - job.enqueued_at)
+
+        start = time.time()
+        try:
+            transcript = (job.transcribe or self.transcribe)(job.audio)
+        except Exception as e:
+            with self._lock:
+                self._latencies.append(time.time() - start)
+                self.stats['failed'] += 1
+            if job.on_error:
+                self._callback(job.on_error, e)
+            else:
+                print(f"ASR failed for {speaker}: {e}")
+        else:
+            with self._lock:
+                self._latencies.append(time.time() - start)
+                self.stats['completed'] += 1
+            self._callback(job.on_result, transcript, len(job.audio))
+        finally:
+            with self._lock:
+                self._active.discard(speaker)
+                # One job per turn keeps busy speakers from starving the rest
+                self._schedule(speaker)
+
+    @staticmethod
+    def _callback(fn: Callable, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"ASR callback failed: {e}")
+
+    def discard(self, speaker: str) -> int:
+        """Drop a speaker's queued chunks (e.g. on disconnect); returns how many"""
+        with self._lock:
+            queue = self._queues.pop(speaker, None)
+            dropped = len(queue) if queue else 0
+            self.stats['discarded'] += dropped
+            return dropped
+
+    def queue_depth(self, speaker: Optional[str] = None) -> int:
+        """Chunks waiting for a worker, for one speaker or in total"""
+        with self._lock:
+            if speaker is not None:
+                return len(self._queues.get(speaker, ()))
+            return sum(len(queue) for queue in self._queues.values())
+
+    def retry_after_ms(self, speaker: str) -> int:
+        """Rough time until the speaker's backlog clears, for slow-down signals"""
+        with self._lock:
+            latencies = list(self._latencies)
+            depth = len(self._queues.get(speaker, ())) + (1 if speaker in self._active else 0)
+        avg = sum(latencies) / len(latencies) if latencies else 1.0
+        return int(avg * depth * 1000)
+
+    def get_stats(self) -> Dict:
+        """Queue depth, in-flight count and wait/latency metrics"""
+        with self._lock:
+            waits = sorted(self._waits)
+            latencies = sorted(self._latencies)
+            depths = {speaker: len(queue) for speaker, queue in self._queues.items() if queue}
+            in_flight = len(self._active)
+
+        return {
+            **self.stats,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'overflow': self.overflow,
+            'in_flight': in_flight,
+            'queue_depth': sum(depths.values()),
+            'queue_depth_by_speaker': depths,
+            'max_depth_seen': self.max_depth_seen,
+            'wait_avg_ms': sum(waits) / len(waits) * 1000 if waits else 0,
+            'wait_p95_ms': _percentile(waits, 95) * 1000,
+            'asr_avg_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0,
+            'asr_p95_ms': _percentile(latencies, 95) * 1000
+        }
+
+
+_asr_pool: Optional[ASRPool] = None
+_asr_pool_lock = threading.Lock()
+
+
+def get_asr_pool() -> ASRPool:
+    """Shared ASR pool for the process"""
+    global _asr_pool
+    if _asr_pool is None:
+        with _asr_pool_lock:
+            if _asr_pool is None:
+                _asr_pool = ASRPool()
+    return _asr_pool
+
+
+def get_asr_pool_stats() -> Dict:
+    """Queue depth and latency metrics for the stats endpoint"""
+    return get_asr_pool().get_stats()
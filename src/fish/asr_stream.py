@@ -0,0 +1,372 @@
+"""
+Streaming ASR with interim transcripts.
+
+stream_asr is request/response: the whole clip goes up and the text only
+comes back once all of it has been processed. A StreamingRecognizer takes
+an utterance's audio as it is spoken and returns hypotheses along the way:
+interim ones (the text so far, each replacing the last) and a final one
+when the utterance ends.
+
+Backends are registered by name (FISH_ASR_STREAM_BACKEND): 'fish' emulates
+streaming on top of the Fish ASR endpoint, 'stub' is a local scripted
+recognizer for tests and demos. StreamingTranscriber runs one speaker's
+recognizers on the ASR pool and is the listener a SpeechSegmenter hands
+utterances to.
+"""
+
+import os
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .asr import stream_asr
+from .asr_pool import ASRPool, get_asr_pool
+from .segmenter import STREAM_SAMPLE_RATE
+from .vad import encode_wav
+
+
+ASR_STREAM_BACKEND = os.getenv('FISH_ASR_STREAM_BACKEND', 'fish').lower()
+ASR_INTERIM_SEC = float(os.getenv('FISH_ASR_INTERIM_SEC', 2.0))  # New audio between interim decodes (fish)
+ASR_MAX_INTERIMS = int(os.getenv('FISH_ASR_MAX_INTERIMS', 2))  # Early decodes per utterance before the final (fish)
+
+STUB_SCRIPT = [
+    "I think we should plan a trip somewhere warm this winter",
+    "Honestly I have been wanting to see the ocean again",
+    "What about that little town we talked about last spring",
+    "Sure but we said the same thing last year and never went",
+    "Okay then let us actually book something this weekend"
+]
+
+
+class Hypothesis:
+    """One recognition result for an utterance"""
+
+    def __init__(self, text: str, final: bool, utterance: int, audio_bytes: int):
+        self.text = text
+        self.final = final
+        self.utterance = utterance  # Counts up per speaker
+        self.audio_bytes = audio_bytes  # PCM heard so far
+
+    def __repr__(self):
+        return f"Hypothesis({'final' if self.final else 'interim'} #{self.utterance}: {self.text!r})"
+
+
+class StreamingRecognizer:
+    """
+    Recognition of one utterance, fed as it is spoken.
+
+    accept() takes the next piece of 16-bit mono PCM, pause() says the
+    speaker has gone quiet (the utterance may still continue) and finish()
+    ends it and returns the final hypothesis. They may block on the backend,
+    so they are called from worker threads, one at a time.
+    """
+
+    name = 'base'
+
+    def __init__(self, sample_rate: int = STREAM_SAMPLE_RATE, utterance: int = 0):
+        self.sample_rate = sample_rate
+        self.utterance = utterance
+        self.audio_bytes = 0
+        self.decodes = 0  # Backend ASR requests made for this utterance
+        self.uploaded_bytes = 0  # Audio sent to the backend, re-sends included
+
+    @property
+    def audio_sec(self) -> float:
+        return self.audio_bytes / 2 / self.sample_rate
+
+    def accept(self, pcm: bytes) -> List[Hypothesis]:
+        raise NotImplementedError
+
+    def pause(self) -> List[Hypothesis]:
+        return []
+
+    def finish(self) -> List[Hypothesis]:
+        raise NotImplementedError
+
+    def _hypothesis(self, text: str, final: bool) -> Hypothesis:
+        return Hypothesis(text, final, self.utterance, self.audio_bytes)
+
+
+class FishStreamingRecognizer(StreamingRecognizer):
+    """
+    Streaming on top of the request/response Fish ASR endpoint.
+
+    The utterance so far is re-transcribed after every interim_sec of new
+    audio and when the speaker pauses. If nothing was said after the last
+    decode, finish() reuses it, so the final is usually ready by the time
+    the pause that ends the utterance is confirmed.
+
+    Every decode re-uploads the whole utterance, so early decodes stop after
+    max_interims: an utterance costs at most max_interims + 1 requests.
+    """
+
+    name = 'fish'
+
+    def __init__(self, sample_rate: int = STREAM_SAMPLE_RATE, utterance: int = 0,
+                 interim_sec: float = ASR_INTERIM_SEC, max_interims: int = ASR_MAX_INTERIMS,
+                 transcribe: Callable[[bytes], str] = stream_asr):
+        super().__init__(sample_rate, utterance)
+        self.transcribe = transcribe
+        self.interim_bytes = int(interim_sec * sample_rate) * 2
+        self.max_interims = max_interims
+        self._pcm = bytearray()
+        self._decoded = 0  # Bytes of _pcm covered by _text
+        self._text = ''
+        self.reused_final = False
+
+    def _decode(self) -> List[Hypothesis]:
+        previous = self._text
+        samples = np.frombuffer(bytes(self._pcm), dtype='<i2')
+        self._text = (self.transcribe(encode_wav(samples, self.sample_rate)) or '').strip()
+        self._decoded = len(self._pcm)
+        self.decodes += 1
+        self.uploaded_bytes += len(self._pcm)
+        if self._text == previous:
+            return []
+        return [self._hypothesis(self._text, False)]
+
+    def accept(self, pcm):
+        self._pcm += pcm
+        self.audio_bytes = len(self._pcm)
+        if len(self._pcm) - self._decoded < self.interim_bytes or self.decodes >= self.max_interims:
+            return []
+        return self._decode()
+
+    def pause(self):
+        # Most pauses end the utterance; if this one doesn't, it cost one extra decode
+        if self._decoded == len(self._pcm) or self.decodes >= self.max_interims:
+            return []
+        return self._decode()
+
+    def finish(self):
+        self.reused_final = self._decoded == len(self._pcm) and self.decodes > 0
+        if not self.reused_final:
+            self._decode()
+        return [self._hypothesis(self._text, True)]
+
+
+class StubStreamingRecognizer(StreamingRecognizer):
+    """
+    Local recognizer for tests and demos: 'hears' words_per_sec words of
+    the next script line per second of audio and finishes with the whole
+    line. latency is slept on every call to stand in for a backend.
+    """
+
+    name = 'stub'
+
+    def __init__(self, sample_rate: int = STREAM_SAMPLE_RATE, utterance: int = 0,
+                 script: Optional[List[str]] = None, words_per_sec: float = 2.5, latency: float = 0.0):
+        super().__init__(sample_rate, utterance)
+        script = script or STUB_SCRIPT
+        self.words = script[utterance % len(script)].split()
+        self.words_per_sec = words_per_sec
+        self.latency = latency
+        self._heard = 0
+
+    def accept(self, pcm):
+        self.audio_bytes += len(pcm)
+        time.sleep(self.latency)
+        heard = min(len(self.words), int(self.audio_sec * self.words_per_sec))
+        if heard <= self._heard:
+            return []
+        self._heard = heard
+        return [self._hypothesis(' '.join(self.words[:heard]), False)]
+
+    def finish(self):
+        time.sleep(self.latency)
+        return [self._hypothesis(' '.join(self.words), True)]
+
+
+RECOGNIZERS: Dict[str, Callable[..., StreamingRecognizer]] = {
+    'fish': FishStreamingRecognizer,
+    'stub': StubStreamingRecognizer
+}
+
+
+def register_recognizer(name: str, factory: Callable[..., StreamingRecognizer]):
+    """Make a backend selectable with FISH_ASR_STREAM_BACKEND=name"""
+    RECOGNIZERS[name] = factory
+
+
+def create_recognizer(name: str = ASR_STREAM_BACKEND, **kwargs) -> StreamingRecognizer:
+    """New recognizer from the named backend (sample_rate, utterance, backend options)"""
+    if name not in RECOGNIZERS:
+        raise ValueError(f"Unknown streaming ASR backend '{name}' (expected one of {', '.join(RECOGNIZERS)})")
+    return RECOGNIZERS[name](**kwargs)
+
+
+# Work queued for the recognizer, in arrival order
+_AUDIO = 'audio'
+_PAUSE = 'pause'
+_END = 'end'
+
+
+class StreamingTranscriber:
+    """
+    One speaker's streaming recognition, run on the ASR pool.
+
+    feed(), pause() and end_utterance() (the SpeechSegmenter listener calls)
+    only queue work and return. The recognizer runs one step at a time on a
+    pool worker; audio that arrives meanwhile is merged into the next step,
+    so a slow backend gets fewer, larger pieces rather than a backlog (one
+    step per speaker at most, so steps bypass the pool's overflow policy).
+    on_hypothesis(hypothesis) and on_error(exception) are called from the
+    worker, in order.
+    """
+
+    def __init__(self, speaker: str, on_hypothesis: Callable[[Hypothesis], None],
+                 on_error: Optional[Callable[[Exception], None]] = None, backend: str = ASR_STREAM_BACKEND,
+                 sample_rate: int = STREAM_SAMPLE_RATE, pool: Optional[ASRPool] = None):
+        if backend not in RECOGNIZERS:
+            raise ValueError(f"Unknown streaming ASR backend '{backend}' (expected one of {', '.join(RECOGNIZERS)})")
+
+        self.speaker = speaker
+        self.on_hypothesis = on_hypothesis
+        self.on_error = on_error
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.pool = pool or get_asr_pool()
+
+        self._lock = threading.Lock()
+        self._ops = deque()  # [kind, payload, queued_at]
+        self._busy = False  # A step is queued or running on the pool
+        self._closed = False
+
+        # Only touched by the running step
+        self._recognizer: Optional[StreamingRecognizer] = None
+        self._utterance_start = 0.0
+        self._interims = 0  # Interims sent for the current utterance
+        self._utterances = 0
+
+        self._first_interim = deque(maxlen=100)  # Utterance start -> first interim (seconds)
+        self._final_lag = deque(maxlen=100)  # Utterance end -> final (seconds)
+        self.stats = {'interims': 0, 'finals': 0, 'discarded': 0, 'steps': 0, 'errors': 0,
+                      'utterances': 0, 'asr_requests': 0, 'uploaded_bytes': 0}
+
+    def feed(self, pcm: bytes):
+        """Audio of the current utterance (a new one starts after end_utterance)"""
+        with self._lock:
+            if self._ops and self._ops[-1][0] == _AUDIO:
+                self._ops[-1][1] += pcm
+            else:
+                self._ops.append([_AUDIO, bytearray(pcm), time.time()])
+            self._kick()
+
+    def pause(self):
+        """The speaker went quiet; the recognizer may decode what it has"""
+        with self._lock:
+            self._ops.append([_PAUSE, None, time.time()])
+            self._kick()
+
+    def end_utterance(self, keep: bool = True):
+        """Utterance over: final hypothesis, or none if keep is False"""
+        with self._lock:
+            self._ops.append([_END, keep, time.time()])
+            self._kick()
+
+    def close(self):
+        """Drop queued work and stop delivering results (speaker left)"""
+        with self._lock:
+            self._closed = True
+            self._ops.clear()
+
+    def _kick(self):
+        """
+        Queue a step on the pool unless one is pending (lock held). Steps are
+        exempt from the overflow policy: a dropped step would never call back
+        and leave the transcriber busy for good.
+        """
+        if self._busy or self._closed or not self._ops:
+            return
+        self._busy = True
+        self.pool.submit(self.speaker, b'', on_result=self._step_done, on_error=self._step_failed,
+                         transcribe=self._step, exempt=True)
+
+    def _step(self, _audio) -> List:
+        """Run everything queued so far; returns hypotheses and exceptions in order"""
+        with self._lock:
+            ops = list(self._ops)
+            self._ops.clear()
+
+        results = []
+        for kind, payload, queued_at in ops:
+            try:
+                if kind == _AUDIO:
+                    if self._recognizer is None:
+                        self._recognizer = create_recognizer(self.backend, sample_rate=self.sample_rate,
+                                                             utterance=self._utterances)
+                        self._utterances += 1
+                        self._utterance_start = queued_at
+                        self._interims = 0
+                    results.extend(self._timed(self._recognizer.accept(bytes(payload))))
+                elif kind == _PAUSE and self._recognizer:
+                    results.extend(self._timed(self._recognizer.pause()))
+                elif kind == _END and self._recognizer:
+                    recognizer, self._recognizer = self._recognizer, None
+                    try:
+                        if payload:
+                            finals = recognizer.finish()
+                            self._final_lag.append(time.time() - queued_at)
+                            results.extend(finals)
+                        elif self._interims:
+                            # Interims were shown for what turned out to be noise: retract them
+                            results.append(Hypothesis('', True, recognizer.utterance, recognizer.audio_bytes))
+                    finally:
+                        self.stats['utterances'] += 1
+                        self.stats['asr_requests'] += recognizer.decodes
+                        self.stats['uploaded_bytes'] += recognizer.uploaded_bytes
+            except Exception as e:
+                if kind == _END:
+                    self._recognizer = None
+                results.append(e)
+        return results
+
+    def _timed(self, hypotheses: List[Hypothesis]) -> List[Hypothesis]:
+        if hypotheses and self._interims == 0:
+            self._first_interim.append(time.time() - self._utterance_start)
+        self._interims += len(hypotheses)
+        return hypotheses
+
+    def _step_done(self, results: List, _size: int):
+        self.stats['steps'] += 1
+        try:
+            for result in results:
+                if self._closed:
+                    break
+                if isinstance(result, Exception):
+                    self.stats['errors'] += 1
+                    if self.on_error:
+                        self.on_error(result)
+                    continue
+                if result.final:
+                    self.stats['finals' if result.text else 'discarded'] += 1
+                else:
+                    self.stats['interims'] += 1
+                self.on_hypothesis(result)
+        finally:
+            with self._lock:
+                self._busy = False
+                self._kick()
+
+    def _step_failed(self, error: Exception):
+        # _step catches backend errors itself; this is a bug in the step
+        print(f"Streaming ASR step failed for {self.speaker}: {error}")
+        with self._lock:
+            self._busy = False
+            self._kick()
+
+    def get_stats(self) -> Dict:
+        """Hypothesis counts, backend requests and how early text shows up"""
+        first_interim = list(self._first_interim)
+        final_lag = list(self._final_lag)
+        utterances = self.stats['utterances']
+        return {
+            **self.stats,
+            'backend': self.backend,
+            'asr_requests_per_utterance': self.stats['asr_requests'] / utterances if utterances else 0,
+            'first_interim_avg_ms': sum(first_interim) / len(first_interim) * 1000 if first_interim else 0,
+            'final_lag_avg_ms': sum(final_lag) / len(final_lag) * 1000 if final_lag else 0
+        }
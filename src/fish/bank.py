@@ -0,0 +1,172 @@
+"""
+Fish Audio pre-rendered audio bank.
+
+Fixed lines (fallback replies, stock host lines) are rendered once per voice
+and kept on disk, so the degraded path plays instantly and still has audio
+when Fish Audio itself is unreachable.
+"""
+
+import os
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from .client import FishSessionManager
+
+
+DEFAULT_BANK_DIR = os.getenv('FISH_AUDIO_BANK_DIR', os.path.join('sessions', 'audio_bank'))
+
+_SUFFIX = '.wav'
+
+
+def _line_key(text: str) -> str:
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+
+class AudioBank:
+    """
+    Audio for a fixed set of lines in one voice.
+
+    Files live under bank_dir/<version>/, where the version is the voice's
+    reference_id (prefixed with mock- in mock mode), so changing the voice
+    starts a fresh bank instead of playing the old one. Rendered lines are
+    also held in memory once warmed.
+    """
+
+    def __init__(self, reference_id: Optional[str] = None, bank_dir: str = DEFAULT_BANK_DIR,
+                 mock: Optional[bool] = None):
+        from .tts import DEFAULT_REFERENCE_ID
+
+        if mock is None:
+            mock = FishSessionManager().mock_mode
+
+        self.reference_id = reference_id or DEFAULT_REFERENCE_ID
+        self.version = f"mock-{self.reference_id}" if mock else self.reference_id
+        self.directory = os.path.join(bank_dir, self.version)
+
+        self._lock = threading.Lock()
+        self._audio: Dict[str, bytes] = {}
+
+        self.rendered = 0
+        self.loaded = 0
+        self.failed = 0
+        self.hits = 0
+        self.warming = False
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _SUFFIX)
+
+    def warm(self, lines: Iterable[str], render: Callable[[str], bytes]):
+        """
+        Make every line available, loading it from disk or rendering it.
+
+        Args:
+            lines: Text of each line
+            render: Synthesizes one line into audio bytes (e.g. stream_tts)
+        """
+        self.warming = True
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for text in lines:
+                key = _line_key(text)
+                if key in self._audio:
+                    continue
+
+                audio = self._load(key)
+                if audio is not None:
+                    with self._lock:
+                        self._audio[key] = audio
+                        self.loaded += 1
+                    continue
+
+                try:
+                    audio = render(text)
+                except Exception as e:
+                    with self._lock:
+                        self.failed += 1
+                    print(f"Audio bank could not render line: {e}")
+                    continue
+
+                if audio:
+                    self._store(key, audio)
+                    with self._lock:
+                        self._audio[key] = audio
+                        self.rendered += 1
+        finally:
+            self.warming = False
+
+        print(f"🔈 Audio bank ready ({self.version}): {len(self._audio)} lines, "
+              f"{self.rendered} rendered, {self.loaded} from disk, {self.failed} failed")
+
+    def _load(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read() or None
+        except OSError:
+            return None
+
+    def _store(self, key: str, audio: bytes):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Audio bank write failed: {e}")
+
+    def get(self, text: str) -> Optional[bytes]:
+        """Pre-rendered audio for text, or None if it is not a bank line (or not warmed yet)"""
+        if not text:
+            return None
+        audio = self._audio.get(_line_key(text))
+        if audio is not None:
+            with self._lock:
+                self.hits += 1
+        return audio
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'version': self.version,
+                'lines': len(self._audio),
+                'bytes': sum(len(a) for a in self._audio.values()),
+                'rendered': self.rendered,
+                'loaded_from_disk': self.loaded,
+                'failed': self.failed,
+                'hits': self.hits,
+                'warming': self.warming
+            }
+
+
+_bank: Optional[AudioBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_audio_bank() -> AudioBank:
+    """Shared bank for the default voice"""
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = AudioBank()
+    return _bank
+
+
+def warm_audio_bank(lines: Iterable[str], render: Optional[Callable[[str], bytes]] = None):
+    """
+    Render lines into the shared bank (blocking - run it as a background task).
+
+    Args:
+        lines: Fallback and stock lines to pre-render
+        render: Defaults to stream_tts
+    """
+    if render is None:
+        from .tts import stream_tts
+        render = stream_tts
+    get_audio_bank().warm(list(lines), render)
+
+
+def get_bank_audio(text: str) -> Optional[bytes]:
+    """Pre-rendered audio for a bank line, else None"""
+    return get_audio_bank().get(text)
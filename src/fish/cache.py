@@ -0,0 +1,286 @@
+"""
+Fish Audio TTS cache.
+
+Content-addressed two-tier cache for synthesized audio: an in-memory LRU
+bounded by bytes in front of an on-disk store with size-based eviction.
+Identical (text, voice, emotion, format) requests skip the TTS round-trip.
+"""
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+DEFAULT_MEMORY_BYTES = int(os.getenv('FISH_TTS_CACHE_MEMORY_BYTES', 32 * 1024 * 1024))
+DEFAULT_DISK_BYTES = int(os.getenv('FISH_TTS_CACHE_DISK_BYTES', 256 * 1024 * 1024))
+DEFAULT_DISK_DIR = os.getenv('FISH_TTS_CACHE_DIR', os.path.join('sessions', 'tts_cache'))
+CACHE_ENABLED = os.getenv('FISH_TTS_CACHE', 'true').lower() == 'true'
+
+_SUFFIX = '.audio'
+
+
+def cache_key(text: str, reference_id: Optional[str], emotion: Optional[str],
+              audio_format: str = 'wav', mock: bool = False) -> str:
+    """
+    Content address for one synthesis request.
+
+    Mock audio is keyed separately so switching FISH_MOCK off never serves tones.
+    """
+    parts = [text, reference_id or '', emotion or '', audio_format, 'mock' if mock else 'live']
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """
+    Two-tier audio cache.
+
+    Memory tier: OrderedDict LRU holding at most memory_bytes of audio.
+    Disk tier: one file per key under disk_dir, oldest (by access time)
+    evicted once the directory exceeds disk_bytes. Disk hits are promoted
+    into memory. Set disk_dir=None for a memory-only cache.
+    """
+
+    def __init__(self, memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                 disk_dir: Optional[str] = DEFAULT_DISK_DIR,
+                 disk_bytes: int = DEFAULT_DISK_BYTES):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = disk_dir
+        self.disk_bytes = disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_used = 0
+        self._disk: Dict[str, int] = {}  # key -> size, for the eviction budget
+        self._disk_used = 0
+        self._synth_sec: Dict[str, float] = {}  # key -> how long the miss took
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.saved_sec = 0.0
+        self._miss_sec_total = 0.0
+
+        if disk_dir:
+            self._scan_disk()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + _SUFFIX)
+
+    def _scan_disk(self):
+        """Index what earlier runs left on disk"""
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(_SUFFIX):
+                    size = os.path.getsize(os.path.join(self.disk_dir, name))
+                    self._disk[name[:-len(_SUFFIX)]] = size
+                    self._disk_used += size
+        except OSError as e:
+            print(f"TTS cache disk tier unavailable: {e}")
+            self.disk_dir = None
+
+    def _avg_miss_sec(self) -> float:
+        return self._miss_sec_total / self.misses if self.misses else 0.0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached audio for key, or None on a miss"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self.saved_sec += self._synth_sec.get(key, self._avg_miss_sec())
+                return audio
+            on_disk = key in self._disk
+
+        if on_disk:
+            try:
+                path = self._path(key)
+                with open(path, 'rb') as f:
+                    audio = f.read()
+                os.utime(path)  # Access time drives disk eviction
+            except OSError:
+                audio = None
+
+            if audio is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self.saved_sec += self._synth_sec.get(key, self._avg_miss_sec())
+                    self._put_memory(key, audio)
+                return audio
+
+            with self._lock:
+                self._disk_used -= self._disk.pop(key, 0)
+
+        return None
+
+    def put(self, key: str, audio: bytes, synth_sec: Optional[float] = None):
+        """
+        Store freshly synthesized audio.
+
+        Args:
+            synth_sec: Time the synthesis took; credited to saved_sec on each later hit
+        """
+        if not audio:
+            return
+
+        with self._lock:
+            if synth_sec is not None:
+                self.misses += 1
+                self._miss_sec_total += synth_sec
+                self._synth_sec[key] = synth_sec
+            self._put_memory(key, audio)
+
+        if self.disk_dir:
+            self._put_disk(key, audio)
+
+    def _put_memory(self, key: str, audio: bytes):
+        """Insert into the LRU (caller holds the lock)"""
+        if len(audio) > self.memory_bytes:
+            return
+
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old)
+
+        self._memory[key] = audio
+        self._memory_used += len(audio)
+
+        while self._memory_used > self.memory_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self.memory_evictions += 1
+            if evicted_key not in self._disk:
+                self._synth_sec.pop(evicted_key, None)
+
+    def _put_disk(self, key: str, audio: bytes):
+        if len(audio) > self.disk_bytes:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            # Write then rename so readers never see a partial file
+            with open(tmp_path, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"TTS cache disk write failed: {e}")
+            return
+
+        with self._lock:
+            self._disk_used += len(audio) - self._disk.get(key, 0)
+            self._disk[key] = len(audio)
+            over_budget = self._disk_used > self.disk_bytes
+
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete least recently used files until the directory fits the budget"""
+        with self._lock:
+            keys = list(self._disk)
+
+        entries = []
+        for key in keys:
+            try:
+                entries.append((os.path.getmtime(self._path(key)), key))
+            except OSError:
+                entries.append((0.0, key))
+        entries.sort()
+
+        for _, key in entries:
+            with self._lock:
+                if self._disk_used <= self.disk_bytes:
+                    return
+                self._disk_used -= self._disk.pop(key, 0)
+                self.disk_evictions += 1
+                if key not in self._memory:
+                    self._synth_sec.pop(key, None)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Drop both tiers"""
+        with self._lock:
+            keys = list(self._disk)
+            self._memory.clear()
+            self._memory_used = 0
+            self._disk.clear()
+            self._disk_used = 0
+            self._synth_sec.clear()
+
+        if self.disk_dir:
+            for key in keys:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 3) if lookups else None,
+                'latency_saved_sec': round(self.saved_sec, 3),
+                'avg_miss_sec': round(self._avg_miss_sec(), 3),
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_used,
+                'memory_budget': self.memory_bytes,
+                'memory_evictions': self.memory_evictions,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_used,
+                'disk_budget': self.disk_bytes if self.disk_dir else 0,
+                'disk_evictions': self.disk_evictions
+            }
+
+
+_cache: Optional[TTSCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache() -> TTSCache:
+    """Shared process-wide TTS cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTSCache()
+    return _cache
+
+
+def cached_synthesis(key: str, synthesize) -> bytes:
+    """
+    Return cached audio for key, or call synthesize() and cache its result.
+
+    Args:
+        key: From cache_key()
+        synthesize: Zero-argument callable producing the audio bytes
+    """
+    cache = get_tts_cache()
+    audio = cache.get(key)
+    if audio is not None:
+        return audio
+
+    start = time.perf_counter()
+    audio = synthesize()
+    cache.put(key, audio, synth_sec=time.perf_counter() - start)
+    return audio
+
+
+def get_tts_cache_stats() -> Dict:
+    """Hit/miss counters and tier sizes for the shared cache"""
+    stats = get_tts_cache().get_stats()
+    stats['enabled'] = CACHE_ENABLED
+    return stats
@@ -0,0 +1,264 @@
+"""
+Fish Audio parallel sentence TTS.
+
+Splits a reply into sentences, synthesizes them concurrently through a
+bounded thread pool and reassembles the audio in order as one WAV file, so
+a long reply takes about as long as its slowest sentence.
+"""
+
+import os
+import re
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import cache as tts_cache
+from .client import FishSessionManager
+from .tts import stream_tts, iter_tts, DEFAULT_FORMAT, TTS_STREAM_CHUNK, DEFAULT_REFERENCE_ID, WAV_STREAMING_SIZE, _check_format
+
+
+# Concurrent Fish requests shared by all replies (0 disables parallel synthesis)
+PARALLEL_WORKERS = int(os.getenv('FISH_TTS_PARALLEL_WORKERS', 6))
+MIN_SENTENCE_CHARS = 20  # Shorter fragments ride along with a neighbour
+
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+
+
+def split_sentences(text: str, min_chars: int = MIN_SENTENCE_CHARS) -> List[str]:
+    """
+    Split text at sentence ends, merging fragments shorter than min_chars
+    into the previous sentence (or the next one, at the start)
+    """
+    sentences = []
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        if sentences and len(sentences[-1]) < min_chars:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        elif sentences and len(part) < min_chars:
+            sentences[-1] = f"{sentences[-1]} {part}"
+        else:
+            sentences.append(part)
+    return sentences
+
+
+def _parse_wav(wav: bytes) -> Tuple[bytes, memoryview]:
+    """
+    Split a WAV file into its fmt chunk body and a view of its PCM data
+
+    Raises:
+        ValueError: If the bytes are not a WAV with fmt and data chunks
+    """
+    if len(wav) < 12 or wav[:4] != b'RIFF' or wav[8:12] != b'WAVE':
+        raise ValueError("not a WAV file")
+
+    view = memoryview(wav)
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(wav):
+        chunk_id = wav[pos:pos+4]
+        chunk_size = struct.unpack_from('<I', wav, pos + 4)[0]
+        body_start = pos + 8
+
+        if chunk_id == b'fmt ':
+            fmt = bytes(view[body_start:body_start + chunk_size])
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            # Streaming/unknown sizes run to the end of the file
+            end = min(len(wav), body_start + chunk_size)
+            return fmt, view[body_start:end]
+
+        pos = body_start + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV file has no data chunk")
+
+
+def _write_wav_header(out: bytearray, fmt: bytes, data_size: int) -> int:
+    """Write a RIFF/fmt/data header for data_size bytes of PCM at the start of out; returns its length"""
+    header_size = 12 + 8 + len(fmt) + 8
+    riff_size = min(header_size - 8 + data_size, WAV_STREAMING_SIZE)
+    struct.pack_into('<4sI4s', out, 0, b'RIFF', riff_size, b'WAVE')
+    struct.pack_into('<4sI', out, 12, b'fmt ', len(fmt))
+    out[20:20 + len(fmt)] = fmt
+    struct.pack_into('<4sI', out, 20 + len(fmt), b'data', data_size)
+    return header_size
+
+
+def _whole_frames(fmt: bytes, pcm: memoryview) -> memoryview:
+    """Trim pcm to whole frames so channels stay aligned across the seams"""
+    block_align = struct.unpack_from('<H', fmt, 12)[0] if len(fmt) >= 14 else 0
+    if not block_align:
+        return pcm
+    return pcm[:len(pcm) - len(pcm) % block_align]
+
+
+def concat_wav(parts: List[bytes]) -> bytes:
+    """
+    Concatenate WAV files with identical formats into one, with correct sizes.
+
+    The PCM of every part is copied once into a preallocated buffer behind a
+    single header, instead of joining intermediate byte strings.
+
+    Raises:
+        ValueError: If a part isn't a WAV or the formats differ
+    """
+    parsed = [_parse_wav(part) for part in parts]
+    if not parsed:
+        raise ValueError("nothing to concatenate")
+
+    fmt = parsed[0][0]
+    for other_fmt, _ in parsed[1:]:
+        if other_fmt[:16] != fmt[:16]:
+            raise ValueError("WAV parts have different formats")
+
+    pcm_parts = [_whole_frames(fmt, pcm) for _, pcm in parsed]
+    data_size = sum(len(pcm) for pcm in pcm_parts)
+    out = bytearray(12 + 8 + len(fmt) + 8 + data_size)
+    offset = _write_wav_header(out, fmt, data_size)
+    for pcm in pcm_parts:
+        out[offset:offset + len(pcm)] = pcm
+        offset += len(pcm)
+
+    return bytes(out)
+
+
+class ParallelTTS:
+    """Bounded pool that synthesizes the sentences of a reply concurrently"""
+
+    def __init__(self, workers: int = PARALLEL_WORKERS):
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fish-tts') if workers > 0 else None
+        self._lock = threading.Lock()
+        self.replies = 0
+        self.sentences = 0
+        self.serial_fallbacks = 0
+
+    def synthesize(self, text: str, reference_id: str = None, emotion: str = None,
+                   use_cache: bool = True, audio_format: str = DEFAULT_FORMAT) -> bytes:
+        """
+        Same contract as stream_tts, but multi-sentence WAV replies are
+        synthesized sentence by sentence in parallel and stitched together.
+        Other formats, single sentences and a disabled pool use stream_tts.
+        """
+        _check_format(audio_format)
+        sentences = split_sentences(text)
+
+        if self._pool is None or audio_format != 'wav' or len(sentences) < 2:
+            return stream_tts(text, reference_id, emotion, use_cache, audio_format)
+
+        def render() -> bytes:
+            # Each sentence goes through the TTS cache on its own, so repeated
+            # sentences across replies are free too
+            futures = [
+                self._pool.submit(stream_tts, sentence, reference_id, emotion, use_cache, audio_format)
+                for sentence in sentences
+            ]
+            parts = [future.result() for future in futures]
+            try:
+                audio = concat_wav(parts)
+            except ValueError as e:
+                print(f"Parallel TTS could not stitch sentences ({e}), synthesizing serially")
+                with self._lock:
+                    self.serial_fallbacks += 1
+                return stream_tts(text, reference_id, emotion, False, audio_format)
+
+            with self._lock:
+                self.replies += 1
+                self.sentences += len(sentences)
+            return audio
+
+        if not (use_cache and tts_cache.CACHE_ENABLED):
+            return render()
+
+        # The stitched reply is cached under the same key stream_tts would use
+        mock = FishSessionManager().mock_mode
+        key = tts_cache.cache_key(text, reference_id or DEFAULT_REFERENCE_ID, emotion, audio_format, mock)
+        return tts_cache.cached_synthesis(key, render)
+
+    def iter_chunks(self, text: str, reference_id: str = None, emotion: str = None,
+                    use_cache: bool = True, chunk_size: int = TTS_STREAM_CHUNK) -> Iterator[bytes]:
+        """
+        Same contract as iter_tts (WAV only): all sentences are synthesized
+        in parallel, and each one streams out in order as soon as it and
+        every sentence before it are ready. The header carries the streaming
+        data size, since the total isn't known until the last sentence.
+
+        Raises:
+            ValueError: If a sentence comes back in a different WAV format
+        """
+        sentences = split_sentences(text)
+        if self._pool is None or len(sentences) < 2:
+            yield from iter_tts(text, reference_id, emotion, use_cache, chunk_size)
+            return
+
+        futures = [
+            self._pool.submit(stream_tts, sentence, reference_id, emotion, use_cache, 'wav')
+            for sentence in sentences
+        ]
+        try:
+            fmt = None
+            for future in futures:
+                part_fmt, pcm = _parse_wav(future.result())
+                if fmt is None:
+                    fmt = part_fmt
+                    header = bytearray(12 + 8 + len(fmt) + 8)
+                    _write_wav_header(header, fmt, WAV_STREAMING_SIZE)
+                    yield bytes(header)
+                elif part_fmt[:16] != fmt[:16]:
+                    raise ValueError("WAV parts have different formats")
+
+                pcm = _whole_frames(fmt, pcm)
+                for start in range(0, len(pcm), chunk_size):
+                    yield bytes(pcm[start:start + chunk_size])
+
+            with self._lock:
+                self.replies += 1
+                self.sentences += len(sentences)
+        finally:
+            # Listener went away or a sentence failed: drop the queued work
+            for future in futures:
+                future.cancel()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'parallel_replies': self.replies,
+                'sentences': self.sentences,
+                'avg_sentences_per_reply': round(self.sentences / self.replies, 2) if self.replies else None,
+                'serial_fallbacks': self.serial_fallbacks
+            }
+
+
+_parallel: Optional[ParallelTTS] = None
+_parallel_lock = threading.Lock()
+
+
+def get_parallel_tts() -> ParallelTTS:
+    """Shared pool for the process"""
+    global _parallel
+    if _parallel is None:
+        with _parallel_lock:
+            if _parallel is None:
+                _parallel = ParallelTTS()
+    return _parallel
+
+
+def stream_tts_parallel(text: str, reference_id: str = None, emotion: str = None,
+                        use_cache: bool = True, audio_format: str = DEFAULT_FORMAT) -> bytes:
+    """Drop-in for stream_tts that synthesizes the sentences of long replies concurrently"""
+    return get_parallel_tts().synthesize(text, reference_id, emotion, use_cache, audio_format)
+
+
+def iter_tts_parallel(text: str, reference_id: str = None, emotion: str = None,
+                      use_cache: bool = True, chunk_size: int = TTS_STREAM_CHUNK) -> Iterator[bytes]:
+    """Drop-in for iter_tts (WAV) that synthesizes the sentences of long replies concurrently"""
+    return get_parallel_tts().iter_chunks(text, reference_id, emotion, use_cache, chunk_size)
+
+
+def get_parallel_tts_stats() -> Dict:
+    """Parallel sentence synthesis counters for the stats endpoint"""
+    return get_parallel_tts().get_stats()
@@ -0,0 +1,240 @@
+"""
+Speech segmentation for continuous audio ingestion.
+
+Clients in streaming mode send sequence-numbered 16-bit PCM frames instead
+of independent 2-second recordings. Each speaker gets a SpeechSegmenter: a
+fixed-size buffer that holds a short pre-roll while nobody talks, follows an
+utterance while they do, and cuts it at the next pause, so each utterance
+reaches ASR once and whole.
+
+With a listener (e.g. fish.asr_stream.StreamingTranscriber) the utterance
+is handed over while it is still going instead: listener.feed(pcm) gets its
+audio up to the latest speech, listener.pause() is called once the speaker
+has been quiet for TAIL_SEC, and listener.end_utterance(keep) when it is
+cut (keep is False for clicks too short to transcribe).
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .vad import FRAME_SEC, SpeechDetector, create_detector, encode_wav
+
+
+STREAM_SAMPLE_RATE = 16000  # What clients send in streaming mode
+PAUSE_SEC = float(os.getenv('FISH_SEGMENT_PAUSE_SEC', 0.6))  # Silence that ends an utterance
+MAX_SEGMENT_SEC = float(os.getenv('FISH_SEGMENT_MAX_SEC', 15))  # Longer utterances are cut here
+PRE_ROLL_SEC = 0.3  # Audio kept from before speech was detected
+TAIL_SEC = 0.2  # Silence kept after the last speech frame
+START_FRAMES = 3  # Consecutive speech frames that open a segment
+MIN_SPEECH_SEC = 0.25  # Segments with less speech than this are discarded as clicks
+
+
+class SpeechSegmenter:
+    """
+    Cuts one speaker's continuous PCM stream into utterances.
+
+    push() takes frames in sequence order and returns the utterances that
+    ended, as WAV files. Frames older than the last one seen are dropped;
+    missing sequence numbers are counted as lost. Memory is bounded by
+    MAX_SEGMENT_SEC + PRE_ROLL_SEC of audio. With a listener, utterances go
+    to it as they are spoken and push() returns nothing.
+    """
+
+    def __init__(self, sample_rate: int = STREAM_SAMPLE_RATE, detector: Optional[SpeechDetector] = None,
+                 pause_sec: float = PAUSE_SEC, max_segment_sec: float = MAX_SEGMENT_SEC, listener=None):
+        self.sample_rate = sample_rate
+        self.detector = detector or create_detector()
+        self.listener = listener
+        self.frame_len = int(sample_rate * FRAME_SEC)
+        self.pause_frames = max(1, int(round(pause_sec / FRAME_SEC)))
+        self.tail_frames = min(self.pause_frames, int(round(TAIL_SEC / FRAME_SEC)))
+        self.pre_roll = int(sample_rate * PRE_ROLL_SEC)
+
+        capacity = int(sample_rate * max_segment_sec) + self.pre_roll
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self._length = 0  # Samples in the buffer
+        self._analyzed = 0  # Samples already run through the detector
+
+        self.in_speech = False
+        self._segment_start = 0  # Buffer offset of the current utterance
+        self._speech_run = 0  # Consecutive speech frames
+        self._silence_run = 0  # Consecutive silent frames inside an utterance
+        self._speech_frames = 0  # Speech frames in the current utterance
+        self._speech_end = 0  # Buffer offset after the utterance's latest speech frame
+        self._streamed = 0  # Buffer offset up to which the listener has the utterance
+
+        self.expected_seq = 0
+        self._lock = threading.Lock()
+        self.stats = {'frames': 0, 'stale_frames': 0, 'lost_frames': 0, 'segments': 0,
+                      'discarded_segments': 0, 'forced_cuts': 0, 'segment_sec': 0.0}
+
+    @property
+    def capacity_bytes(self) -> int:
+        return self._buffer.nbytes
+
+    def push(self, seq: int, pcm: bytes) -> List[bytes]:
+        """
+        Add one frame of 16-bit mono PCM
+
+        Args:
+            seq: Frame number; 0 starts a new stream
+
+        Returns:
+            WAV files of the utterances this frame completed (usually none)
+        """
+        with self._lock:
+            if seq == 0 and self.expected_seq > 0:
+                self._reset_stream()
+            if seq < self.expected_seq:
+                self.stats['stale_frames'] += 1
+                return []
+            self.stats['lost_frames'] += seq - self.expected_seq
+            self.expected_seq = seq + 1
+            self.stats['frames'] += 1
+
+            segments = []
+            samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype='<i2')
+            while len(samples):
+                room = len(self._buffer) - self._length
+                if room == 0:
+                    segments.extend(self._make_room())
+                    continue
+                take = samples[:room]
+                self._buffer[self._length:self._length + len(take)] = take
+                self._length += len(take)
+                samples = samples[len(take):]
+                segments.extend(self._analyze())
+            if self.in_speech:
+                self._stream_to(self._speech_end)
+            return segments
+
+    def flush(self) -> List[bytes]:
+        """End of stream: emit the utterance in progress, if any"""
+        with self._lock:
+            segments = []
+            if self.in_speech:
+                segment = self._cut(self._length)
+                if segment:
+                    segments.append(segment)
+            self._reset_stream()
+            return segments
+
+    def _reset_stream(self):
+        if self.in_speech and self.listener:
+            self.listener.end_utterance(False)
+        self._length = self._analyzed = 0
+        self.in_speech = False
+        self._speech_run = self._silence_run = self._speech_frames = 0
+        self.expected_seq = 0
+
+    def _analyze(self) -> List[bytes]:
+        """Run whole frames through the detector and the utterance state machine"""
+        segments = []
+        while self._length - self._analyzed >= self.frame_len:
+            frame = self._buffer[self._analyzed:self._analyzed + self.frame_len]
+            self._analyzed += self.frame_len
+            speech = self.detector.stream(frame, self.sample_rate)
+
+            if not self.in_speech:
+                self._speech_run = self._speech_run + 1 if speech else 0
+                if self._speech_run >= START_FRAMES:
+                    self.in_speech = True
+                    opened_at = self._analyzed - START_FRAMES * self.frame_len
+                    self._segment_start = max(0, opened_at - self.pre_roll)
+                    self._speech_frames = START_FRAMES
+                    self._silence_run = 0
+                    self._speech_end = self._analyzed
+                    self._streamed = self._segment_start
+                else:
+                    self._trim_idle()
+                continue
+
+            if speech:
+                self._speech_frames += 1
+                self._silence_run = 0
+                self._speech_end = self._analyzed
+            else:
+                self._silence_run += 1
+                if self.listener and self._silence_run == self.tail_frames < self.pause_frames:
+                    # Probably the end: let the listener get ahead on what was said
+                    self._stream_to(self._speech_end)
+                    self.listener.pause()
+                if self._silence_run >= self.pause_frames:
+                    # Keep a short tail of the pause, drop the rest
+                    end = self._analyzed - (self._silence_run - self.tail_frames) * self.frame_len
+                    segment = self._cut(end)
+                    if segment:
+                        segments.append(segment)
+        return segments
+
+    def _trim_idle(self):
+        """While nobody talks, keep only the pre-roll (plus any unanalyzed samples)"""
+        keep_from = max(0, self._analyzed - self.pre_roll)
+        if keep_from < self.frame_len * 10:
+            return  # Not worth moving yet
+        remaining = self._length - keep_from
+        self._buffer[:remaining] = self._buffer[keep_from:self._length]
+        self._length = remaining
+        self._analyzed -= keep_from
+
+    def _make_room(self) -> List[bytes]:
+        """Buffer full mid-utterance: cut what we have so memory stays bounded"""
+        if not self.in_speech:
+            self._trim_idle()
+            return []
+        self.stats['forced_cuts'] += 1
+        segment = self._cut(self._analyzed)
+        # Whatever follows continues as a new utterance straight away
+        self.in_speech = True
+        self._segment_start = self._speech_end = self._streamed = 0
+        self._speech_frames = self._silence_run = 0
+        return [segment] if segment else []
+
+    def _stream_to(self, end: int):
+        """Hand the listener the utterance audio up to buffer offset end"""
+        if self.listener and end > self._streamed:
+            self.listener.feed(self._buffer[self._streamed:end].tobytes())
+            self._streamed = end
+
+    def _cut(self, end: int) -> Optional[bytes]:
+        """Close the utterance at buffer offset end; return it as WAV unless too little speech"""
+        speech_sec = self._speech_frames * FRAME_SEC
+        keep = speech_sec >= MIN_SPEECH_SEC and end > self._segment_start
+        if self.listener:
+            # Streaming recognizers don't need the silent tail
+            self._stream_to(min(end, self._speech_end))
+            self.listener.end_utterance(keep)
+            segment = None
+        else:
+            segment = self._buffer[self._segment_start:end].copy()
+        segment_sec = (end - self._segment_start) / self.sample_rate
+
+        # Drop everything up to end, keeping later samples for the next utterance
+        remaining = self._length - end
+        self._buffer[:remaining] = self._buffer[end:self._length]
+        self._length = remaining
+        self._analyzed = max(0, self._analyzed - end)
+        self.in_speech = False
+        self._speech_run = self._silence_run = self._speech_frames = 0
+
+        if not keep:
+            self.stats['discarded_segments'] += 1
+            return None
+        self.stats['segments'] += 1
+        self.stats['segment_sec'] += segment_sec
+        return encode_wav(segment, self.sample_rate) if segment is not None else None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            buffered = self._length
+        return {
+            **stats,
+            'in_speech': self.in_speech,
+            'buffered_sec': buffered / self.sample_rate,
+            'buffer_bytes': self.capacity_bytes,
+            'avg_segment_sec': stats['segment_sec'] / stats['segments'] if stats['segments'] else 0
+        }
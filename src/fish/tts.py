@@ -1,53 +1,210 @@
 """
 Fish Audio TTS (Text-to-Speech) module.
 
-Converts text to audio bytes.
+Converts text to audio bytes, either whole (stream_tts) or as a stream of
+chunks while synthesis is still running (iter_tts).
 """
 
+import os
 import struct
 import math
+import time
+from typing import Iterable, Iterator, Optional
 from .client import FishSessionManager
+from . import cache as tts_cache
 
+DEFAULT_REFERENCE_ID = 'b279044ffddf4291b14da6aac86b528e'  # Can be customized for specific voices
+TTS_STREAM_CHUNK = 8192  # Bytes per chunk yielded by iter_tts
 
-def stream_tts(text: str, reference_id: str = None, emotion: str = None) -> bytes:
+# Data/RIFF size of a WAV whose length is unknown while it streams
+WAV_STREAMING_SIZE = 0xFFFFFFFF
+
+# Output formats Fish Audio can produce, with the MIME type clients play them as
+AUDIO_FORMATS = {
+    'wav': 'audio/wav',
+    'mp3': 'audio/mpeg',
+    'opus': 'audio/ogg; codecs=opus',
+}
+DEFAULT_FORMAT = 'wav'
+
+# Bitrates for the compressed formats (speech sounds fine well below music rates)
+MP3_BITRATE = int(os.getenv('FISH_MP3_BITRATE', 64))  # 64 / 128 / 192 kbps
+OPUS_BITRATE = int(os.getenv('FISH_OPUS_BITRATE', 32))  # 24 / 32 / 48 / 64 kbps
+
+
+def negotiate_format(accepted: Optional[Iterable[str]] = None) -> str:
+    """
+    Pick the output format for a client.
+
+    Args:
+        accepted: Formats the client can play, most preferred first
+
+    Returns:
+        The first supported one, else DEFAULT_FORMAT. Mock mode only
+        produces WAV, so it always negotiates WAV.
+    """
+    if FishSessionManager().mock_mode:
+        return DEFAULT_FORMAT
+    for audio_format in accepted or []:
+        audio_format = str(audio_format).lower()
+        if audio_format in AUDIO_FORMATS:
+            return audio_format
+    return DEFAULT_FORMAT
+
+
+def _check_format(audio_format: str) -> str:
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unsupported TTS format '{audio_format}' (expected one of {', '.join(AUDIO_FORMATS)})")
+    return audio_format
+
+
+def stream_tts(text: str, reference_id: str = None, emotion: str = None, use_cache: bool = True,
+               audio_format: str = DEFAULT_FORMAT) -> bytes:
     """
     Convert text to audio bytes using Fish Audio TTS.
 
     Args:
         text: Text string to synthesize into speech.
+        use_cache: Serve repeats from the TTS cache (memory, then disk) when enabled.
+        audio_format: One of AUDIO_FORMATS ('wav', 'mp3', 'opus').
 
     Returns:
-        Audio data as bytes (WAV format).
+        Audio data as bytes in audio_format.
 
     Mock mode:
-        Returns a short generated WAV file with a simple 440Hz tone (1 second).
+        Returns a short generated WAV file with a simple 440Hz tone (1 second),
+        whatever the requested format (see negotiate_format).
 
     Real implementation:
         Sends text to Fish Audio TTS API endpoint and returns the audio data.
     """
     manager = FishSessionManager()
+    _check_format(audio_format)
+
+    if not (use_cache and tts_cache.CACHE_ENABLED):
+        return _synthesize(manager, text, reference_id, emotion, audio_format)
+
+    key = tts_cache.cache_key(text, reference_id or DEFAULT_REFERENCE_ID, emotion, audio_format, manager.mock_mode)
+    return tts_cache.cached_synthesis(key, lambda: _synthesize(manager, text, reference_id, emotion, audio_format))
+
+
+def iter_tts(text: str, reference_id: str = None, emotion: str = None, use_cache: bool = True,
+             chunk_size: int = TTS_STREAM_CHUNK, audio_format: str = DEFAULT_FORMAT) -> Iterator[bytes]:
+    """
+    Convert text to audio, yielding bytes as they arrive from Fish Audio.
+
+    The chunks concatenate to a playable file. For WAV, the first non-empty
+    chunk always contains the complete header; a zero data size (Fish Audio
+    bug) is rewritten to WAV_STREAMING_SIZE on the fly, and the cached copy
+    gets the exact size once the stream ends.
+
+    Args:
+        text: Text string to synthesize into speech.
+        use_cache: Replay cached audio, and cache the stream once complete.
+        chunk_size: Bytes per chunk.
+        audio_format: One of AUDIO_FORMATS.
+
+    Mock mode:
+        Yields the generated 440Hz WAV tone in chunk_size pieces.
+    """
+    manager = FishSessionManager()
+    _check_format(audio_format)
+    cache = tts_cache.get_tts_cache() if (use_cache and tts_cache.CACHE_ENABLED) else None
+    key = tts_cache.cache_key(text, reference_id or DEFAULT_REFERENCE_ID, emotion, audio_format, manager.mock_mode)
+
+    if cache is not None:
+        audio = cache.get(key)
+        if audio is not None:
+            yield from iter_audio_chunks(audio, chunk_size)
+            return
+
+    start = time.perf_counter()
 
     if manager.mock_mode:
-        return _generate_mock_wav()
+        audio = _generate_mock_wav()
+        if cache is not None:
+            cache.put(key, audio, synth_sec=time.perf_counter() - start)
+        yield from iter_audio_chunks(audio, chunk_size)
+        return
 
-    # Real Fish Audio TTS API call
+    try:
+        response = _request_tts(manager, text, reference_id, emotion, audio_format)
+    except Exception as e:
+        raise RuntimeError(f"Fish Audio TTS API call failed: {str(e)}")
+
+    # Header fix-ups only apply to WAV; compressed formats pass straight through
+    fixer = WavHeaderFixer() if audio_format == 'wav' else None
+    raw_chunks = []
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if not chunk:
+                continue
+            raw_chunks.append(chunk)
+            out = fixer.feed(chunk) if fixer else chunk
+            if out:
+                yield out
+
+        tail = fixer.flush() if fixer else b''
+        if tail:
+            yield tail
+    except Exception as e:
+        raise RuntimeError(f"Fish Audio TTS stream failed: {str(e)}")
+    finally:
+        response.close()
+
+    if cache is not None:
+        audio = b''.join(raw_chunks)
+        if fixer:
+            audio = _fix_wav_data_chunk(audio)
+        cache.put(key, audio, synth_sec=time.perf_counter() - start)
+
+
+def iter_audio_chunks(audio: bytes, chunk_size: int = TTS_STREAM_CHUNK) -> Iterator[bytes]:
+    """Split already synthesized audio into stream-sized chunks"""
+    view = memoryview(audio)
+    for offset in range(0, len(audio), chunk_size):
+        yield bytes(view[offset:offset + chunk_size])
+
+
+def _request_tts(manager: FishSessionManager, text: str, reference_id: str = None, emotion: str = None,
+                 audio_format: str = DEFAULT_FORMAT):
+    """Start a streamed Fish Audio TTS request and return the open response"""
     session = manager.get_tts_session()
     url = f"{manager.api_base}/v1/tts"
 
+    # Fish Audio TTS API payload
+    payload = {
+        'text': text,
+        'format': audio_format,
+        'reference_id': reference_id or DEFAULT_REFERENCE_ID
+    }
+    if audio_format == 'mp3':
+        payload['mp3_bitrate'] = MP3_BITRATE
+    elif audio_format == 'opus':
+        payload['opus_bitrate'] = OPUS_BITRATE
+
+    # Add emotion parameter if provided
+    if emotion:
+        payload['emotion'] = emotion
+
+    response = session.post(url, json=payload, timeout=60, stream=True)
     try:
-        # Fish Audio TTS API payload
-        payload = {
-            'text': text,
-            'format': 'wav',
-            'reference_id': reference_id or 'b279044ffddf4291b14da6aac86b528e'  # Can be customized for specific voices
-        }
-
-        # Add emotion parameter if provided
-        if emotion:
-            payload['emotion'] = emotion
-
-        response = session.post(url, json=payload, timeout=60, stream=True)
         response.raise_for_status()
+    except Exception:
+        response.close()
+        raise
+    return response
+
+
+def _synthesize(manager: FishSessionManager, text: str, reference_id: str = None, emotion: str = None,
+                audio_format: str = DEFAULT_FORMAT) -> bytes:
+    """Uncached synthesis: mock tone or one Fish Audio TTS request"""
+    if manager.mock_mode:
+        return _generate_mock_wav()
+
+    # Real Fish Audio TTS API call
+    try:
+        response = _request_tts(manager, text, reference_id, emotion, audio_format)
 
         # Aggregate audio chunks from streaming response
         audio_chunks = []
@@ -56,6 +213,8 @@ def stream_tts(text: str, reference_id: str = None, emotion: str = None) -> byte
                 audio_chunks.append(chunk)
 
         raw_audio = b''.join(audio_chunks)
+        if audio_format != 'wav':
+            return raw_audio
         
         # Fix WAV file if data chunk size is 0 (Fish Audio API bug)
         return _fix_wav_data_chunk(raw_audio)
@@ -64,6 +223,72 @@ def stream_tts(text: str, reference_id: str = None, emotion: str = None) -> byte
         raise RuntimeError(f"Fish Audio TTS API call failed: {str(e)}")
 
 
+class WavHeaderFixer:
+    """
+    Incremental counterpart of _fix_wav_data_chunk for streamed audio.
+
+    Bytes are held back only until the RIFF header and the data chunk header
+    have arrived; everything after that passes straight through. The true
+    length isn't known until the stream ends, so a zero data size is
+    rewritten as WAV_STREAMING_SIZE ("until end of stream"). Non-WAV input
+    passes through untouched.
+    """
+
+    MAX_HEADER_BYTES = 4096  # Give up looking for the data chunk past this offset
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._done = False
+        self.fixed = False  # Whether the header was rewritten
+        self.data_offset = None  # Where PCM starts in the stream, once known
+
+    def feed(self, chunk: bytes) -> bytes:
+        """Add a chunk; returns the bytes that can be forwarded now (maybe empty)"""
+        if self._done:
+            return chunk
+
+        self._buffer += chunk
+        if self._header_complete():
+            return self._release()
+        return b''
+
+    def flush(self) -> bytes:
+        """End of stream: forward whatever is still held back"""
+        if self._done:
+            return b''
+        return self._release()
+
+    def _release(self) -> bytes:
+        self._done = True
+        out = bytes(self._buffer)
+        self._buffer = bytearray()
+        return out
+
+    def _header_complete(self) -> bool:
+        buf = self._buffer
+        if len(buf) < 12:
+            return False
+        if buf[:4] != b'RIFF' or buf[8:12] != b'WAVE':
+            return True  # Not a WAV - pass through
+
+        pos = 12  # Skip RIFF header
+        while pos + 8 <= len(buf) and pos < self.MAX_HEADER_BYTES:
+            chunk_id = bytes(buf[pos:pos+4])
+            chunk_size = struct.unpack_from('<I', buf, pos + 4)[0]
+
+            if chunk_id == b'data':
+                if chunk_size == 0:
+                    struct.pack_into('<I', buf, pos + 4, WAV_STREAMING_SIZE)
+                    struct.pack_into('<I', buf, 4, WAV_STREAMING_SIZE)
+                    self.fixed = True
+                self.data_offset = pos + 8
+                return True
+            pos += 8 + chunk_size
+
+        # No data chunk within MAX_HEADER_BYTES - stop holding bytes back
+        return pos >= self.MAX_HEADER_BYTES
+
+
 def _fix_wav_data_chunk(wav_data: bytes) -> bytes:
     """
     Fix WAV file where data chunk size is incorrectly set to 0.
@@ -0,0 +1,332 @@
+"""
+Voice activity detection in front of Fish Audio ASR.
+
+Chunks are decoded to PCM and checked for speech before stream_asr: silent
+chunks (room noise, hum, hiss) never reach Fish Audio, and speech chunks are
+trimmed to their speech regions. WAV is decoded directly; webm/ogg/mp3 need
+ffmpeg on the PATH. Audio that can't be decoded is passed through as is, so
+without ffmpeg VAD does nothing for the browser client's webm/opus chunks
+(check_ffmpeg() warns about this at startup).
+
+Detectors are pluggable: EnergyZCRDetector (NumPy, always available) is the
+baseline, WebRTCDetector uses the optional webrtcvad package, and
+register_detector() adds others.
+"""
+
+import io
+import os
+import time
+import wave
+import shutil
+import threading
+import subprocess
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .asr import stream_asr
+
+try:
+    import webrtcvad
+except ImportError:  # The WebRTC detector is optional
+    webrtcvad = None
+
+
+VAD_ENABLED = os.getenv('FISH_VAD', 'true').lower() in ['1', 'true', 'yes']
+VAD_DETECTOR = os.getenv('FISH_VAD_DETECTOR', 'energy')
+VAD_RECORD_DIR = os.getenv('FISH_VAD_RECORD_DIR', '')  # Save every chunk here (for tests/eval_vad.py)
+
+FRAME_SEC = 0.03
+MIN_SPEECH_SEC = 0.2  # Less speech than this in a chunk counts as silence
+PAD_SEC = 0.2  # Audio kept around speech when trimming
+DECODE_SAMPLE_RATE = 16000  # ffmpeg output rate (also the ASR upload rate for trimmed audio)
+DECODE_TIMEOUT_SEC = 5
+
+_FFMPEG = shutil.which('ffmpeg')
+
+
+def decode_pcm(audio: bytes) -> Optional[Tuple[np.ndarray, int]]:
+    """
+    Mono 16-bit PCM and its sample rate, or None if the audio can't be decoded
+    (not WAV and no ffmpeg, or a broken file)
+    """
+    if audio[:4] == b'RIFF':
+        try:
+            with wave.open(io.BytesIO(audio)) as wav:
+                if wav.getsampwidth() != 2:
+                    return None
+                channels = wav.getnchannels()
+                rate = wav.getframerate()
+                pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+        except (wave.Error, EOFError):
+            return None
+        if channels > 1:
+            pcm = pcm[:len(pcm) - len(pcm) % channels].reshape(-1, channels).mean(axis=1).astype(np.int16)
+        return pcm, rate
+
+    if _FFMPEG is None:
+        return None
+    try:
+        result = subprocess.run(
+            [_FFMPEG, '-v', 'error', '-i', 'pipe:0', '-f', 's16le', '-ac', '1',
+             '-ar', str(DECODE_SAMPLE_RATE), 'pipe:1'],
+            input=audio, capture_output=True, timeout=DECODE_TIMEOUT_SEC
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return np.frombuffer(result.stdout, dtype='<i2'), DECODE_SAMPLE_RATE
+
+
+def encode_wav(pcm: np.ndarray, sample_rate: int) -> bytes:
+    """16-bit mono WAV file for pcm"""
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.astype('<i2').tobytes())
+    return out.getvalue()
+
+
+class SpeechDetector:
+    """
+    One voice activity detector.
+
+    speech_frames() takes mono 16-bit PCM and returns one bool per
+    FRAME_SEC frame (trailing partial frame dropped). stream() decides one
+    frame of a live stream; detectors may keep state across calls, so use
+    one instance per stream.
+    """
+
+    name = "detector"
+
+    def available(self) -> bool:
+        """False if the detector's dependencies are missing"""
+        return True
+
+    def speech_frames(self, pcm: np.ndarray, sample_rate: int) -> np.ndarray:
+        raise NotImplementedError
+
+    def stream(self, frame: np.ndarray, sample_rate: int) -> bool:
+        return bool(self.speech_frames(frame, sample_rate).any())
+
+
+class EnergyZCRDetector(SpeechDetector):
+    """
+    Frame energy against the chunk's noise floor, plus zero-crossing rate.
+
+    Energy is measured in the speech band only (BAND_HZ), so mains hum and
+    most of the hiss above it don't count. A frame is speech when it is
+    SNR_DB above the quietest frames (and above an absolute floor), or loud
+    outright, and its zero-crossing rate is in the voiced range - which
+    rejects what is left of hum (too few crossings) and hiss (too many).
+    """
+
+    name = "energy"
+
+    MIN_DBFS = float(os.getenv('FISH_VAD_MIN_DBFS', -50))  # Never speech below this
+    LOUD_DBFS = float(os.getenv('FISH_VAD_LOUD_DBFS', -30))  # Speech regardless of the noise floor
+    SNR_DB = float(os.getenv('FISH_VAD_SNR_DB', 8))
+    BAND_HZ = (100, 3800)
+    ZCR_MIN = 0.01
+    ZCR_MAX = 0.35
+    FLOOR_RISE_DB_PER_SEC = 3.0  # How fast the live noise floor follows louder noise
+
+    def __init__(self):
+        self._floor_db = None  # Running noise floor for stream()
+
+    def features(self, pcm: np.ndarray, sample_rate: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Speech-band level (dBFS) and zero-crossing rate per FRAME_SEC frame"""
+        frame_len = max(1, int(sample_rate * FRAME_SEC))
+        count = len(pcm) // frame_len
+        if count == 0:
+            return np.zeros(0), np.zeros(0)
+
+        frames = pcm[:count * frame_len].astype(np.float32).reshape(count, frame_len) / 32768.0
+        spectrum = np.abs(np.fft.rfft(frames, axis=1)) ** 2
+        freqs = np.fft.rfftfreq(frame_len, 1 / sample_rate)
+        band = (freqs >= self.BAND_HZ[0]) & (freqs <= self.BAND_HZ[1])
+        # Parseval: band power as a mean square, comparable with full-band dBFS
+        band_power = 2 * spectrum[:, band].sum(axis=1) / frame_len ** 2
+        level_db = 10 * np.log10(band_power + 1e-12)
+        crossings = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+        return level_db, crossings
+
+    def classify(self, level_db, crossings, noise_floor_db: float):
+        threshold = max(self.MIN_DBFS, min(noise_floor_db + self.SNR_DB, self.LOUD_DBFS))
+        return (level_db > threshold) & (crossings >= self.ZCR_MIN) & (crossings <= self.ZCR_MAX)
+
+    def speech_frames(self, pcm, sample_rate):
+        level_db, crossings = self.features(pcm, sample_rate)
+        if len(level_db) == 0:
+            return np.zeros(0, dtype=bool)
+        return self.classify(level_db, crossings, np.percentile(level_db, 10))
+
+    def stream(self, frame, sample_rate):
+        level_db, crossings = self.features(frame, sample_rate)
+        if len(level_db) == 0:
+            return False
+        # The floor drops to any quieter frame at once and creeps up under steady louder noise
+        level = float(level_db.min())
+        if self._floor_db is None or level < self._floor_db:
+            self._floor_db = level
+        else:
+            self._floor_db += self.FLOOR_RISE_DB_PER_SEC * FRAME_SEC * len(level_db)
+        return bool(self.classify(level_db, crossings, self._floor_db).any())
+
+
+class WebRTCDetector(SpeechDetector):
+    """WebRTC's GMM voice detector (needs the webrtcvad package; 8/16/32/48 kHz only)"""
+
+    name = "webrtc"
+    RATES = (8000, 16000, 32000, 48000)
+
+    def __init__(self, aggressiveness: int = int(os.getenv('FISH_VAD_AGGRESSIVENESS', 2))):
+        self.vad = webrtcvad.Vad(aggressiveness) if webrtcvad is not None else None
+        self._fallback = EnergyZCRDetector()
+
+    def available(self):
+        return self.vad is not None
+
+    def speech_frames(self, pcm, sample_rate):
+        if sample_rate not in self.RATES:
+            return self._fallback.speech_frames(pcm, sample_rate)
+        frame_len = int(sample_rate * FRAME_SEC)
+        data = pcm.astype('<i2').tobytes()
+        step = frame_len * 2
+        return np.array([self.vad.is_speech(data[i:i + step], sample_rate)
+                         for i in range(0, len(data) - step + 1, step)], dtype=bool)
+
+
+DETECTORS: Dict[str, Callable[[], SpeechDetector]] = {
+    'energy': EnergyZCRDetector,
+    'webrtc': WebRTCDetector
+}
+
+
+def register_detector(name: str, factory: Callable[[], SpeechDetector]):
+    """Make a detector selectable with FISH_VAD_DETECTOR=name"""
+    DETECTORS[name] = factory
+
+
+def create_detector(name: str = VAD_DETECTOR) -> SpeechDetector:
+    """New instance of the named detector, or the energy baseline if it is unavailable"""
+    detector = DETECTORS.get(name, EnergyZCRDetector)()
+    if not detector.available():
+        print(f"VAD detector '{name}' unavailable, using energy")
+        detector = EnergyZCRDetector()
+    return detector
+
+
+class VoiceActivityGate:
+    """
+    Decides, per chunk, whether it goes to ASR and with which audio.
+
+    check() returns None for silence, a trimmed WAV of the speech regions,
+    or the original bytes when the chunk can't be decoded.
+    """
+
+    def __init__(self, detector: Optional[SpeechDetector] = None):
+        self.detector = detector or create_detector()
+        self._lock = threading.Lock()
+        self.stats = {'chunks': 0, 'speech': 0, 'silent': 0, 'undecodable': 0,
+                      'audio_sec': 0.0, 'sent_sec': 0.0, 'vad_sec': 0.0}
+
+    def check(self, audio: bytes) -> Optional[bytes]:
+        start = time.perf_counter()
+        decoded = decode_pcm(audio)
+        verdict = 'undecodable'
+        result = audio
+        audio_sec = sent_sec = 0.0
+
+        if decoded is not None:
+            pcm, sample_rate = decoded
+            audio_sec = len(pcm) / sample_rate
+            frame_len = max(1, int(sample_rate * FRAME_SEC))
+            speech = self.detector.speech_frames(pcm, sample_rate)
+
+            if speech.sum() * FRAME_SEC < MIN_SPEECH_SEC:
+                verdict, result = 'silent', None
+            else:
+                # Keep PAD_SEC around each speech frame; longer pauses shrink to 2 * PAD_SEC
+                pad = int(round(PAD_SEC / FRAME_SEC))
+                keep = np.convolve(speech.astype(np.int32), np.ones(2 * pad + 1, dtype=np.int32), mode='same') > 0
+                mask = np.zeros(len(pcm), dtype=bool)
+                mask[:len(keep) * frame_len] = np.repeat(keep, frame_len)
+                trimmed = pcm[mask]
+                verdict, result = 'speech', encode_wav(trimmed, sample_rate)
+                sent_sec = len(trimmed) / sample_rate
+
+        if VAD_RECORD_DIR:
+            self._record(audio, verdict)
+
+        with self._lock:
+            self.stats['chunks'] += 1
+            self.stats[verdict] += 1
+            self.stats['audio_sec'] += audio_sec
+            self.stats['sent_sec'] += sent_sec
+            self.stats['vad_sec'] += time.perf_counter() - start
+        return result
+
+    @staticmethod
+    def _record(audio: bytes, verdict: str):
+        ext = 'wav' if audio[:4] == b'RIFF' else 'webm'
+        try:
+            os.makedirs(VAD_RECORD_DIR, exist_ok=True)
+            path = os.path.join(VAD_RECORD_DIR, f"{time.time():.3f}-{verdict}.{ext}")
+            with open(path, 'wb') as f:
+                f.write(audio)
+        except OSError as e:
+            print(f"VAD recording failed: {e}")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        decoded = stats['speech'] + stats['silent']
+        return {
+            **stats,
+            'detector': self.detector.name,
+            'enabled': VAD_ENABLED,
+            'ffmpeg': _FFMPEG is not None,
+            'asr_avoided_ratio': stats['silent'] / stats['chunks'] if stats['chunks'] else 0,
+            'trimmed_ratio': 1 - stats['sent_sec'] / stats['audio_sec'] if stats['audio_sec'] else 0,
+            'vad_avg_ms': stats['vad_sec'] / stats['chunks'] * 1000 if stats['chunks'] else 0,
+            'decoded_ratio': decoded / stats['chunks'] if stats['chunks'] else 0
+        }
+
+
+_gate: Optional[VoiceActivityGate] = None
+_gate_lock = threading.Lock()
+
+
+def check_ffmpeg() -> bool:
+    """Whether compressed chunks can be gated; logs a warning when VAD is on but ffmpeg is missing"""
+    if VAD_ENABLED and _FFMPEG is None:
+        print("⚠️ ffmpeg not found: VAD can't decode webm/opus chunks (what browsers record), "
+              "so every one of them still goes to ASR. Install ffmpeg to gate them.")
+    return _FFMPEG is not None
+
+
+def get_vad_gate() -> VoiceActivityGate:
+    """Shared gate for the process"""
+    global _gate
+    if _gate is None:
+        with _gate_lock:
+            if _gate is None:
+                _gate = VoiceActivityGate()
+    return _gate
+
+
+def transcribe_with_vad(audio: bytes) -> str:
+    """stream_asr for chunks with speech; silent chunks return '' without an ASR call"""
+    speech = get_vad_gate().check(audio)
+    if speech is None:
+        return ''
+    return stream_asr(speech)
+
+
+def get_vad_stats() -> Dict:
+    """Chunks checked, ASR calls avoided and audio trimmed, for the stats endpoint"""
+    return get_vad_gate().get_stats()
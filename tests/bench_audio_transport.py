@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: base64 vs binary Socket.IO audio payloads
+
+Models one minute of a two-person conversation through server.py:
+    - each user sends a 2 s webm audio_chunk (32 kbps) back to back
+    - the agent speaks AGENT_REPLIES_PER_MIN replies of AGENT_REPLY_SEC seconds,
+      streamed as 8 KiB agent_audio_chunk events (44.1 kHz 16-bit mono WAV)
+      to both users
+
+and reports wire bytes and server CPU time for both encodings. Packets are
+built the way python-socketio does: the event payload is JSON-encoded, and
+in binary mode each bytes value becomes a {"_placeholder": true} entry plus
+a separate raw attachment frame.
+"""
+
+import base64
+import json
+import os
+import time
+
+USERS = 2
+CHUNK_SEC = 2
+CLIENT_BITRATE = 32000  # audioBitsPerSecond in webrtcService.js
+AGENT_REPLIES_PER_MIN = 3
+AGENT_REPLY_SEC = 5
+SAMPLE_RATE = 44100
+TTS_CHUNK = 8192
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+def socketio_packet(event: str, payload: dict, binary: bool):
+    """Encoded text frame plus attachment frames for one emit"""
+    if binary:
+        header = {k: ({'_placeholder': True, 'num': 0} if k == 'audio' else v) for k, v in payload.items()}
+        text = '451-' + json.dumps([event, header], separators=(',', ':'))
+        return text, [payload['audio']]
+    return '42' + json.dumps([event, payload], separators=(',', ':')), []
+
+def wire_bytes(text, attachments):
+    return len(text.encode('utf-8')) + sum(len(a) for a in attachments)
+
+def one_minute(binary: bool):
+    """Server-side work for a minute of conversation; returns (wire bytes, cpu seconds)"""
+    inbound_chunk = os.urandom(CHUNK_SEC * CLIENT_BITRATE // 8)
+    # Encoded by the browser, so it stays out of the server CPU time
+    inbound_audio = inbound_chunk if binary else base64.b64encode(inbound_chunk).decode('ascii')
+    reply = os.urandom(AGENT_REPLY_SEC * SAMPLE_RATE * 2)
+    reply_chunks = [reply[i:i + TTS_CHUNK] for i in range(0, len(reply), TTS_CHUNK)]
+
+    total = 0
+    cpu_start = time.process_time()
+
+    # Client -> server audio_chunk events
+    for _ in range(USERS * 60 // CHUNK_SEC):
+        audio = inbound_audio
+        total += wire_bytes(*socketio_packet('audio_chunk', {'audio': audio, 'room': 'matchmaking'}, binary))
+        # Server side: what handle_audio_chunk does before ASR
+        audio_data = bytes(audio) if binary else base64.b64decode(audio)
+        assert len(audio_data) == len(inbound_chunk)
+
+    # Server -> clients agent_audio_chunk events (one emit per chunk, delivered to every user)
+    for _ in range(AGENT_REPLIES_PER_MIN):
+        for seq, chunk in enumerate(reply_chunks):
+            audio = chunk if binary else base64.b64encode(chunk).decode('utf-8')
+            packet = socketio_packet('agent_audio_chunk', {
+                'stream_id': 'bench', 'seq': seq, 'segment': None,
+                'format': 'wav', 'end': False, 'audio': audio
+            }, binary)
+            total += USERS * wire_bytes(*packet)
+
+    return total, time.process_time() - cpu_start
+
+def run_benchmark(repeat=5):
+    print(f"Conversation: {USERS} users, {CHUNK_SEC}s mic chunks at {CLIENT_BITRATE // 1000} kbps, "
+          f"{AGENT_REPLIES_PER_MIN} x {AGENT_REPLY_SEC}s agent replies per minute")
+    print_separator()
+
+    results = {}
+    for label, binary in [("base64 (old)", False), ("binary attachments", True)]:
+        best_cpu = float('inf')
+        for _ in range(repeat):
+            wire, cpu = one_minute(binary)
+            best_cpu = min(best_cpu, cpu)
+        results[binary] = (wire, best_cpu)
+        print(f"   {label:<20} {wire / 1024 / 1024:7.2f} MiB/min   {best_cpu * 1000:7.2f} ms CPU/min")
+
+    (b64_wire, b64_cpu), (bin_wire, bin_cpu) = results[False], results[True]
+    print(f"\n   binary saves {(1 - bin_wire / b64_wire) * 100:.1f}% of wire bytes "
+          f"and {(1 - bin_cpu / b64_cpu) * 100:.1f}% of encode/decode CPU")
+
+
+if __name__ == "__main__":
+    print("📦 AUDIO TRANSPORT BENCHMARK")
+    print_separator()
+    run_benchmark()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial vs parallel sentence TTS for a long host reply
+
+Runs in mock mode with a simulated Fish Audio latency (fixed overhead plus
+time per character) so the numbers reflect request concurrency rather than
+the instant mock tone. Also checks that the stitched WAV has correct sizes
+and that the streamed variant yields the same PCM.
+
+Usage:
+    python tests/bench_parallel_tts.py
+"""
+
+import os
+import struct
+import time
+
+os.environ.setdefault('FISH_MOCK', 'true')
+
+import sys
+from pathlib import Path
+
+# Add src to path so we can import fish modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from fish import tts
+from fish.client import FishSessionManager
+from fish.parallel import ParallelTTS, split_sentences, _parse_wav
+
+REQUEST_OVERHEAD_SEC = 0.15
+SEC_PER_CHAR = 0.004
+
+REPLY = (
+    "Okay, I love that you both brought up hiking. "
+    "Sam, you mentioned the coastal trail last weekend, and Alex lit up when you said it. "
+    "So here's a question for both of you. "
+    "What's the most spontaneous trip either of you has ever taken? "
+    "And be honest, did it go to plan?"
+)
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+def install_latency():
+    """Wrap the uncached synthesis so every request costs what a real one would"""
+    original = tts._synthesize
+
+    def slow_synthesize(manager, text, *args, **kwargs):
+        time.sleep(REQUEST_OVERHEAD_SEC + SEC_PER_CHAR * len(text))
+        return original(manager, text, *args, **kwargs)
+
+    tts._synthesize = slow_synthesize
+
+def check_wav(audio: bytes, expected_pcm: int):
+    riff_size = struct.unpack_from('<I', audio, 4)[0]
+    fmt, pcm = _parse_wav(audio)
+    assert riff_size == len(audio) - 8, "RIFF size does not match file length"
+    assert len(pcm) == expected_pcm, f"expected {expected_pcm} PCM bytes, got {len(pcm)}"
+    return fmt
+
+def run_benchmark():
+    assert FishSessionManager().mock_mode, "benchmark needs FISH_MOCK=true"
+    install_latency()
+    sentences = split_sentences(REPLY)
+    slowest = max(REQUEST_OVERHEAD_SEC + SEC_PER_CHAR * len(s) for s in sentences)
+
+    print(f"Reply: {len(REPLY)} chars, {len(sentences)} sentences "
+          f"(slowest sentence ~{slowest * 1000:.0f} ms)")
+    print_separator()
+
+    start = time.perf_counter()
+    serial = tts.stream_tts(REPLY, use_cache=False)
+    serial_sec = time.perf_counter() - start
+    print(f"   serial (one request)      {serial_sec * 1000:7.0f} ms")
+
+    pool = ParallelTTS()
+    start = time.perf_counter()
+    stitched = pool.synthesize(REPLY, use_cache=False)
+    parallel_sec = time.perf_counter() - start
+    print(f"   parallel ({pool.workers} workers)      {parallel_sec * 1000:7.0f} ms")
+
+    # Every mock sentence is the same 1 s tone, so the PCM should be n copies
+    _, tone_pcm = _parse_wav(tts._generate_mock_wav())
+    check_wav(stitched, len(tone_pcm) * len(sentences))
+    print(f"   stitched WAV: {len(stitched)} bytes, header sizes correct")
+
+    start = time.perf_counter()
+    first_chunk_sec = None
+    streamed = bytearray()
+    for chunk in pool.iter_chunks(REPLY, use_cache=False):
+        if first_chunk_sec is None:
+            first_chunk_sec = time.perf_counter() - start
+        streamed += chunk
+    streamed_sec = time.perf_counter() - start
+    _, streamed_pcm = _parse_wav(bytes(streamed))
+    _, stitched_pcm = _parse_wav(stitched)
+    assert bytes(streamed_pcm) == bytes(stitched_pcm), "streamed PCM differs from stitched PCM"
+    print(f"   parallel stream           {streamed_sec * 1000:7.0f} ms "
+          f"(first audio after {first_chunk_sec * 1000:.0f} ms)")
+
+    print(f"\n   parallel is {serial_sec / parallel_sec:.1f}x faster than serial")
+    print(f"   stats: {pool.get_stats()}")
+
+
+if __name__ == "__main__":
+    print("🗣️  PARALLEL SENTENCE TTS BENCHMARK")
+    print_separator()
+    run_benchmark()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the incremental SSE decoder (app/sse.py)
+
+Compares the old buffer-everything parser (split the full text on newlines,
+json.loads per line) with SSEDecoder fed chunk by chunk, the way
+iter_content delivers a streamed response.
+"""
+
+from app import sse
+import json
+import time
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+def make_stream(events: int) -> bytes:
+    """Build a streamed completion with multi-byte text in every delta"""
+    lines = []
+    for i in range(events):
+        content = f"word{i} café — ✨ "
+        lines.append("data: " + json.dumps({"choices": [{"delta": {"content": content}}]}, ensure_ascii=False))
+        lines.append("")
+    lines.append("data: [DONE]")
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+def old_parse(response_text: str) -> str:
+    """The parser previously copied into agent_manager, server.py and app.py"""
+    complete_message = []
+    for line in response_text.strip().split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('data: '):
+            try:
+                chunk = json.loads(line[6:])
+                if 'choices' in chunk and len(chunk['choices']) > 0:
+                    content = chunk['choices'][0].get('delta', {}).get('content', '')
+                    if content:
+                        complete_message.append(content)
+            except json.JSONDecodeError:
+                continue
+    return ''.join(complete_message)
+
+def chunked(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+def bench(label, fn, repeat=5):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"   {label:<34} {best * 1000:8.2f} ms")
+    return result, best
+
+def check_split_boundaries():
+    """Every split point - including inside UTF-8 characters - must decode identically"""
+    print("Checking split boundaries...")
+    data = make_stream(20)
+    expected = old_parse(data.decode('utf-8'))
+    for split in range(1, len(data)):
+        decoder = sse.SSEDecoder()
+        out = decoder.feed(data[:split]) + decoder.feed(data[split:]) + decoder.flush()
+        assert ''.join(out) == expected, f"mismatch when split at byte {split}"
+    print(f"   ✅ {len(data) - 1} split points decode identically")
+
+def run_benchmark(events=50000):
+    data = make_stream(events)
+    text = data.decode('utf-8')
+    print(f"Stream: {events} events, {len(data) / 1024:.0f} KiB")
+    print_separator()
+
+    baseline, old_time = bench("old parser (buffered text)", lambda: old_parse(text))
+
+    for chunk_size in [64, 512, 8192]:
+        result, new_time = bench(
+            f"SSEDecoder ({chunk_size} B chunks)",
+            lambda: ''.join(sse.iter_sse_deltas(chunked(data, chunk_size)))
+        )
+        assert result == baseline
+        print(f"      {old_time / new_time:.2f}x vs old parser")
+
+    # Time to first delta: the old parser cannot return anything before the body ends
+    start = time.perf_counter()
+    next(sse.iter_sse_deltas(chunked(data, 512)))
+    print(f"\n   first delta after {(time.perf_counter() - start) * 1e6:.0f} µs "
+          f"(old parser: needs the full body)")
+
+
+if __name__ == "__main__":
+    print("⚡ SSE DECODER BENCHMARK")
+    print_separator()
+    check_split_boundaries()
+    print_separator()
+    run_benchmark()
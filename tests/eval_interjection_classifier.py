@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of the local interjection classifier (app/interjection_classifier.py)
+
+Replays sessions/log.csv, builds the same window the server scores after each
+transcript, and compares the classifier with the remote Claude decision.
+
+Labels:
+    Claude decisions are cached in sessions/interjection_labels.json, keyed by
+    window, so re-runs cost nothing. Windows without a cached label are sent
+    to Claude when ANTHROPIC_API_KEY is set and skipped otherwise.
+    --proxy-labels labels a window positive when the agent actually spoke
+    within the next PROXY_HORIZON lines instead (no API calls).
+
+Usage:
+    python -m tests.eval_interjection_classifier [--proxy-labels] [--fit [--save]]
+"""
+
+from app import interjection_classifier as ic
+from datetime import datetime
+import argparse
+import hashlib
+import json
+import csv
+import os
+import numpy as np
+
+LOG_FILE = os.path.join("sessions", "log.csv")
+LABELS_FILE = os.path.join("sessions", "interjection_labels.json")
+
+AGENT_SPEAKERS = {'janitor', 'agent', 'ai'}
+CONTEXT_WINDOW = 20  # Same as AI_CONTEXT_WINDOW in app.py
+SILENCE_THRESHOLD = 3.0
+PROXY_HORIZON = 2
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+def _parse_time(value):
+    try:
+        return datetime.fromisoformat(value.rstrip('Z')).timestamp()
+    except ValueError:
+        return None
+
+def load_windows(path=LOG_FILE):
+    """
+    One window per human transcript line: the lines so far, the pause before
+    the last one, lines since the agent spoke, and whether it spoke soon after
+    """
+    sessions = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['speaker'] == 'SYSTEM':
+                continue
+            sessions.setdefault(row['session_id'], []).append(row)
+
+    windows = []
+    for session_id, rows in sessions.items():
+        texts = []
+        since_agent = 0
+        last_time = None
+        for i, row in enumerate(rows):
+            t = _parse_time(row['timestamp'])
+            if row['speaker'].lower() in AGENT_SPEAKERS:
+                since_agent = 0
+                last_time = t
+                continue
+
+            gap = (t - last_time) if (t is not None and last_time is not None) else 0.0
+            last_time = t
+            texts.append(row['text'])
+            since_agent += 1
+
+            upcoming = rows[i + 1:i + 1 + PROXY_HORIZON]
+            windows.append({
+                'session_id': session_id,
+                'texts': texts[-CONTEXT_WINDOW:],
+                'gap': gap,
+                'turns_since_ai': since_agent,
+                'agent_followed': any(r['speaker'].lower() in AGENT_SPEAKERS for r in upcoming)
+            })
+    return windows
+
+def _window_key(window):
+    context = "\n".join(f"User: {t}" for t in window['texts'])
+    silence = window['gap'] >= SILENCE_THRESHOLD
+    return hashlib.sha1(f"{silence}|{context}".encode('utf-8')).hexdigest(), context, silence
+
+def claude_labels(windows):
+    """Remote decisions for every window (cached); None where unavailable"""
+    cache = {}
+    if os.path.exists(LABELS_FILE):
+        with open(LABELS_FILE, 'r') as f:
+            cache = json.load(f)
+
+    client = None
+    api_key = os.getenv('ANTHROPIC_API_KEY', '')
+    if api_key:
+        import anthropic
+        client = anthropic.Anthropic(api_key=api_key)
+    model = os.getenv('CLAUDE_MODEL', 'claude-sonnet-4-5-20250929')
+
+    labels = []
+    fetched = 0
+    for window in windows:
+        key, context, silence = _window_key(window)
+        if key not in cache and client:
+            try:
+                message = client.messages.create(
+                    model=model,
+                    max_tokens=200,
+                    messages=[{"role": "user", "content": ic.build_decision_prompt(context, silence)}]
+                )
+                cache[key] = bool(ic.parse_decision(message.content[0].text).get('should_interject'))
+                fetched += 1
+            except Exception as e:
+                print(f"   Claude label failed: {e}")
+        labels.append(cache.get(key))
+
+    if fetched:
+        with open(LABELS_FILE, 'w') as f:
+            json.dump(cache, f)
+        print(f"   Fetched {fetched} new Claude labels")
+    return labels
+
+def precision_recall(predicted, actual):
+    tp = int(np.sum(predicted & actual))
+    fp = int(np.sum(predicted & ~actual))
+    fn = int(np.sum(~predicted & actual))
+    precision = tp / (tp + fp) if tp + fp else float('nan')
+    recall = tp / (tp + fn) if tp + fn else float('nan')
+    return precision, recall
+
+def report(classifier, X, y):
+    p = classifier.score(X)
+
+    precision, recall = precision_recall(p >= 0.5, y)
+    print(f"   p >= 0.5 alone:        precision {precision:.2f}  recall {recall:.2f}")
+
+    skip = p < classifier.skip_below
+    interject = p > classifier.interject_above
+    escalate = ~skip & ~interject
+    # Gated mode: confident cases decided locally, the rest agree with Claude by construction
+    gated = interject | (escalate & y)
+    precision, recall = precision_recall(gated, y)
+    print(f"   gated (skip<{classifier.skip_below}, interject>{classifier.interject_above}): "
+          f"precision {precision:.2f}  recall {recall:.2f}")
+    print(f"   Claude calls avoided:  {int(np.sum(~escalate))}/{len(y)} "
+          f"({np.mean(~escalate) * 100:.0f}%)")
+    print(f"   local errors:          {int(np.sum(skip & y))} wrong skips, "
+          f"{int(np.sum(interject & ~y))} wrong interjections")
+
+def fit_logistic(X, y, l2=0.01, lr=0.5, steps=3000):
+    """Plain batch gradient descent on the log loss (L2 on the weights, not the bias)"""
+    Xb = np.hstack([np.ones((len(X), 1)), X])
+    w = np.zeros(Xb.shape[1])
+    target = y.astype(float)
+    for _ in range(steps):
+        p = 1.0 / (1.0 + np.exp(-(Xb @ w)))
+        grad = Xb.T @ (p - target) / len(X)
+        grad[1:] += l2 * w[1:]
+        w -= lr * grad
+
+    weights = {'bias': float(w[0])}
+    weights.update({name: float(v) for name, v in zip(ic.FEATURES, w[1:])})
+    return weights
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--log', default=LOG_FILE)
+    parser.add_argument('--proxy-labels', action='store_true', help="label by whether the agent spoke next")
+    parser.add_argument('--fit', action='store_true', help="fit logistic weights on the labels")
+    parser.add_argument('--save', action='store_true', help=f"write fitted weights to {ic.WEIGHTS_FILE}")
+    args = parser.parse_args()
+
+    print("🧮 INTERJECTION CLASSIFIER EVALUATION")
+    print_separator()
+
+    windows = load_windows(args.log)
+    print(f"   {len(windows)} transcript windows from {args.log}")
+
+    if args.proxy_labels:
+        labels = [w['agent_followed'] for w in windows]
+    else:
+        labels = claude_labels(windows)
+
+    labelled = [(w, l) for w, l in zip(windows, labels) if l is not None]
+    if not labelled:
+        print("   No labels available (set ANTHROPIC_API_KEY or use --proxy-labels)")
+        return
+
+    X = np.array([ic.extract_features(w['texts'], w['gap'], w['turns_since_ai']) for w, _ in labelled])
+    y = np.array([bool(l) for _, l in labelled])
+    print(f"   {len(y)} labelled, {int(y.sum())} positive "
+          f"({'agent spoke next' if args.proxy_labels else 'Claude said interject'})")
+
+    print_separator()
+    print("Current weights:")
+    classifier = ic.InterjectionClassifier(ic.load_weights())
+    report(classifier, X, y)
+
+    if args.fit:
+        print_separator()
+        print("Fitted weights (in-sample):")
+        weights = fit_logistic(X, y)
+        print(json.dumps({k: round(v, 3) for k, v in weights.items()}, indent=2))
+        report(ic.InterjectionClassifier(weights), X, y)
+        if args.save:
+            ic.save_weights(weights)
+            print(f"\n   ✅ Saved to {ic.WEIGHTS_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Offline evaluation of voice activity detection in front of ASR (src/fish/vad.py)
+
+Runs the VAD gate over recorded audio chunks and reports the fraction of ASR
+calls it avoids and how much audio it trims from the rest.
+
+Recordings:
+    Start the server with FISH_VAD_RECORD_DIR=sessions/vad_chunks to save
+    every incoming chunk, then point --dir at that directory. webm chunks
+    need ffmpeg on the PATH; without it they count as undecodable (sent
+    to ASR unchanged).
+
+    Without recordings, a synthetic two-person session is generated
+    (harmonic voiced speech with syllable-rate modulation, separated by
+    room noise, mains hum and hiss) and the verdicts are also scored
+    against its ground truth.
+
+Usage:
+    python tests/eval_vad.py [--dir sessions/vad_chunks] [--detector energy|webrtc]
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path so we can import fish modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from fish import vad
+import argparse
+import os
+import numpy as np
+
+CHUNK_SEC = 2  # Same as the client's MediaRecorder interval
+SAMPLE_RATE = 16000
+SYNTHETIC_CHUNKS = 90
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+def _db(level_dbfs):
+    return 10 ** (level_dbfs / 20)
+
+def synth_speech(rng, seconds):
+    """Voiced 'speech': harmonics of a drifting f0, amplitude-modulated at syllable rate"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = rng.uniform(110, 220) * (1 + 0.05 * np.sin(2 * np.pi * 0.7 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 16))
+    syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None) ** 0.5
+    voice *= syllables / np.max(np.abs(voice))
+    return voice * _db(rng.uniform(-30, -18))
+
+def synth_noise(rng, seconds, kind):
+    n = int(seconds * SAMPLE_RATE)
+    if kind == 'hum':
+        t = np.arange(n) / SAMPLE_RATE
+        return _db(-38) * np.sin(2 * np.pi * 50 * t) + _db(-65) * rng.standard_normal(n)
+    if kind == 'hiss':
+        return _db(-40) * rng.standard_normal(n)
+    # Room tone: brown-ish noise
+    walk = np.cumsum(rng.standard_normal(n))
+    walk -= np.convolve(walk, np.ones(400) / 400, mode='same')
+    return _db(-55) * walk / (np.std(walk) + 1e-9)
+
+def synthetic_session(seed=7):
+    """(wav bytes, has_speech) per chunk for a conversation with ~40% speech"""
+    rng = np.random.default_rng(seed)
+    chunks = []
+    for _ in range(SYNTHETIC_CHUNKS):
+        background = synth_noise(rng, CHUNK_SEC, rng.choice(['room', 'room', 'room', 'hum', 'hiss']))
+        has_speech = rng.random() < 0.4
+        if has_speech:
+            length = rng.uniform(0.5, CHUNK_SEC)
+            start = int(rng.uniform(0, CHUNK_SEC - length) * SAMPLE_RATE)
+            speech = synth_speech(rng, length)
+            background[start:start + len(speech)] += speech
+        pcm = np.clip(background * 32768, -32768, 32767).astype(np.int16)
+        chunks.append((vad.encode_wav(pcm, SAMPLE_RATE), has_speech))
+    return chunks
+
+def recorded_chunks(directory):
+    names = sorted(n for n in os.listdir(directory) if n.endswith(('.wav', '.webm', '.ogg')))
+    for name in names:
+        with open(os.path.join(directory, name), 'rb') as f:
+            yield f.read(), None
+
+def evaluate(chunks, detector_name):
+    gate = vad.VoiceActivityGate(vad.create_detector(detector_name))
+
+    confusion = {'speech_kept': 0, 'speech_dropped': 0, 'noise_kept': 0, 'noise_dropped': 0}
+    labelled = False
+    for audio, has_speech in chunks:
+        kept = gate.check(audio) is not None
+        if has_speech is not None:
+            labelled = True
+            confusion[f"{'speech' if has_speech else 'noise'}_{'kept' if kept else 'dropped'}"] += 1
+
+    stats = gate.get_stats()
+    print(f"   detector: {stats['detector']}")
+    print(f"   chunks: {stats['chunks']} ({stats['speech']} speech, {stats['silent']} silent, "
+          f"{stats['undecodable']} undecodable)")
+    print(f"   ASR calls avoided: {stats['asr_avoided_ratio'] * 100:.1f}%")
+    print(f"   audio trimmed from chunks sent: {stats['trimmed_ratio'] * 100:.1f}%")
+    print(f"   VAD cost: {stats['vad_avg_ms']:.2f} ms/chunk")
+
+    if labelled:
+        speech = confusion['speech_kept'] + confusion['speech_dropped']
+        noise = confusion['noise_kept'] + confusion['noise_dropped']
+        print(f"\n   speech chunks kept: {confusion['speech_kept']}/{speech}")
+        print(f"   noise chunks dropped: {confusion['noise_dropped']}/{noise}")
+    return stats, confusion
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dir', default=vad.VAD_RECORD_DIR or os.path.join('sessions', 'vad_chunks'))
+    parser.add_argument('--detector', default=vad.VAD_DETECTOR, choices=sorted(vad.DETECTORS))
+    args = parser.parse_args()
+
+    print("🔇 VAD EVALUATION")
+    print_separator()
+
+    if os.path.isdir(args.dir) and os.listdir(args.dir):
+        print(f"Recorded chunks from {args.dir}")
+        evaluate(recorded_chunks(args.dir), args.detector)
+    else:
+        print(f"No recordings in {args.dir} - synthetic session, "
+              f"{SYNTHETIC_CHUNKS} x {CHUNK_SEC}s chunks")
+        stats, confusion = evaluate(synthetic_session(), args.detector)
+        # Some synthetic speech sits at ~0 dB SNR under hiss, so recall isn't expected to be perfect
+        recall = confusion['speech_kept'] / (confusion['speech_kept'] + confusion['speech_dropped'])
+        rejection = confusion['noise_dropped'] / (confusion['noise_kept'] + confusion['noise_dropped'])
+        assert recall >= 0.9 and rejection >= 0.9, "VAD accuracy regressed on the synthetic session"
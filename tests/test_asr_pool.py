@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded ASR worker pool (runs offline with a slow stub transcriber)
+
+Usage:
+    python tests/test_asr_pool.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path so we can import fish modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from fish.asr_pool import ASRPool, QUEUED, DROPPED_OLDEST, MERGED, THROTTLED
+from fish.tts import _generate_mock_wav
+import threading
+import time
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+class SlowASR:
+    """Transcribes b'<speaker>:<n>' clips after a delay, tracking concurrency"""
+
+    def __init__(self, latency=0.1):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    def __call__(self, audio):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.latency)
+        with self.lock:
+            self.running -= 1
+        return audio.decode() if audio[:4] != b'RIFF' else f"{len(audio)} bytes of WAV"
+
+def collect(pool, speakers, chunks):
+    """Submit chunks round-robin and wait for every result"""
+    results = {speaker: [] for speaker in speakers}
+    outcomes = []
+
+    def on_result(speaker):
+        return lambda transcript, audio_size: results[speaker].append(transcript)
+
+    for n in range(chunks):
+        for speaker in speakers:
+            outcomes.append(pool.submit(speaker, f"{speaker}:{n}".encode(), on_result(speaker)))
+
+    deadline = time.time() + 10
+    while time.time() < deadline and (pool.queue_depth() or pool.get_stats()['in_flight']):
+        time.sleep(0.02)
+    return results, outcomes
+
+def demo_asr_pool():
+    """Demonstrate ordering, bounded concurrency and the overflow policies"""
+
+    print("🎧 ASR POOL DEMO")
+    print_separator()
+
+    # 1. Many speakers, few workers - concurrency capped, per-speaker order kept
+    print("1️⃣ 6 speakers x 3 chunks on 2 workers...")
+    asr = SlowASR(latency=0.05)
+    pool = ASRPool(workers=2, max_queue=5, overflow='drop_oldest', transcribe=asr)
+    speakers = [f"user{i}" for i in range(6)]
+    results, outcomes = collect(pool, speakers, 3)
+    for speaker in speakers:
+        assert results[speaker] == [f"{speaker}:{n}" for n in range(3)], results[speaker]
+    assert asr.max_running <= 2
+    assert all(outcome == QUEUED for outcome in outcomes)
+    stats = pool.get_stats()
+    print(f"   max concurrent ASR calls: {asr.max_running}, completed: {stats['completed']}")
+    print(f"   wait avg {stats['wait_avg_ms']:.0f} ms, asr avg {stats['asr_avg_ms']:.0f} ms")
+    print("   ✅ Transcripts in order for every speaker")
+
+    print_separator()
+
+    # 2. Backlog with drop_oldest - the newest audio wins
+    print("2️⃣ Slow backend, drop_oldest...")
+    pool = ASRPool(workers=1, max_queue=2, overflow='drop_oldest', transcribe=SlowASR(latency=0.2))
+    results, outcomes = collect(pool, ["alex"], 6)
+    print(f"   outcomes: {outcomes}")
+    print(f"   transcribed: {results['alex']}")
+    assert DROPPED_OLDEST in outcomes
+    assert results['alex'][-1] == "alex:5" and results['alex'] == sorted(results['alex'])
+    print(f"   ✅ Queue never exceeded {pool.get_stats()['max_depth_seen']} chunks")
+
+    print_separator()
+
+    # 3. slow_down - excess chunks are refused with a retry hint
+    print("3️⃣ Slow backend, slow_down...")
+    pool = ASRPool(workers=1, max_queue=2, overflow='slow_down', transcribe=SlowASR(latency=0.2))
+    outcomes = [pool.submit("sam", f"sam:{n}".encode(), lambda t, s: None) for n in range(5)]
+    print(f"   outcomes: {outcomes}, retry after ~{pool.retry_after_ms('sam')} ms")
+    assert outcomes.count(THROTTLED) >= 2
+
+    print_separator()
+
+    # 4. merge - queued WAV chunks are joined into one longer clip
+    print("4️⃣ Slow backend, merge (WAV chunks)...")
+    wav = _generate_mock_wav()
+    pool = ASRPool(workers=1, max_queue=1, overflow='merge', transcribe=SlowASR(latency=0.2))
+    texts = []
+    outcomes = [pool.submit("jo", wav, lambda t, s: texts.append(t))]
+    while pool.queue_depth():
+        time.sleep(0.01)  # First chunk is on the worker; the rest pile up behind it
+    outcomes += [pool.submit("jo", wav, lambda t, s: texts.append(t)) for _ in range(3)]
+    while pool.queue_depth() or pool.get_stats()['in_flight']:
+        time.sleep(0.02)
+    print(f"   outcomes: {outcomes}")
+    print(f"   transcribed: {texts}")
+    assert MERGED in outcomes and len(texts) == 2
+    print("   ✅ 4 chunks -> 2 ASR calls, no audio dropped")
+
+    print_separator()
+
+    # 5. Exempt jobs survive overflow and don't take queue slots
+    print("5️⃣ Exempt jobs under drop_oldest...")
+    pool = ASRPool(workers=1, max_queue=1, overflow='drop_oldest', transcribe=SlowASR(latency=0.1))
+    done = []
+    on_result = lambda t, s: done.append(t)
+    outcomes = [pool.submit("kit", b"kit:0", on_result)]
+    while pool.queue_depth():
+        time.sleep(0.01)
+    outcomes += [pool.submit("kit", b"kit:step", on_result, exempt=True)]
+    outcomes += [pool.submit("kit", f"kit:{n}".encode(), on_result) for n in range(1, 4)]
+    while pool.queue_depth() or pool.get_stats()['in_flight']:
+        time.sleep(0.02)
+    print(f"   outcomes: {outcomes}")
+    print(f"   transcribed: {done}")
+    assert done == ["kit:0", "kit:step", "kit:3"]
+    print("   ✅ Exempt job ran in order; only ordinary chunks were dropped")
+
+    print_separator()
+    print("✅ ASR pool demo complete")
+
+
+if __name__ == "__main__":
+    demo_asr_pool()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming ASR with interim transcripts (src/fish/asr_stream.py)
+
+Plays the synthetic speaker from test_segmenter through a SpeechSegmenter
+at 10x real time, once with whole-utterance ASR (push() segments, one
+request each) and once with a StreamingTranscriber listening to the
+segmenter. The ASR backend is simulated with a fixed latency, so the
+timings compare when text becomes available, in audio seconds.
+
+Usage:
+    python tests/test_asr_stream.py  (or python -m tests.test_asr_stream)
+"""
+
+import sys
+from pathlib import Path
+
+# Add src (fish modules) and the repo root (shared tests helpers) to the path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from fish.asr_stream import (StreamingTranscriber, FishStreamingRecognizer, STUB_SCRIPT,
+                             ASR_MAX_INTERIMS, register_recognizer)
+from fish.asr_pool import ASRPool
+from fish.segmenter import SpeechSegmenter, STREAM_SAMPLE_RATE
+from fish import vad
+from tests.test_segmenter import synthetic_speaker, stream
+import numpy as np
+import time
+
+SPEED = 10  # Audio seconds per wall second
+FRAME_SEC = 0.1
+ASR_LATENCY_SEC = 0.6  # Simulated request latency...
+ASR_SEC_PER_AUDIO_SEC = 0.05  # ...plus this per second of audio
+WORDS_PER_SEC = 2.5
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+def asr_latency(audio_sec):
+    return ASR_LATENCY_SEC + ASR_SEC_PER_AUDIO_SEC * audio_sec
+
+def simulated_asr(wav):
+    """Stand-in for stream_asr: sleeps like the backend, 'hears' words by duration"""
+    pcm, rate = vad.decode_pcm(wav)
+    seconds = len(pcm) / rate
+    time.sleep(asr_latency(seconds) / SPEED)
+    return ' '.join(f'w{i}' for i in range(int(seconds * WORDS_PER_SEC)))
+
+def play(segmenter, pcm):
+    """Push 100 ms frames at SPEED x real time; returns the start time"""
+    frame = int(STREAM_SAMPLE_RATE * FRAME_SEC)
+    start = time.time()
+    for seq, offset in enumerate(range(0, len(pcm), frame)):
+        time.sleep(max(0, start + (seq + 1) * FRAME_SEC / SPEED - time.time()))
+        segmenter.push(seq, pcm[offset:offset + frame].tobytes())
+    return start
+
+def run_streaming(pcm, backend, pool):
+    """(audio time, hypothesis) for everything the transcriber produced, and the transcriber"""
+    results = []
+    transcriber = StreamingTranscriber('speaker', pool=pool, backend=backend,
+                                       on_hypothesis=lambda h: results.append((time.time(), h)))
+    start = play(SpeechSegmenter(listener=transcriber), pcm)
+    while transcriber._busy or transcriber._ops:
+        time.sleep(0.01)
+    return [((at - start) * SPEED, h) for at, h in results], transcriber
+
+def demo_asr_stream():
+    """Compare whole-utterance ASR with streaming ASR"""
+
+    print("📝 STREAMING ASR DEMO")
+    print_separator()
+
+    pcm, spans = synthetic_speaker()
+    starts = [start / STREAM_SAMPLE_RATE for start, _ in spans]
+    ends = [end / STREAM_SAMPLE_RATE for _, end in spans]
+    print(f"Speaker: {len(pcm) / STREAM_SAMPLE_RATE:.0f}s of audio, {len(spans)} utterances, "
+          f"ASR latency {ASR_LATENCY_SEC}s + {ASR_SEC_PER_AUDIO_SEC}s per audio second")
+    print_separator()
+
+    # 1. Whole utterances: nothing until the pause is confirmed and the request returns
+    print("1️⃣ Whole-utterance ASR...")
+    batch_final = []
+    batch_bytes = 0
+    for wav, dispatched in stream(SpeechSegmenter(), pcm):
+        pcm_len = len(vad.decode_pcm(wav)[0])
+        batch_bytes += pcm_len * 2
+        batch_final.append(dispatched / STREAM_SAMPLE_RATE + asr_latency(pcm_len / STREAM_SAMPLE_RATE))
+    batch_first = [final - start for final, start in zip(batch_final, starts)]
+    batch_lag = [final - end for final, end in zip(batch_final, ends)]
+    print(f"   first text after speech starts: avg {np.mean(batch_first):.2f}s")
+    print(f"   final after speech ends: avg {np.mean(batch_lag):.2f}s")
+
+    print_separator()
+
+    # 2. Streaming on the Fish backend (capped re-decodes, early decode at pauses)
+    print("2️⃣ Streaming ASR, fish backend...")
+    recognizers = []
+    def fish_simulated(**kwargs):
+        recognizers.append(FishStreamingRecognizer(transcribe=simulated_asr, **kwargs))
+        return recognizers[-1]
+    register_recognizer('fish-simulated', fish_simulated)
+
+    pool = ASRPool(workers=4)
+    results, transcriber = run_streaming(pcm, 'fish-simulated', pool)
+    finals = [(at, h) for at, h in results if h.final]
+    interims = [(at, h) for at, h in results if not h.final]
+    first = {}
+    for at, h in interims:
+        first.setdefault(h.utterance, at)
+
+    stream_first = [first.get(i, finals[i][0]) - start for i, start in enumerate(starts)]
+    stream_lag = [at - end for (at, _), end in zip(finals, ends)]
+    reused = sum(r.reused_final for r in recognizers)
+    decodes = sum(r.decodes for r in recognizers)
+    uploaded = sum(r.uploaded_bytes for r in recognizers)
+    stats = transcriber.get_stats()
+    print(f"   interims: {len(interims)}, finals: {len(finals)}")
+    print(f"   first text after speech starts: avg {np.mean(stream_first):.2f}s "
+          f"({np.mean(batch_first) - np.mean(stream_first):.2f}s earlier)")
+    print(f"   final after speech ends: avg {np.mean(stream_lag):.2f}s "
+          f"({np.mean(batch_lag) - np.mean(stream_lag):.2f}s earlier)")
+    print(f"   ASR requests: {decodes} vs {len(batch_final)} "
+          f"({stats['asr_requests_per_utterance']:.1f} per utterance); "
+          f"{reused}/{len(finals)} finals reused the decode made at the pause")
+    print(f"   audio uploaded: {uploaded / batch_bytes:.1f}x whole-utterance ASR")
+
+    assert len(finals) == len(spans), "every utterance needs exactly one final"
+    for at, h in interims:
+        final_text = next(f.text for _, f in finals if f.utterance == h.utterance)
+        assert final_text.startswith(h.text), "interim is not a prefix of its final"
+    assert np.mean(stream_first) < np.mean(batch_first)
+    assert np.mean(stream_lag) < np.mean(batch_lag)
+    assert decodes <= (ASR_MAX_INTERIMS + 1) * len(spans), "interim decodes are not capped"
+    assert stats['asr_requests'] == decodes and stats['uploaded_bytes'] == uploaded
+    print("   ✅ Text shows up while the speaker is talking, finals land sooner")
+
+    print_separator()
+
+    # 3. Only finals go to the session
+    print("3️⃣ Session transcript (stub backend)...")
+    results, transcriber = run_streaming(pcm, 'stub', pool)
+    session = [h.text for _, h in results if h.final and h.text]
+    for line in session[:3]:
+        print(f"   {line}")
+    expected = [STUB_SCRIPT[i % len(STUB_SCRIPT)] for i in range(len(spans))]
+    assert session == expected, "session should hold each utterance's final once, in order"
+    print(f"   ... {len(session)} lines, {transcriber.get_stats()['interims']} interims not stored")
+
+    print_separator()
+
+    # 4. A click opens an utterance but is discarded: no final reaches the session
+    print("4️⃣ Discarded utterance...")
+    results = []
+    transcriber = StreamingTranscriber('clicker', pool=pool, backend='stub',
+                                       on_hypothesis=results.append)
+    transcriber.feed(b'\x00\x10' * 8000)  # 0.5 s: the stub shows a word
+    transcriber.end_utterance(keep=False)
+    while transcriber._busy or transcriber._ops:
+        time.sleep(0.01)
+    print(f"   {results}")
+    assert results[-1].final and results[-1].text == '', "shown interims should be retracted"
+
+    print_separator()
+    print("✅ Streaming ASR demo complete")
+
+
+if __name__ == "__main__":
+    demo_asr_stream()
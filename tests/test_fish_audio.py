@@ -14,7 +14,7 @@ from pathlib import Path
 # Add src to path so we can import fish modules
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from fish import stream_tts, stream_asr, FishSessionManager
+from fish import stream_tts, stream_asr, FishSessionManager, get_tts_cache_stats
 
 
 def test_tts(text: str, output_file: str = "test_output.wav"):
@@ -69,6 +69,29 @@ def test_asr(audio_file: str):
         return None
 
 
+def test_tts_cache(text: str):
+    """Test that a repeated phrase is served from the TTS cache."""
+    print(f"\n📦 Testing TTS cache with text: '{text}'")
+
+    try:
+        first = stream_tts(text)
+
+        start_time = time.perf_counter()
+        repeat = stream_tts(text)
+        repeat_time = time.perf_counter() - start_time
+
+        assert repeat == first, "cached audio differs from the original"
+
+        stats = get_tts_cache_stats()
+        print(f"✅ TTS Cache Success!")
+        print(f"   - Repeat served in {repeat_time * 1e6:.0f} µs")
+        print(f"   - Hits: {stats['memory_hits']} memory, {stats['disk_hits']} disk, {stats['misses']} misses")
+        print(f"   - Latency saved: {stats['latency_saved_sec']:.2f} seconds")
+
+    except Exception as e:
+        print(f"❌ TTS Cache Failed: {e}")
+
+
 def test_session_manager():
     """Test Fish Session Manager configuration."""
     print("\n🔧 Testing Fish Session Manager")
@@ -109,6 +132,9 @@ def main():
         if audio_data:
             audio_files.append(output_file)
     
+    # Repeat phrase should come from the cache
+    test_tts_cache(test_texts[0])
+
     # Test ASR with generated audio files
     for audio_file in audio_files:
         test_asr(audio_file)
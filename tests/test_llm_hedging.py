@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged LLM provider racing (runs offline with stub providers)
+"""
+
+from app import agent_manager
+from app.agent_manager import HedgedLLM, StubProvider
+import json
+import time
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+PAYLOAD = {"messages": [{"role": "user", "content": "Hi"}], "max_tokens": 50}
+
+def timed(hedged):
+    start = time.time()
+    text, error = hedged.complete(PAYLOAD)
+    return text, error, time.time() - start
+
+def demo_hedging():
+    """Demonstrate hedging, failover and win-rate stats"""
+
+    print("🏁 LLM HEDGING DEMO")
+    print_separator()
+
+    # 1. Fast primary - no hedge needed
+    print("1️⃣ Fast primary answers before the hedge delay...")
+    hedged = HedgedLLM([
+        StubProvider("primary", latency=0.1, text="Primary reply."),
+        StubProvider("backup", latency=0.1, text="Backup reply.")
+    ])
+    text, error, elapsed = timed(hedged)
+    print(f"   {text!r} in {elapsed:.2f}s")
+    assert text == "Primary reply."
+    assert hedged.get_stats()['backup']['calls'] == 0
+    print("   ✅ Backup never started")
+
+    print_separator()
+
+    # 2. Slow primary - backup starts after the hedge delay and wins
+    print("2️⃣ Slow primary gets hedged...")
+    hedged = HedgedLLM([
+        StubProvider("primary", latency=3.0, text="Primary reply."),
+        StubProvider("backup", latency=0.2, text="Backup reply.")
+    ])
+    hedged.hedge_delay = lambda provider: 0.3
+    text, error, elapsed = timed(hedged)
+    print(f"   {text!r} in {elapsed:.2f}s")
+    assert text == "Backup reply." and elapsed < 1.0
+    time.sleep(0.1)  # Let the cancelled primary report back
+    assert hedged.get_stats()['primary']['cancelled'] == 1
+    print("   ✅ Backup won, primary cancelled")
+
+    print_separator()
+
+    # 3. Failing primary - fail over without waiting for the hedge delay
+    print("3️⃣ Primary fails fast...")
+    hedged = HedgedLLM([
+        StubProvider("primary", latency=0.05, error="Server error 500"),
+        StubProvider("backup", latency=0.1, text="Backup reply.")
+    ])
+    text, error, elapsed = timed(hedged)
+    print(f"   {text!r} in {elapsed:.2f}s")
+    assert text == "Backup reply." and elapsed < 1.0
+    print("   ✅ Failed over immediately")
+
+    print_separator()
+
+    # 4. Everything fails - last error is returned
+    print("4️⃣ All providers fail...")
+    hedged = HedgedLLM([
+        StubProvider("primary", latency=0.05, error="Server error 500"),
+        StubProvider("backup", latency=0.05, error="Claude error: overloaded")
+    ])
+    text, error, elapsed = timed(hedged)
+    print(f"   error: {error}")
+    assert text is None and error
+    print("   ✅ Caller gets an error and uses the fallback")
+
+    print_separator()
+
+    # 5. Module-level race with injected stubs
+    print("5️⃣ Provider stats through agent_manager...")
+    agent_manager.set_llm_providers([
+        StubProvider("primary", latency=0.1),
+        StubProvider("backup", latency=0.1)
+    ])
+    for _ in range(3):
+        agent_manager.get_hedged_llm().complete(PAYLOAD)
+    print(json.dumps(agent_manager.get_provider_stats(), indent=2))
+
+
+if __name__ == "__main__":
+    demo_hedging()
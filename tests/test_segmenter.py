@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test script for continuous audio ingestion (src/fish/segmenter.py)
+
+Streams a synthetic speaker (utterances separated by pauses, over room
+noise) through SpeechSegmenter in 100 ms frames and compares it with the
+old 2-second stop/start recordings: ASR calls, utterances cut at chunk
+edges, and delay from end of speech to dispatch.
+
+Usage:
+    python tests/test_segmenter.py  (or python -m tests.test_segmenter)
+"""
+
+import sys
+from pathlib import Path
+
+# Add src (fish modules) and the repo root (shared tests helpers) to the path
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from fish.segmenter import SpeechSegmenter, STREAM_SAMPLE_RATE, PAUSE_SEC
+from fish import vad
+from tests.eval_vad import synth_speech, synth_noise
+import numpy as np
+
+FRAME_MS = 100
+BLOB_SEC = 2
+
+def print_separator():
+    print("\n" + "="*60 + "\n")
+
+def synthetic_speaker(seed=11, utterances=12):
+    """PCM for one speaker plus the (start, end) sample range of each utterance"""
+    rng = np.random.default_rng(seed)
+    parts, spans, cursor = [], [], 0
+    for _ in range(utterances):
+        pause = synth_noise(rng, rng.uniform(1.0, 3.0), 'room')
+        speech = synth_speech(rng, rng.uniform(0.8, 4.0))
+        speech += synth_noise(rng, len(speech) / STREAM_SAMPLE_RATE, 'room')[:len(speech)]
+        parts += [pause, speech]
+        cursor += len(pause)
+        spans.append((cursor, cursor + len(speech)))
+        cursor += len(speech)
+    parts.append(synth_noise(rng, 2.0, 'room'))
+    pcm = np.clip(np.concatenate(parts) * 32768, -32768, 32767).astype(np.int16)
+    return pcm, spans
+
+def stream(segmenter, pcm, frame_ms=FRAME_MS, order=None):
+    """Push pcm as numbered frames; returns (segment wav, sample index at dispatch) pairs"""
+    frame = STREAM_SAMPLE_RATE * frame_ms // 1000
+    frames = [(seq, pcm[i:i + frame]) for seq, i in enumerate(range(0, len(pcm), frame))]
+    if order:
+        frames = order(frames)
+    out = []
+    for seq, chunk in frames:
+        for segment in segmenter.push(seq, chunk.tobytes()):
+            out.append((segment, (seq + 1) * frame))
+    return out
+
+def demo_segmenter():
+    """Compare streaming segmentation with 2-second recordings"""
+
+    print("✂️  SPEECH SEGMENTER DEMO")
+    print_separator()
+
+    pcm, spans = synthetic_speaker()
+    total_sec = len(pcm) / STREAM_SAMPLE_RATE
+    print(f"Speaker: {total_sec:.0f}s of audio, {len(spans)} utterances")
+    print_separator()
+
+    # 1. Streaming: one segment per utterance, dispatched one pause after it ends
+    print("1️⃣ Continuous frames, cut at pauses...")
+    segmenter = SpeechSegmenter()
+    segments = stream(segmenter, pcm)
+    durations = [vad.decode_pcm(wav)[0].size / STREAM_SAMPLE_RATE for wav, _ in segments]
+    delays = [(dispatched - end) / STREAM_SAMPLE_RATE for (_, dispatched), (_, end) in zip(segments, spans)]
+    print(f"   segments: {len(segments)} (utterances: {len(spans)})")
+    print(f"   dispatch delay after speech ends: avg {np.mean(delays):.2f}s, max {max(delays):.2f}s")
+    assert len(segments) == len(spans), "utterances were split or merged"
+    for duration, (start, end) in zip(durations, spans):
+        assert duration >= (end - start) / STREAM_SAMPLE_RATE, "segment is shorter than its utterance"
+    assert max(delays) < PAUSE_SEC + 0.2
+    print("   ✅ Every utterance reached ASR once and whole")
+
+    print_separator()
+
+    # 2. The old way: independent 2-second recordings
+    print("2️⃣ 2-second stop/start recordings...")
+    blob = BLOB_SEC * STREAM_SAMPLE_RATE
+    gate = vad.VoiceActivityGate(vad.EnergyZCRDetector())
+    calls = sum(gate.check(vad.encode_wav(pcm[i:i + blob], STREAM_SAMPLE_RATE)) is not None
+                for i in range(0, len(pcm), blob))
+    cut = sum(1 for start, end in spans if start // blob != (end - 1) // blob)
+    blob_delays = [(-end % blob) / STREAM_SAMPLE_RATE for _, end in spans]
+    print(f"   ASR calls (after VAD): {calls}")
+    print(f"   utterances cut at a chunk edge: {cut}/{len(spans)}")
+    print(f"   dispatch delay after speech ends: avg {np.mean(blob_delays):.2f}s "
+          f"(last chunk only - earlier parts of the utterance were sent separately)")
+    print(f"\n   streaming: {len(segments)} ASR calls vs {calls}, no words cut at chunk edges")
+
+    print_separator()
+
+    # 3. Transport glitches: duplicate/stale and missing frames
+    print("3️⃣ Stale and lost frames...")
+    segmenter = SpeechSegmenter()
+    def glitch(frames):
+        frames = frames[:50] + frames[45:48] + frames[52:]  # 3 stale repeats, 2 lost
+        return frames
+    stream(segmenter, pcm, order=glitch)
+    stats = segmenter.get_stats()
+    print(f"   stale: {stats['stale_frames']}, lost: {stats['lost_frames']}")
+    assert stats['stale_frames'] == 3 and stats['lost_frames'] == 2
+
+    print_separator()
+
+    # 4. Bounded memory: a monologue longer than the segment limit
+    print("4️⃣ 40s monologue...")
+    rng = np.random.default_rng(3)
+    monologue = np.clip(synth_speech(rng, 40) * 32768, -32768, 32767).astype(np.int16)
+    segmenter = SpeechSegmenter()
+    segments = stream(segmenter, monologue) + [(wav, None) for wav in segmenter.flush()]
+    stats = segmenter.get_stats()
+    print(f"   segments: {len(segments)}, forced cuts: {stats['forced_cuts']}, "
+          f"buffer: {stats['buffer_bytes'] / 1024:.0f} KiB per speaker")
+    assert stats['forced_cuts'] >= 2 and len(segments) == 3
+
+    print_separator()
+    print("✅ Segmenter demo complete")
+
+
+if __name__ == "__main__":
+    demo_segmenter()